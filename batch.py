@@ -0,0 +1,132 @@
+"""پردازش دسته‌ای چند فایل به صورت موازی با ProcessPoolExecutor
+
+گرامر و جدول تجزیه فقط یک بار در فرایند اصلی ساخته می‌شوند و از طریق initializer به هر
+فرایند کارگر داده می‌شوند. نتیجه هر فایل یک FileResult کوچک و قابل pickle است.
+"""
+import argparse
+import io
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from lexical_analyzer import tokenize_file
+from grammar import CPPGrammar
+from predictive_parser import PredictiveParser, write_tree
+from result_cache import ResultCache
+
+# نتیجه فشرده هر فایل: تعداد توکن‌ها و تولیدات، متن خطا (یا None) و درخت سریال‌شده (یا None)
+FileResult = namedtuple('FileResult', ['path', 'tokens', 'productions', 'error', 'tree'])
+
+# پارسر و کش نتایج هر فرایند کارگر؛ در _init_worker یک بار ساخته می‌شوند
+_worker_parser = None
+_worker_cache = None
+
+
+def _init_worker(compiled_table, cache_dir=None):
+    # جدول تجزیه آماده از فرایند اصلی می‌رسد، پس گرامر در کارگرها دوباره محاسبه نمی‌شود
+    # اگر cache_dir داده شود، کارگر نتایج را در کش مشترک روی دیسک جستجو و ذخیره می‌کند؛
+    # کش هم با همین جدول تجزیه می‌کند و اثر انگشت آن را در کلید نتایج می‌گذارد
+    global _worker_parser, _worker_cache
+    _worker_parser = PredictiveParser(compiled_table)
+    if cache_dir is not None:
+        _worker_cache = ResultCache(None, cache_dir=cache_dir, parse_table=compiled_table)
+
+
+def check_file(parser, path, tree_format=None, cache=None):
+    """توکنایز و تجزیه یک فایل با parser و بازگرداندن FileResult
+
+    اگر tree_format داده شود ('text'، 'json' یا 'dot')، درخت پارس با write_tree سریال می‌شود.
+    خطاهای خواندن، توکنایز و تجزیه در فیلد error گزارش می‌شوند و استثنا بیرون نمی‌آید.
+    با cache (یک ResultCache) فایل تغییرنکرده دوباره توکنایز و تجزیه نمی‌شود.
+    """
+    if cache is not None:
+        return _check_cached(cache, path, tree_format)
+    token_count = 0
+    try:
+        tokens = tokenize_file(path)
+        token_count = len(tokens)
+        parser.parse(tokens, build_tree=tree_format is not None)
+    except (OSError, ValueError, SyntaxError) as e:
+        return FileResult(path, token_count, 0, str(e), None)
+    tree = None
+    if tree_format is not None:
+        out = io.StringIO()
+        write_tree(parser.tree, out, tree_format)
+        tree = out.getvalue()
+    return FileResult(path, token_count, len(parser.productions), None, tree)
+
+
+def _check_cached(cache, path, tree_format):
+    # نسخه check_file با کش نتایج
+    try:
+        with open(path, 'rb') as f:
+            result = cache.check(f.read())
+    except (OSError, ValueError) as e:
+        return FileResult(path, 0, 0, str(e), None)
+    token_count = len(result.tokens) if result.tokens is not None else 0
+    if result.error is not None:
+        return FileResult(path, token_count, 0, result.error, None)
+    tree = None
+    if tree_format is not None:
+        out = io.StringIO()
+        write_tree(cache.parse_tree(result), out, tree_format)
+        tree = out.getvalue()
+    return FileResult(path, token_count, len(result.productions), None, tree)
+
+
+def _check_chunk(paths, tree_format):
+    # کار هر وظیفه در کارگر: چند فایل پشت سر هم تا سربار ارسال وظیفه سرشکن شود
+    return [check_file(_worker_parser, path, tree_format, _worker_cache) for path in paths]
+
+
+def check_files(paths, workers=None, ordered=True, tree_format=None, chunksize=None, parse_table=None,
+                cache_dir=None):
+    """بررسی موازی فایل‌ها و تولید FileResult برای هر فایل
+
+    workers تعداد فرایندهای کارگر است (پیش‌فرض os.cpu_count()). با ordered=True نتایج به ترتیب
+    paths و در غیر این صورت به ترتیب پایان کار تولید می‌شوند. chunksize تعداد فایل‌های هر وظیفه
+    است و parse_table یک CompiledParseTable آماده (پیش‌فرض از CPPGrammar ساخته می‌شود).
+    با cache_dir نتایج فایل‌ها در کش روی دیسک (ResultCache) نگه داشته می‌شوند.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        # حدود چهار وظیفه برای هر کارگر، تا کارگرها با اندازه‌های نابرابر فایل‌ها متوازن بمانند
+        chunksize = max(1, len(paths) // (workers * 4))
+    if parse_table is None:
+        parse_table = CPPGrammar().compile_parse_table()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(parse_table, cache_dir)) as executor:
+        futures = [executor.submit(_check_chunk, paths[i:i + chunksize], tree_format)
+                   for i in range(0, len(paths), chunksize)]
+        for future in (futures if ordered else as_completed(futures)):
+            yield from future.result()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="بررسی موازی چند فایل C++ با چند فرایند")
+    arg_parser.add_argument('files', nargs='+', help="فایل‌های ورودی")
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None, help="تعداد فرایندهای کارگر")
+    arg_parser.add_argument('--unordered', action='store_true', help="چاپ نتایج به ترتیب پایان کار")
+    arg_parser.add_argument('--tree', choices=('text', 'json', 'dot'), help="چاپ درخت پارس هر فایل")
+    arg_parser.add_argument('--cache-dir', help="پوشه کش نتایج؛ فایل‌های تغییرنکرده دوباره بررسی نمی‌شوند")
+    args = arg_parser.parse_args(argv)
+
+    status = 0
+    for result in check_files(args.files, args.jobs, not args.unordered, args.tree, cache_dir=args.cache_dir):
+        if result.error is not None:
+            print(f"{result.path}: {result.error}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"{result.path}: {result.tokens} tokens, {result.productions} productions")
+        if result.tree is not None:
+            sys.stdout.write(result.tree)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
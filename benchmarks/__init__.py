@@ -0,0 +1,5 @@
+"""بنچمارک‌های بخش جلویی کامپایلر (توکنایزر، گرامر و پارسر)
+
+هر اسکریپت به صورت ماژول از ریشه مخزن اجرا می‌شود، برای مثال:
+    python -m benchmarks.bench_tokenizer
+"""
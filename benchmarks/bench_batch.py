@@ -0,0 +1,56 @@
+"""هزینه سربار هر سند در پردازش دسته‌ای قطعه‌کدهای کوچک
+
+سه حالت مقایسه می‌شوند: ساخت گرامر و نمونه‌های جدید برای هر سند، ساخت فقط توکنایزر و پارسر جدید
+با گرامر مشترک، و استفاده دوباره از یک نمونه با tokenize_many / parse_many.
+"""
+import sys
+import time
+
+from lexical_analyzer import CompiledTokenizer
+from grammar import CPPGrammar
+from predictive_parser import PredictiveParser
+
+SNIPPETS = [
+    "int main(){ int x; cin >> x; cout << x; return 0; }",
+    "using namespace std; int main(){ int s=0, t=10; while (t >= 0){ t = t - 1; } }",
+    "#include <iostream>\nint main(){ float y = 2 * 3; cout << \"y=\" << y; }",
+]
+
+
+def per_document_setup(documents):
+    for code in documents:
+        grammar = CPPGrammar()
+        PredictiveParser(grammar.compile_parse_table()).parse(CompiledTokenizer().tokenize(code))
+
+
+def per_document_instances(documents, grammar):
+    for code in documents:
+        PredictiveParser(grammar.compile_parse_table()).parse(CompiledTokenizer().tokenize(code))
+
+
+def reused_instances(documents, grammar):
+    tokenizer = CompiledTokenizer()
+    parser = PredictiveParser(grammar.compile_parse_table())
+    for _ in parser.parse_many(tokenizer.tokenize_many(documents)):
+        pass
+
+
+def main(count=5000):
+    documents = [SNIPPETS[i % len(SNIPPETS)] for i in range(count)]
+    grammar = CPPGrammar()
+    cases = [
+        ("new grammar per doc", lambda: per_document_setup(documents[:count // 10])),
+        ("new instances per doc", lambda: per_document_instances(documents, grammar)),
+        ("reused (*_many)", lambda: reused_instances(documents, grammar)),
+    ]
+    print("{:<24} {:>8} {:>12}".format("Mode", "Docs", "us/doc"))
+    for name, run in cases:
+        docs = count // 10 if name.startswith("new grammar") else count
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        print("{:<24} {:>8} {:>12.1f}".format(name, docs, seconds / docs * 1e6))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,52 @@
+"""پارسر تولیدشده با parser_codegen در برابر PredictiveParser جدول‌محور، با و بدون ساخت درخت"""
+import sys
+import time
+
+from lexical_analyzer import CompiledTokenizer
+from grammar import CPPGrammar
+from predictive_parser import PredictiveParser, walk_tree
+from parser_codegen import load_parser
+from benchmarks.bench_parser import make_source
+from benchmarks.corpus import adversarial_programs
+
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return time.perf_counter() - start, result
+
+
+def check_adversarial(parser, generated):
+    # ورودی‌های دشوار (از جمله تودرتویی عمیق‌تر از حد بازگشت) باید همان تولیدات و درخت را بدهند
+    for name, code in adversarial_programs().items():
+        tokens = CompiledTokenizer().tokenize(code)
+        productions, root = generated.parse(tokens, build_tree=True)
+        parser.parse(tokens, build_tree=True)
+        assert productions == parser.productions, name
+        assert _shape(root) == _shape(parser.tree), name
+
+
+def _shape(root):
+    return [(entering, depth, node.value) for entering, depth, node in walk_tree(root)]
+
+
+def main(sizes=(10_000, 100_000, 1_000_000)):
+    grammar = CPPGrammar()
+    parser = PredictiveParser(grammar.compile_parse_table())
+    generated = load_parser(grammar)
+    check_adversarial(parser, generated)
+
+    print("{:<10} {:<6} {:>14} {:>14} {:>10}".format("Tokens", "Tree", "table tok/s", "codegen tok/s", "Speedup"))
+    for size in sizes:
+        tokens = CompiledTokenizer().tokenize(make_source(size))
+        for build_tree in (False, True):
+            table_seconds, _ = timed(lambda: parser.parse(tokens, build_tree=build_tree))
+            generated_seconds, (productions, _) = timed(lambda: generated.parse(tokens, build_tree=build_tree))
+            assert productions == parser.productions
+            print("{:<10} {:<6} {:>14,.0f} {:>14,.0f} {:>9.2f}x".format(
+                len(tokens), str(build_tree), len(tokens) / table_seconds, len(tokens) / generated_seconds,
+                table_seconds / generated_seconds))
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
@@ -0,0 +1,63 @@
+"""توکنایز فایل: خواندن و رمزگشایی کامل و سپس توکنایز، در برابر tokenize_file با mmap
+
+علاوه بر زمان، اوج حافظه پایتون (tracemalloc) هم گزارش می‌شود؛ صفحه‌های mmap را سیستم‌عامل
+مدیریت می‌کند و در این عدد حساب نمی‌شوند.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from lexical_analyzer import CompiledTokenizer, tokenize_file
+from benchmarks.bench_tokenizer import make_source
+
+
+def read_then_tokenize(path):
+    with open(path, encoding='utf-8') as f:
+        return CompiledTokenizer().tokenize(f.read())
+
+
+def read_then_tokenize_store(path):
+    with open(path, encoding='utf-8') as f:
+        return CompiledTokenizer().tokenize_store(f.read())
+
+
+def main(sizes_mb=(1, 8, 32)):
+    cases = [
+        ("read + tokenize", read_then_tokenize),
+        ("read + tokenize_store", read_then_tokenize_store),
+        ("tokenize_file (mmap)", tokenize_file),
+    ]
+    print("{:<24} {:>8} {:>10} {:>12} {:>14}".format("Mode", "MB", "Seconds", "MB/sec", "Peak MB"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes_mb:
+            path = os.path.join(tmp, f'input-{size}mb.cpp')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(make_source(size * 1024 * 1024))
+            megabytes = os.path.getsize(path) / (1024 * 1024)
+            reference = None
+            for name, run in cases:
+                start = time.perf_counter()
+                tokens = run(path)
+                seconds = time.perf_counter() - start
+                del tokens
+                tracemalloc.start()
+                tokens = run(path)
+                peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                tracemalloc.stop()
+                print("{:<24} {:>8.1f} {:>10.3f} {:>12.1f} {:>14.1f}".format(
+                    name, megabytes, seconds, megabytes / seconds, peak))
+                if size == sizes_mb[0]:
+                    # خروجی همه روش‌ها باید یکسان باشد
+                    tokens = list(tokens)
+                    if reference is None:
+                        reference = tokens
+                    elif tokens != reference:
+                        raise AssertionError(f"خروجی {name} با بقیه یکسان نیست")
+                del tokens
+            print()
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (1, 8, 32))
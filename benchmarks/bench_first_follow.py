@@ -0,0 +1,144 @@
+"""مقایسه حل‌کننده worklist مجموعه‌های FIRST/FOLLOW با حل‌کننده نقطه ثابت قبلی روی گرامر مصنوعی
+
+گرامر مصنوعی زنجیره‌های طولانی وابستگی دارد (A_i به A_{i+1} وابسته است)، پس حل‌کننده نقطه ثابت
+باید تمام تولیدات را بارها پیمایش کند تا تغییرات به ابتدای زنجیره برسند.
+"""
+import random
+import sys
+import time
+
+from grammar import compute_first_sets, compute_follow_sets
+
+
+def synthetic_grammar(n_non_terminals, n_terminals=50, seed=0):
+    # ساخت گرامر تصادفی با بذر ثابت تا نتایج تکرارپذیر باشند
+    rng = random.Random(seed)
+    terminals = {f't{i}' for i in range(n_terminals)} | {'ε'}
+    terminal_list = sorted(terminals - {'ε'})
+    names = [f'A{i}' for i in range(n_non_terminals)]
+    productions = {}
+    for i, name in enumerate(names):
+        prods = []
+        # تولید زنجیره‌ای: A_i -> A_{i+1} ... تا FIRST و FOLLOW در طول زنجیره منتقل شوند
+        if i + 1 < n_non_terminals:
+            prods.append([names[i + 1], rng.choice(terminal_list)])
+        for _ in range(rng.randint(2, 4)):
+            length = rng.randint(1, 5)
+            prod = []
+            for _ in range(length):
+                if rng.random() < 0.5:
+                    prod.append(names[rng.randrange(i, n_non_terminals)] if rng.random() < 0.9
+                                else names[rng.randrange(n_non_terminals)])
+                else:
+                    prod.append(rng.choice(terminal_list))
+            prods.append(prod)
+        if rng.random() < 0.3:
+            prods.append(['ε'])
+        productions[name] = prods
+    return productions, terminals, names[0]
+
+
+def fixpoint_first_sets(productions, terminals):
+    # حل‌کننده نقطه ثابت قبلی CPPGrammar.compute_first (برای مقایسه)
+    first = {nt: set() for nt in productions}
+    updated = True
+    while updated:
+        updated = False
+        for nt in productions:
+            for prod in productions[nt]:
+                first_symbol = prod[0]
+                if first_symbol in terminals:
+                    if first_symbol not in first[nt]:
+                        first[nt].add(first_symbol)
+                        updated = True
+                else:
+                    prev_len = len(first[nt])
+                    first[nt].update(first[first_symbol] - {'ε'})
+                    if len(first[nt]) > prev_len:
+                        updated = True
+                    if 'ε' in first[first_symbol]:
+                        for sym in prod[1:]:
+                            if sym in terminals:
+                                if sym not in first[nt]:
+                                    first[nt].add(sym)
+                                    updated = True
+                                break
+                            else:
+                                prev_len = len(first[nt])
+                                first[nt].update(first[sym] - {'ε'})
+                                if len(first[nt]) > prev_len:
+                                    updated = True
+                                if 'ε' not in first[sym]:
+                                    break
+                        else:
+                            if 'ε' not in first[nt]:
+                                first[nt].add('ε')
+                                updated = True
+    return first
+
+
+def _first_of_sequence(seq, terminals, first):
+    result = set()
+    for sym in seq:
+        if sym in terminals:
+            result.add(sym)
+            break
+        result.update(first[sym] - {'ε'})
+        if 'ε' not in first[sym]:
+            break
+    else:
+        result.add('ε')
+    return result
+
+
+def fixpoint_follow_sets(productions, terminals, start, first):
+    # حل‌کننده نقطه ثابت قبلی CPPGrammar.compute_follow (برای مقایسه)
+    follow = {nt: set() for nt in productions}
+    follow[start].add('$')
+    updated = True
+    while updated:
+        updated = False
+        for nt in productions:
+            for prod in productions[nt]:
+                for i, sym in enumerate(prod):
+                    if sym in productions:
+                        next_syms = prod[i + 1:]
+                        first_next = _first_of_sequence(next_syms, terminals, first)
+                        prev_len = len(follow[sym])
+                        follow[sym].update(first_next - {'ε'})
+                        if len(follow[sym]) > prev_len:
+                            updated = True
+                        if 'ε' in first_next or len(next_syms) == 0:
+                            prev_len = len(follow[sym])
+                            follow[sym].update(follow[nt])
+                            if len(follow[sym]) > prev_len:
+                                updated = True
+    return follow
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(sizes=(250, 500, 1000, 2000)):
+    print("{:<10} {:>8} {:>14} {:>14} {:>10}".format("NTs", "Rules", "fixpoint (s)", "worklist (s)", "Speedup"))
+    for size in sizes:
+        productions, terminals, start = synthetic_grammar(size)
+        rules = sum(len(prods) for prods in productions.values())
+
+        old_first_time, old_first = timed(fixpoint_first_sets, productions, terminals)
+        old_follow_time, old_follow = timed(fixpoint_follow_sets, productions, terminals, start, old_first)
+        new_first_time, new_first = timed(compute_first_sets, productions, terminals)
+        new_follow_time, new_follow = timed(compute_follow_sets, productions, terminals, start, new_first)
+        if old_first != new_first or old_follow != new_follow:
+            raise AssertionError("نتیجه دو حل‌کننده یکسان نیست")
+
+        old_time = old_first_time + old_follow_time
+        new_time = new_first_time + new_follow_time
+        print("{:<10} {:>8} {:>14.3f} {:>14.3f} {:>9.1f}x".format(size, rules, old_time, new_time, old_time / new_time))
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (250, 500, 1000, 2000))
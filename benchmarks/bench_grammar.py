@@ -0,0 +1,29 @@
+"""زمان ساخت CPPGrammar: محاسبه کامل جدول‌ها در برابر خواندن از فایل ذخیره‌شده"""
+import sys
+import tempfile
+import time
+
+from grammar import CPPGrammar
+
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(repeat=200):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        CPPGrammar(cache_dir=cache_dir)  # نوشتن فایل جدول‌ها
+        cases = [
+            ("compute (no cache)", lambda: CPPGrammar(cache_dir=None)),
+            ("load cached tables", lambda: CPPGrammar(cache_dir=cache_dir)),
+        ]
+        print("{:<22} {:>12}".format("Mode", "us/grammar"))
+        for name, func in cases:
+            print("{:<22} {:>12.1f}".format(name, time_per_call(func, repeat) * 1e6))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,75 @@
+"""ویرایش افزایشی در برابر توکنایز و تجزیه کامل پس از هر ویرایش
+
+بخش اول: یک ویرایش کوچک (درج و حذف یک کاراکتر در وسط سند) در اندازه‌های مختلف سند؛ زمان
+ویرایش افزایشی نباید با اندازه سند رشد کند (در پایان بررسی می‌شود که زمان ویرایش در بزرگ‌ترین سند
+کمتر از EDIT_GROWTH_LIMIT برابر کوچک‌ترین سند است)، در حالی که زمان بررسی کامل با اندازه سند رشد می‌کند.
+بخش دوم: درج بلوک‌هایی با تعداد دستور متفاوت در یک سند ثابت؛ زمان با اندازه ویرایش رشد می‌کند.
+"""
+import sys
+import time
+
+from lexical_analyzer import CompiledTokenizer
+from grammar import CPPGrammar
+from predictive_parser import PredictiveParser
+from incremental import IncrementalDocument
+from benchmarks.bench_parser import make_source
+
+STATEMENT = "s = s + x;\n"
+
+# بیشترین نسبت مجاز زمان ویرایش در بزرگ‌ترین سند به کوچک‌ترین سند (اندازه‌ها تا ۱۰۰ برابر فاصله دارند
+# و رشد خطی با اندازه سند از این حد بسیار بیشتر است)
+EDIT_GROWTH_LIMIT = 4
+
+
+def full_check(parser, code):
+    parser.parse(CompiledTokenizer().tokenize_store(code))
+
+
+def time_edits(doc, offset, rounds):
+    # درج یک کاراکتر در یک شناسه و حذف دوباره آن، rounds بار
+    start = time.perf_counter()
+    for _ in range(rounds):
+        doc.edit(offset, 0, "y")
+        doc.edit(offset, 1, "")
+    return (time.perf_counter() - start) / (2 * rounds)
+
+
+def main(sizes=(10_000, 100_000, 1_000_000), rounds=50):
+    table = CPPGrammar().compile_parse_table()
+    parser = PredictiveParser(table)
+
+    print("{:<10} {:>14} {:>14} {:>10}".format("Tokens", "full ms", "edit ms", "Speedup"))
+    edits = []
+    for size in sizes:
+        code = make_source(size)
+        start = time.perf_counter()
+        full_check(parser, code)
+        full = time.perf_counter() - start
+
+        doc = IncrementalDocument(table, code)
+        # یک شناسه در وسط سند؛ ویرایش اول شکاف را به این نقطه می‌برد و در زمان‌سنجی حساب نمی‌شود
+        offset = code.index(" x;", len(code) // 2) + 1
+        time_edits(doc, offset, 1)
+        edit = time_edits(doc, offset, rounds)
+        assert doc.text == code and doc.error is None
+        edits.append(edit)
+        print("{:<10} {:>14.3f} {:>14.3f} {:>9.0f}x".format(len(doc.tokens), full * 1e3, edit * 1e3, full / edit))
+    assert edits[-1] < EDIT_GROWTH_LIMIT * edits[0], f"زمان ویرایش با اندازه سند رشد کرده است: {edits}"
+
+    code = make_source(sizes[-1])
+    doc = IncrementalDocument(table, code)
+    offset = code.index(";\n", len(code) // 2) + 2
+    doc.edit(offset, 0, "")  # بردن شکاف به محل ویرایش
+    print("\n{:<12} {:>14} {:>14}".format("Statements", "edit ms", "Relexed"))
+    for count in (1, 10, 100, 1000):
+        block = STATEMENT * count
+        start = time.perf_counter()
+        stats = doc.edit(offset, 0, block)
+        seconds = time.perf_counter() - start
+        doc.edit(offset, len(block), "")
+        assert doc.error is None
+        print("{:<12} {:>14.3f} {:>14}".format(count, seconds * 1e3, stats.relexed))
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
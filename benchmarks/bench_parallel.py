@@ -0,0 +1,43 @@
+"""مقیاس‌پذیری batch.check_files با ۱، ۲، ۴ و N فرایند کارگر
+
+تعدادی فایل معتبر در یک پوشه موقت ساخته و با هر تعداد کارگر بررسی می‌شوند. اگر کار خوب
+پخش شود، زمان تقریباً به نسبت تعداد هسته‌ها کم می‌شود (روی ماشین تک‌هسته‌ای بهبودی دیده نمی‌شود).
+"""
+import os
+import sys
+import tempfile
+import time
+
+from batch import check_files
+from grammar import CPPGrammar
+from benchmarks.bench_parser import make_source
+
+
+def main(n_files=64, tokens_per_file=50_000):
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cpus})
+    parse_table = CPPGrammar().compile_parse_table()
+    code = make_source(tokens_per_file)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n_files):
+            path = os.path.join(tmp, f"file{i}.cpp")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(code)
+            paths.append(path)
+
+        print(f"{n_files} files x ~{tokens_per_file} tokens, {cpus} CPUs")
+        print("{:<8} {:>10} {:>12} {:>10}".format("Workers", "Seconds", "Files/sec", "Speedup"))
+        baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            results = list(check_files(paths, workers, ordered=False, parse_table=parse_table))
+            seconds = time.perf_counter() - start
+            assert all(r.error is None for r in results) and len(results) == n_files
+            baseline = baseline or seconds
+            print("{:<8} {:>10.3f} {:>12.1f} {:>9.2f}x".format(
+                workers, seconds, n_files / seconds, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,63 @@
+"""توان عملیاتی گام‌های پارسر: جدول دیکشنری با کلید رشته‌ای در برابر جدول عددی CompiledParseTable"""
+import sys
+import time
+
+from lexical_analyzer import CompiledTokenizer
+from grammar import CPPGrammar
+from predictive_parser import PredictiveParser, token_terminal
+from benchmarks.bench_parser import make_source
+
+
+def dict_table_parse(parse_table, tokens):
+    # حلقه پارسر قبلی با جستجوی رشته‌ای در جدول دیکشنری (برای مقایسه)؛ تعداد گام‌ها را برمی‌گرداند
+    tokens = iter(tokens)
+    stack = ['$', 'Start']
+    steps = 0
+    token = next(tokens, None)
+    current_input = '$' if token is None else token_terminal(token)
+    while stack:
+        steps += 1
+        top = stack[-1]
+        if top == current_input == '$':
+            return steps
+        if top == current_input or (top not in parse_table and token is not None and top == token[1]):
+            stack.pop()
+            token = next(tokens, None)
+            current_input = '$' if token is None else token_terminal(token)
+        else:
+            production = parse_table[top].get(current_input)
+            if not production:
+                raise SyntaxError(current_input)
+            stack.pop()
+            if production[0] != 'ε':
+                for symbol in reversed(production):
+                    stack.append(symbol)
+    return steps
+
+
+def compiled_table_parse(parser, tokens):
+    # تعداد گام‌ها: هر توکن یک گام انطباق و هر تولید یک گام گسترش
+    count = 0
+    for _ in parser.iter_parse(tokens):
+        count += 1
+    return count + len(tokens) + 1
+
+
+def main(n_tokens=500_000):
+    grammar = CPPGrammar()
+    tokens = CompiledTokenizer().tokenize(make_source(n_tokens))
+    parser = PredictiveParser(grammar.compile_parse_table())
+    cases = [
+        ("dict table", lambda: dict_table_parse(grammar.parse_table, tokens)),
+        ("compiled table", lambda: compiled_table_parse(parser, tokens)),
+    ]
+    print("{:<16} {:>10} {:>10} {:>16}".format("Table", "Steps", "Seconds", "Steps/sec"))
+    for name, run in cases:
+        start = time.perf_counter()
+        steps = run()
+        seconds = time.perf_counter() - start
+        print("{:<16} {:>10} {:>10.3f} {:>16,.0f}".format(name, steps, seconds, steps / seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
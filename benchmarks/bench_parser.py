@@ -0,0 +1,48 @@
+"""مقیاس‌پذیری PredictiveParser: زمان تجزیه برای ۱۰ هزار، ۱۰۰ هزار و ۱ میلیون توکن
+
+اگر تجزیه خطی باشد، زمان به ازای هر توکن در همه اندازه‌ها تقریباً ثابت می‌ماند.
+"""
+import io
+import sys
+import time
+
+from lexical_analyzer import CompiledTokenizer, iter_tokens
+from grammar import CPPGrammar
+from predictive_parser import PredictiveParser
+from benchmarks.bench_tokenizer import SNIPPET
+
+HEADER = "#include <iostream>\nusing namespace std;\nint main(){\n"
+FOOTER = "    return 0;\n}\n"
+
+
+def make_source(n_tokens):
+    # ساخت برنامه معتبری با حدود n_tokens توکن
+    per_snippet = len(CompiledTokenizer().tokenize(SNIPPET))
+    return HEADER + SNIPPET * max(1, n_tokens // per_snippet) + FOOTER
+
+
+def main(sizes=(10_000, 100_000, 1_000_000)):
+    grammar = CPPGrammar()
+    print("{:<10} {:>10} {:>12} {:>14} {:>16}".format("Mode", "Tokens", "Seconds", "ns/token", "Tokens/sec"))
+    for size in sizes:
+        code = make_source(size)
+        tokens = CompiledTokenizer().tokenize(code)
+
+        # فقط تجزیه روی لیست توکن‌های آماده
+        start = time.perf_counter()
+        PredictiveParser(grammar.compile_parse_table()).parse(tokens)
+        seconds = time.perf_counter() - start
+        print("{:<10} {:>10} {:>12.3f} {:>14.1f} {:>16,.0f}".format(
+            "parse", len(tokens), seconds, seconds / len(tokens) * 1e9, len(tokens) / seconds))
+
+        # خط لوله کامل: توکنایزر جریانی مستقیماً به پارسر وصل است
+        start = time.perf_counter()
+        for _ in PredictiveParser(grammar.compile_parse_table()).iter_parse(iter_tokens(io.StringIO(code))):
+            pass
+        seconds = time.perf_counter() - start
+        print("{:<10} {:>10} {:>12.3f} {:>14.1f} {:>16,.0f}".format(
+            "pipeline", len(tokens), seconds, seconds / len(tokens) * 1e9, len(tokens) / seconds))
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
@@ -0,0 +1,44 @@
+"""کش نتایج: بررسی سرد (توکنایز و تجزیه کامل) در برابر اجرای گرم از حافظه و از دیسک
+
+هر سند یک بار بدون کش و سپس دوباره با کش گرم بررسی می‌شود؛ در اجرای گرم فقط کد منبع هش می‌شود.
+"""
+import sys
+import tempfile
+import time
+
+from grammar import CPPGrammar
+from result_cache import ResultCache
+from benchmarks.bench_parser import make_source
+
+
+def timed(check, documents):
+    start = time.perf_counter()
+    for code in documents:
+        check(code)
+    return time.perf_counter() - start
+
+
+def main(n_docs=50, tokens_per_doc=20_000):
+    grammar = CPPGrammar()
+    # اسناد متفاوت (فقط در فاصله‌های ابتدایی) تا هر کدام کلید جداگانه‌ای داشته باشد
+    code = make_source(tokens_per_doc)
+    documents = [" " * i + code for i in range(n_docs)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(grammar, max_entries=n_docs, cache_dir=tmp)
+        cold = timed(cache.check, documents)
+        assert all(cache.check(code).error is None for code in documents)
+        warm_memory = timed(cache.check, documents)
+        # کش تازه با همان پوشه: حافظه خالی است و نتایج از دیسک خوانده می‌شوند
+        disk_cache = ResultCache(grammar, max_entries=n_docs, cache_dir=tmp)
+        warm_disk = timed(disk_cache.check, documents)
+
+    print(f"{n_docs} docs x ~{tokens_per_doc} tokens")
+    print("{:<14} {:>10} {:>12} {:>10}".format("Mode", "Seconds", "ms/doc", "Speedup"))
+    for name, seconds in (("cold", cold), ("warm memory", warm_memory), ("warm disk", warm_disk)):
+        print("{:<14} {:>10.3f} {:>12.3f} {:>9.1f}x".format(name, seconds, seconds / n_docs * 1e3, cold / seconds))
+    print("memory cache:", cache.stats())
+    print("disk cache:  ", disk_cache.stats())
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,79 @@
+"""جدول نمادها (TokenTable) روی ۱ میلیون توکن: درج، جستجو و نمای مرتب
+
+دو جریان توکن بررسی می‌شود: برنامه مصنوعی benchmarks.corpus (مقادیر تکراری زیاد) و جریانی با
+شناسه‌های تقریباً یکتا (برخوردهای زیاد در جدول درهم‌سازی). پیاده‌سازی قبلی (لیست همه تکرارها و
+مرتب‌سازی کامل در هر generate_table) به عنوان مرجع مقایسه در همین فایل آمده است.
+"""
+import sys
+import time
+from collections import defaultdict
+
+from lexical_analyzer import CompiledTokenizer
+from token_table import TokenTable
+from benchmarks.corpus import generate_program
+
+
+class ListTokenTable:
+    # پیاده‌سازی قبلی TokenTable، فقط برای مقایسه
+    def __init__(self):
+        self.order = ['STRING', 'NUMBER', 'SYMBOL', 'IDENTIFIER', 'RESERVEDWORD']
+        self.tokens = defaultdict(list)
+
+    def add_tokens(self, tokens):
+        for token_type, value in tokens:
+            self.tokens[token_type].append(value)
+
+    def generate_table(self):
+        table = []
+        for token_type in self.order:
+            if token_type in self.tokens:
+                for val in sorted(set(self.tokens[token_type]), key=lambda x: (x, [ord(c) for c in x])):
+                    table.append((token_type, val, sum(ord(c) for c in val) % 1000))
+        return table
+
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return time.perf_counter() - start, result
+
+
+def token_streams(n_tokens):
+    # (نام، لیست توکن‌ها) با حدود n_tokens توکن
+    code = generate_program(0, n_tokens // 8)
+    corpus = CompiledTokenizer().tokenize(code)[:n_tokens]
+    unique = [('IDENTIFIER', f"name{i}") for i in range(n_tokens)]
+    return [('corpus', corpus), ('unique', unique)]
+
+
+def main(n_tokens=1_000_000):
+    print("{:<8} {:>10} {:<10} {:>12} {:>12} {:>12} {:>12} {:>12}".format(
+        "Stream", "Rows", "Table", "insert ms", "table ms", "cached ms", "+1 ms", "lookup ms"))
+    for name, tokens in token_streams(n_tokens):
+        legacy = ListTokenTable()
+        insert, _ = timed(lambda: legacy.add_tokens(tokens))
+        first, expected = timed(legacy.generate_table)
+        again, _ = timed(legacy.generate_table)
+        legacy.add_tokens([('IDENTIFIER', 'zz_new')])
+        after_insert, _ = timed(legacy.generate_table)
+        print("{:<8} {:>10} {:<10} {:>12.1f} {:>12.1f} {:>12.1f} {:>12.1f} {:>12}".format(
+            name, len(expected), "list", insert * 1e3, first * 1e3, again * 1e3, after_insert * 1e3, "-"))
+
+        table = TokenTable()
+        insert, _ = timed(lambda: table.add_tokens(tokens))
+        first, rows = timed(table.generate_table)
+        assert [row[:2] for row in rows] == [row[:2] for row in expected]
+        again, _ = timed(table.generate_table)
+        table.add_token('IDENTIFIER', 'zz_new')
+        after_insert, _ = timed(table.generate_table)
+        # جستجوی همه توکن‌های جریان (همه موجودند) و همین تعداد مقدار ناموجود
+        lookup = table.lookup
+        found, _ = timed(lambda: [lookup(token_type, value) for token_type, value in tokens])
+        missing, _ = timed(lambda: [lookup('IDENTIFIER', f"missing{i}") for i in range(len(tokens))])
+        print("{:<8} {:>10} {:<10} {:>12.1f} {:>12.1f} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+            name, len(rows), "hash", insert * 1e3, first * 1e3, again * 1e3, after_insert * 1e3, found * 1e3))
+        print(f"         missing lookups: {missing * 1e3:.1f} ms  stats: {table.stats()}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
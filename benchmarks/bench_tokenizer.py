@@ -0,0 +1,53 @@
+"""مقایسه سرعت DFATokenizer و CompiledTokenizer بر حسب کاراکتر در ثانیه"""
+import sys
+import time
+
+from lexical_analyzer import DFATokenizer, CompiledTokenizer
+
+# بدنه برنامه نمونه که برای ساختن ورودی‌های بزرگ تکرار می‌شود
+SNIPPET = """
+    int x;
+    int s=0, t=10;
+    while (t >= 0){
+        cin >> x;
+        t = t - 1;
+        s = s + x;
+    }
+    cout << "sum=" << s;
+"""
+
+
+def make_source(size):
+    # ساخت کد ورودی با حداقل size کاراکتر
+    body = SNIPPET * (size // len(SNIPPET) + 1)
+    return "#include <iostream>\nusing namespace std;\nint main(){\n" + body + "    return 0;\n}\n"
+
+
+def bench(engine_cls, code, repeat=3):
+    # بهترین زمان از چند اجرا گزارش می‌شود
+    best = float('inf')
+    tokens = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = engine_cls().tokenize(code)
+        best = min(best, time.perf_counter() - start)
+    return best, tokens
+
+
+def main(sizes=(100_000, 1_000_000, 4_000_000)):
+    print("{:<20} {:>12} {:>12} {:>16}".format("Engine", "Chars", "Seconds", "Chars/sec"))
+    for size in sizes:
+        code = make_source(size)
+        results = {}
+        for engine_cls in (DFATokenizer, CompiledTokenizer):
+            seconds, tokens = bench(engine_cls, code)
+            results[engine_cls.__name__] = tokens
+            print("{:<20} {:>12} {:>12.3f} {:>16,.0f}".format(
+                engine_cls.__name__, len(code), seconds, len(code) / seconds))
+        if results['DFATokenizer'] != results['CompiledTokenizer']:
+            raise AssertionError("خروجی دو موتور یکسان نیست")
+        print()
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (100_000, 1_000_000, 4_000_000))
@@ -0,0 +1,78 @@
+"""زمان ساخت و حافظه هر گره درخت پارس: TreeNode قبلی (با __dict__ و insert(0)) در برابر نسخه فعلی"""
+import sys
+import time
+import tracemalloc
+
+from lexical_analyzer import CompiledTokenizer
+from grammar import CPPGrammar
+from predictive_parser import PredictiveParser, build_parse_tree
+from benchmarks.bench_parser import make_source
+
+
+class LegacyTreeNode:
+    # گره قبلی درخت پارس، با __dict__ برای هر نمونه (برای مقایسه)
+    def __init__(self, value):
+        self.value = value
+        self.children = []
+
+
+def legacy_build_parse_tree(productions, grammar):
+    # ساخت درخت به روش قبلی: insert(0) برای هر فرزند و بررسی عضویت برای هر نماد
+    root = LegacyTreeNode(grammar.start)
+    stack = [root]
+    for lhs, rhs in productions:
+        current_node = stack.pop()
+        for symbol in reversed(rhs):
+            if symbol == 'ε':
+                continue
+            child = LegacyTreeNode(symbol)
+            current_node.children.insert(0, child)
+            if symbol in grammar.non_terminals:
+                stack.append(child)
+    return root
+
+
+def count_nodes(root):
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def measure(build):
+    # زمان ساخت بدون ردیابی حافظه، سپس حافظه باقی‌مانده درخت در ساخت دوم (tracemalloc)
+    start = time.perf_counter()
+    root = build()
+    seconds = time.perf_counter() - start
+    del root
+    tracemalloc.start()
+    root = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return root, seconds, size
+
+
+def main(n_tokens=200_000):
+    grammar = CPPGrammar()
+    tokens = CompiledTokenizer().tokenize(make_source(n_tokens))
+    parser = PredictiveParser(grammar.compile_parse_table())
+    parser.parse(tokens)
+    productions = parser.productions
+
+    cases = [
+        ("legacy TreeNode", lambda: legacy_build_parse_tree(productions, grammar)),
+        ("__slots__ TreeNode", lambda: build_parse_tree(productions, grammar)),
+    ]
+    print("{:<20} {:>10} {:>10} {:>14}".format("Tree", "Nodes", "Seconds", "Bytes/node"))
+    for name, build in cases:
+        root, seconds, size = measure(build)
+        nodes = count_nodes(root)
+        print("{:<20} {:>10} {:>10.3f} {:>14.1f}".format(name, nodes, seconds, size / nodes))
+        del root
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,188 @@
+"""تولید بذرپذیر برنامه‌های مصنوعی معتبر برای CPPGrammar و ورودی‌های دشوار
+
+generate_program با یک بذر ثابت همیشه همان برنامه را می‌سازد. اندازه (تعداد دستورها)، عمق
+تودرتویی حلقه‌های while، نسبت دستورهای تعریف متغیر و طول زنجیره‌های cin/cout قابل تنظیم است.
+adversarial_programs ورودی‌های معتبر ولی دشوار می‌سازد: شناسه و رشته‌های بسیار طولانی، تودرتویی
+بسیار عمیق و عبارت‌ها و زنجیره‌های خروجی بسیار بلند.
+
+اجرای مستقیم، پیکره را به صورت فایل‌های .cpp در یک پوشه می‌نویسد:
+    python -m benchmarks.corpus OUTDIR --files 100 --statements 2000 --seed 1
+"""
+import argparse
+import os
+import random
+import string
+import sys
+
+from lexical_analyzer import RESERVED_WORDS
+
+HEADER = "#include <iostream>\nusing namespace std;\nint main(){\n"
+FOOTER = "    return 0;\n}\n"
+
+_OPERATORS = ('+', '-', '*')
+_COMPARISONS = ('==', '>=', '<=', '!=')
+_WORDS = ('sum', 'count', 'value', 'total', 'result', 'index', 'step', 'limit')
+
+
+class _Generator:
+    # تولید دستورها با یک random.Random مستقل تا خروجی فقط به بذر و پارامترها بستگی داشته باشد
+    def __init__(self, rng, n_names, expression_length, io_chain, string_length):
+        self.rng = rng
+        self.names = _make_names(rng, n_names)
+        self.expression_length = expression_length
+        self.io_chain = io_chain
+        self.string_length = string_length
+
+    def name(self):
+        return self.rng.choice(self.names)
+
+    def operand(self):
+        # W -> NUMBER | IDENTIFIER
+        if self.rng.random() < 0.4:
+            return str(self.rng.randrange(1000))
+        return self.name()
+
+    def operation(self):
+        # Operation -> (NUMBER | IDENTIFIER) (O W)*
+        parts = [self.operand()]
+        for _ in range(self.rng.randrange(self.expression_length + 1)):
+            parts.append(self.rng.choice(_OPERATORS))
+            parts.append(self.operand())
+        return ' '.join(parts)
+
+    def assign(self):
+        # IDENTIFIER Assign؛ مقداردهی اختیاری است
+        if self.rng.random() < 0.6:
+            return f"{self.name()} = {self.operation()}"
+        return self.name()
+
+    def declaration(self):
+        # Id -> (int | float) IDENTIFIER Assign (, IDENTIFIER Assign)* ;
+        items = [self.assign() for _ in range(1 + self.rng.randrange(3))]
+        return f"{self.rng.choice(('int', 'float'))} {', '.join(items)};"
+
+    def assignment(self):
+        # L -> IDENTIFIER Assign Z
+        return f"{self.name()} = {self.operation()};"
+
+    def input(self):
+        # Input -> cin >> IDENTIFIER (>> IDENTIFIER)* ;
+        names = [self.name() for _ in range(1 + self.rng.randrange(self.io_chain))]
+        return "cin >> " + " >> ".join(names) + ";"
+
+    def output_item(self):
+        # C -> STRING | IDENTIFIER | NUMBER
+        choice = self.rng.random()
+        if choice < 0.3:
+            length = 1 + self.rng.randrange(self.string_length)
+            return '"' + ''.join(self.rng.choice(string.ascii_letters + ' =:') for _ in range(length)) + '"'
+        if choice < 0.8:
+            return self.name()
+        return str(self.rng.randrange(1000))
+
+    def output(self):
+        # Output -> cout << C (<< C)* ;
+        items = [self.output_item() for _ in range(1 + self.rng.randrange(self.io_chain))]
+        return "cout << " + " << ".join(items) + ";"
+
+    def condition(self):
+        # Expression -> Operation K Operation
+        return f"{self.operation()} {self.rng.choice(_COMPARISONS)} {self.operation()}"
+
+
+def _make_names(rng, count):
+    # شناسه‌های متمایز که کلمه رزرو شده نیستند
+    names = set()
+    while len(names) < count:
+        name = rng.choice(_WORDS) + (str(rng.randrange(100)) if rng.random() < 0.7 else '')
+        if name not in RESERVED_WORDS:
+            names.add(name)
+    return sorted(names)
+
+
+def generate_program(seed=0, statements=1000, max_depth=3, declaration_density=0.3, io_density=0.2,
+                     io_chain=3, loop_density=0.1, expression_length=3, n_names=50, string_length=16):
+    """یک برنامه معتبر برای CPPGrammar با حدود statements دستور (هر حلقه یک دستور حساب می‌شود)
+
+    declaration_density، io_density و loop_density نسبت دستورهای تعریف، ورودی/خروجی و حلقه‌اند و
+    بقیه دستورها انتساب هستند. حلقه‌ها حداکثر max_depth سطح تودرتو می‌شوند و زنجیره‌های cin/cout
+    حداکثر io_chain عضو دارند.
+    """
+    rng = random.Random(seed)
+    gen = _Generator(rng, n_names, expression_length, io_chain, string_length)
+    lines = [HEADER]
+    depth = 0
+    remaining = statements
+    while remaining > 0 or depth > 0:
+        indent = '    ' * (depth + 1)
+        choice = rng.random()
+        if remaining <= 0 or (depth > 0 and choice < 0.15):
+            # بستن حلقه فعلی (و همه حلقه‌های باز پس از پایان بودجه دستورها)
+            depth -= 1
+            lines.append('    ' * (depth + 1) + "}\n")
+            continue
+        remaining -= 1
+        if choice < loop_density and depth < max_depth:
+            lines.append(f"{indent}while ({gen.condition()}){{\n")
+            depth += 1
+        elif choice < loop_density + declaration_density:
+            lines.append(indent + gen.declaration() + "\n")
+        elif choice < loop_density + declaration_density + io_density:
+            lines.append(indent + (gen.input() if rng.random() < 0.5 else gen.output()) + "\n")
+        else:
+            lines.append(indent + gen.assignment() + "\n")
+    lines.append(FOOTER)
+    return ''.join(lines)
+
+
+def adversarial_programs(scale=100_000, seed=0):
+    """ورودی‌های معتبر ولی دشوار، به صورت دیکشنری نام -> کد؛ scale اندازه تقریبی هر مورد است"""
+    rng = random.Random(seed)
+    long_name = 'v' + ''.join(rng.choice(string.ascii_letters + string.digits + '_') for _ in range(scale))
+    long_string = ''.join(rng.choice(string.ascii_letters + ' ') for _ in range(scale))
+    depth = max(1, scale // 100)
+    chain = max(1, scale // 10)
+    return {
+        # یک شناسه بسیار طولانی که چند بار تکرار می‌شود
+        'long_identifier': HEADER + f"    int {long_name} = 1;\n    {long_name} = {long_name} + 1;\n"
+                           f"    cout << {long_name};\n" + FOOTER,
+        # یک رشته بسیار طولانی
+        'long_string': HEADER + f'    cout << "{long_string}";\n' + FOOTER,
+        # حلقه‌های while با تودرتویی بسیار عمیق
+        'deep_nesting': HEADER + "    while (x != 0){\n" * depth + "    x = x - 1;\n" + "    }\n" * depth + FOOTER,
+        # یک عبارت بسیار بلند
+        'long_expression': HEADER + "    x = 1" + " + y" * chain + ";\n" + FOOTER,
+        # زنجیره‌های بسیار بلند cin و cout
+        'long_io_chain': HEADER + "    cin >> x" + " >> y" * chain + ";\n    cout << x" + ' << "s"' * chain + ";\n"
+                         + FOOTER,
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="نوشتن پیکره مصنوعی C++ در یک پوشه")
+    arg_parser.add_argument('output', help="پوشه خروجی")
+    arg_parser.add_argument('--files', type=int, default=10, help="تعداد فایل‌ها")
+    arg_parser.add_argument('--statements', type=int, default=1000, help="تعداد دستورهای هر فایل")
+    arg_parser.add_argument('--max-depth', type=int, default=3, help="بیشترین عمق تودرتویی while")
+    arg_parser.add_argument('--declaration-density', type=float, default=0.3, help="نسبت دستورهای تعریف")
+    arg_parser.add_argument('--io-chain', type=int, default=3, help="بیشترین طول زنجیره cin/cout")
+    arg_parser.add_argument('--seed', type=int, default=0, help="بذر؛ فایل i با بذر seed + i ساخته می‌شود")
+    arg_parser.add_argument('--adversarial', type=int, metavar='SCALE',
+                            help="نوشتن ورودی‌های دشوار با این اندازه به جای برنامه‌های معمولی")
+    args = arg_parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    if args.adversarial is not None:
+        documents = adversarial_programs(args.adversarial, args.seed).items()
+    else:
+        documents = ((f"program_{i:05d}", generate_program(
+            args.seed + i, args.statements, args.max_depth, args.declaration_density, io_chain=args.io_chain))
+            for i in range(args.files))
+    for name, code in documents:
+        with open(os.path.join(args.output, name + '.cpp'), 'w', encoding='utf-8') as f:
+            f.write(code)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
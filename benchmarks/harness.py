@@ -0,0 +1,242 @@
+"""اجرای مجموعه بنچمارک روی پیکره مصنوعی و مقایسه با یک baseline ذخیره‌شده
+
+برای هر مورد (برنامه‌های benchmarks.corpus با پارامترهای مختلف و ورودی‌های دشوار) زمان هر مرحله
+(tokenize، token table، parse، tree) جدا اندازه‌گیری می‌شود؛ ساخت گرامر یک بار و بدون کش دیسک
+اندازه‌گیری می‌شود. بهترین زمان از چند تکرار گزارش می‌شود. اوج حافظه هر مرحله در یک گذر جداگانه
+با tracemalloc اندازه‌گیری می‌شود، چون tracemalloc خود اجرا را کند می‌کند.
+
+    python -m benchmarks.harness
+    python -m benchmarks.harness --baseline other.json
+    python -m benchmarks.harness --no-baseline --output benchmarks/baseline.json
+
+مقایسه پیش‌فرض با baseline مرجع ثبت‌شده در benchmarks/baseline.json است (یا فایل --baseline).
+هر زمان یا اوج حافظه‌ای که بیش از tolerance از baseline بدتر باشد regression گزارش می‌شود و کد
+خروج 1 است. زمان‌های کوتاه‌تر از --min-seconds در مقایسه نادیده گرفته می‌شوند. زمان‌ها به ماشین
+وابسته‌اند، پس روی ماشین دیگر یا پس از بهبود عمدی کارایی، baseline مرجع با دستور سوم دوباره
+ساخته و همراه همان تغییر ثبت می‌شود (نسخه پایتون در فایل ذخیره می‌شود).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tracemalloc
+
+from lexical_analyzer import CompiledTokenizer
+from token_table import TokenTable
+from grammar import CPPGrammar
+from predictive_parser import PredictiveParser
+from profiling import PipelineStats
+from benchmarks.corpus import generate_program, adversarial_programs
+
+STAGES = ('tokenize', 'token table', 'parse', 'tree')
+
+# baseline مرجع ثبت‌شده در مخزن؛ مقایسه پیش‌فرض با این فایل انجام می‌شود
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def make_cases(seed=0, scale=1.0):
+    """دیکشنری نام مورد -> کد؛ scale تعداد دستورها و اندازه ورودی‌های دشوار را تغییر می‌دهد"""
+    def size(n):
+        return max(1, int(n * scale))
+
+    cases = {
+        'small': generate_program(seed, size(200)),
+        'medium': generate_program(seed, size(5_000)),
+        'large': generate_program(seed, size(50_000)),
+        'nested': generate_program(seed, size(5_000), max_depth=20, loop_density=0.3),
+        'declarations': generate_program(seed, size(5_000), declaration_density=0.8, io_density=0.1),
+        'io_chains': generate_program(seed, size(5_000), io_density=0.7, io_chain=12),
+    }
+    for name, code in adversarial_programs(size(100_000), seed).items():
+        cases['adversarial_' + name] = code
+    return cases
+
+
+def run_pipeline(code, parser, stats):
+    # یک اجرای کامل خط لوله؛ زمان هر مرحله در stats ثبت می‌شود
+    with stats.stage('tokenize'):
+        tokens = CompiledTokenizer().tokenize_store(code)
+    with stats.stage('token table'):
+        TokenTable().add_tokens(tokens)
+    with stats.stage('parse'):
+        parser.parse(tokens)
+    with stats.stage('tree'):
+        parser.build_tree()
+    return tokens
+
+
+def measure_memory(code, parser):
+    # اوج حافظه اضافه هر مرحله نسبت به حافظه زنده در شروع آن، و اوج کل اجرا
+    peaks = {}
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        total = 0
+        for name, run in _stage_runs(code, parser):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            peaks[name] = peak - current
+            total = max(total, peak - base)
+        peaks['total'] = total
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def _stage_runs(code, parser):
+    # همان مراحل run_pipeline به صورت (نام، تابع) برای اندازه‌گیری جداگانه حافظه
+    state = {}
+
+    def tokenize():
+        state['tokens'] = CompiledTokenizer().tokenize_store(code)
+
+    def table():
+        state['table'] = TokenTable()
+        state['table'].add_tokens(state['tokens'])
+
+    def parse():
+        parser.parse(state['tokens'])
+
+    def tree():
+        parser.build_tree()
+
+    return zip(STAGES, (tokenize, table, parse, tree))
+
+
+def measure_grammar(repeat):
+    # ساخت گرامر و جدول عددی بدون کش دیسک
+    best = float('inf')
+    for _ in range(repeat):
+        stats = PipelineStats()
+        with stats.stage('grammar'):
+            CPPGrammar(cache_dir=None).compile_parse_table()
+        best = min(best, stats.stages['grammar'][1])
+    tracemalloc.start()
+    try:
+        CPPGrammar(cache_dir=None).compile_parse_table()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'stages': {'grammar': best}, 'peak_memory': {'grammar': peak, 'total': peak}}
+
+
+def measure_case(code, parser, repeat):
+    best = {}
+    tokens = None
+    for _ in range(repeat):
+        stats = PipelineStats()
+        tokens = run_pipeline(code, parser, stats)
+        for name, (_, wall, _) in stats.stages.items():
+            best[name] = min(best.get(name, wall), wall)
+    parser.tree = None
+    return {
+        'characters': len(code),
+        'tokens': len(tokens),
+        'stages': best,
+        'throughput': {
+            'tokenize_chars_per_second': len(code) / best['tokenize'] if best['tokenize'] else None,
+            'parse_tokens_per_second': len(tokens) / best['parse'] if best['parse'] else None,
+        },
+        'peak_memory': measure_memory(code, parser),
+    }
+
+
+def run_suite(seed=0, scale=1.0, repeat=5, only=None):
+    """اجرای همه موردها و بازگرداندن نتایج به صورت دیکشنری قابل ذخیره در JSON"""
+    parser = PredictiveParser(CPPGrammar().compile_parse_table())
+    results = {
+        'python': platform.python_version(),
+        'seed': seed,
+        'scale': scale,
+        'cases': {},
+    }
+    if only is None or 'grammar' in only:
+        results['cases']['grammar'] = measure_grammar(repeat)
+    for name, code in make_cases(seed, scale).items():
+        if only is None or name in only:
+            results['cases'][name] = measure_case(code, parser, repeat)
+    return results
+
+
+def compare(results, baseline, tolerance=0.25, memory_tolerance=0.10, min_seconds=0.001):
+    """لیست regressionها به صورت (مورد، معیار، مقدار baseline، مقدار فعلی)"""
+    regressions = []
+    for case, current in results['cases'].items():
+        old = baseline['cases'].get(case)
+        if old is None:
+            continue
+        for stage, seconds in current['stages'].items():
+            before = old['stages'].get(stage)
+            if before is not None and max(before, seconds) >= min_seconds and seconds > before * (1 + tolerance):
+                regressions.append((case, stage + ' time', before, seconds))
+        for stage, peak in current['peak_memory'].items():
+            before = old['peak_memory'].get(stage)
+            if before and peak > before * (1 + memory_tolerance):
+                regressions.append((case, stage + ' memory', before, peak))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    header = "{:<30} {:>10} {:>12} {:>12} {:>12} {:>12} {:>12} {:>12}"
+    print(header.format("Case", "Tokens", *(f"{stage} ms" for stage in ('grammar',) + STAGES), "Peak KiB"))
+    for case, result in results['cases'].items():
+        stages = result['stages']
+        cells = []
+        for stage in ('grammar',) + STAGES:
+            if stage not in stages:
+                cells.append('-')
+                continue
+            cell = f"{stages[stage] * 1e3:.2f}"
+            old = baseline and baseline['cases'].get(case, {}).get('stages', {}).get(stage)
+            if old:
+                cell += f" {stages[stage] / old:.2f}x"
+            cells.append(cell)
+        print(header.format(case, result.get('tokens', '-'), *cells, result['peak_memory']['total'] // 1024))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="بنچمارک مراحل توکنایز، جدول توکن، گرامر، تجزیه و درخت")
+    arg_parser.add_argument('--seed', type=int, default=0, help="بذر تولید پیکره")
+    arg_parser.add_argument('--scale', type=float, default=1.0, help="ضریب اندازه موردها")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="تعداد تکرار هر اندازه‌گیری زمان")
+    arg_parser.add_argument('--cases', help="فقط این موردها (با کاما جدا شده)")
+    arg_parser.add_argument('--output', help="نوشتن نتایج به صورت JSON (برای استفاده به عنوان baseline)")
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                            help="مقایسه با نتایج JSON ذخیره‌شده (پیش‌فرض benchmarks/baseline.json)")
+    arg_parser.add_argument('--no-baseline', action='store_true',
+                            help="بدون مقایسه؛ برای ساختن دوباره baseline مرجع با --output")
+    arg_parser.add_argument('--tolerance', type=float, default=0.25, help="کندی مجاز نسبت به baseline")
+    arg_parser.add_argument('--memory-tolerance', type=float, default=0.10, help="افزایش مجاز اوج حافظه")
+    arg_parser.add_argument('--min-seconds', type=float, default=0.001,
+                            help="زمان‌های کوتاه‌تر از این مقدار در مقایسه نادیده گرفته می‌شوند")
+    args = arg_parser.parse_args(argv)
+
+    baseline = None
+    if not args.no_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        # بدون پیکره یکسان مقایسه بی‌معناست، پس بذر و ضریب اندازه baseline استفاده می‌شوند
+        args.seed, args.scale = baseline['seed'], baseline['scale']
+
+    only = set(args.cases.split(',')) if args.cases else None
+    results = run_suite(args.seed, args.scale, args.repeat, only)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+
+    if baseline is None:
+        return 0
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance, args.min_seconds)
+    for case, metric, before, after in regressions:
+        print(f"REGRESSION {case}: {metric} {before:.6g} -> {after:.6g} ({after / before:.2f}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""آزمون بار سرویس server.py: تأخیر p50/p99 و تعداد درخواست در ثانیه
+
+چند کلاینت هم‌زمان (هر کدام یک اتصال) درخواست‌ها را پشت سر هم می‌فرستند و هر کدام پس از رسیدن
+پاسخ کامل قبلی درخواست بعدی را می‌فرستد. متن‌ها برنامه‌های benchmarks.corpus با اندازه‌های
+متفاوت‌اند و بخشی از آن‌ها عمداً خطای نحوی دارند. بدون --port یا --unix، سرور در همین فرایند
+روی یک درگاه آزاد اجرا می‌شود.
+
+    python -m benchmarks.load_server --requests 2000 --concurrency 32
+    python -m benchmarks.load_server --port 8765
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from server import CheckServer, CheckClient
+from benchmarks.corpus import generate_program
+
+
+def make_payloads(count, statements, error_rate, seed=0):
+    # count متن متفاوت؛ در هر 1/error_rate متن، یک ';' حذف می‌شود تا خطای نحوی داشته باشد
+    payloads = []
+    step = round(1 / error_rate) if error_rate else 0
+    for i in range(count):
+        code = generate_program(seed + i, 1 + (i * 7919) % statements)
+        if step and i % step == 0:
+            code = code.replace(';', '', 1)
+        payloads.append(code)
+    return payloads
+
+
+async def client_loop(connect, payloads, latencies, recover, tokens):
+    client = await connect()
+    try:
+        for code in payloads:
+            start = time.perf_counter()
+            await client.check(code, recover=recover, tokens=tokens)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await client.close()
+
+
+async def run(args):
+    server = None
+    if args.port is None and args.unix is None:
+        server = CheckServer(workers=args.workers, queue_size=args.queue_size)
+        _, port = (await server.start())[:2]
+        connect = lambda: CheckClient.connect(port=port)
+    elif args.unix is not None:
+        connect = lambda: CheckClient.connect(path=args.unix)
+    else:
+        connect = lambda: CheckClient.connect(args.host, args.port)
+
+    payloads = make_payloads(min(args.requests, 200), args.statements, args.error_rate)
+    schedule = [payloads[i % len(payloads)] for i in range(args.requests)]
+    latencies = []
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(connect, schedule[i::args.concurrency], latencies, args.recover,
+                                           not args.no_tokens)
+                               for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            await server.close()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{len(latencies)} requests, {args.concurrency} clients, "
+          f"~{sum(map(len, schedule)) / len(schedule):,.0f} chars/request")
+    print(f"throughput: {len(latencies) / elapsed:,.1f} req/s")
+    print("latency ms: p50 {:.2f}  p90 {:.2f}  p99 {:.2f}  max {:.2f}".format(
+        quantiles[49] * 1e3, quantiles[89] * 1e3, quantiles[98] * 1e3, max(latencies) * 1e3))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="آزمون بار سرویس بررسی کد")
+    arg_parser.add_argument('--requests', type=int, default=1000, help="تعداد کل درخواست‌ها")
+    arg_parser.add_argument('--concurrency', type=int, default=16, help="تعداد کلاینت‌های هم‌زمان")
+    arg_parser.add_argument('--statements', type=int, default=200, help="بیشترین تعداد دستور هر متن")
+    arg_parser.add_argument('--error-rate', type=float, default=0.1, help="نسبت متن‌های دارای خطا")
+    arg_parser.add_argument('--recover', action='store_true', help="درخواست همه خطاها به جای اولین خطا")
+    arg_parser.add_argument('--no-tokens', action='store_true', help="بدون فرستادن توکن‌ها در پاسخ")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, help="سرور در حال اجرا روی این درگاه")
+    arg_parser.add_argument('--unix', metavar='PATH', help="سرور در حال اجرا روی این سوکت یونیکس")
+    arg_parser.add_argument('-j', '--workers', type=int, default=None, help="کارگرهای سرور درون‌فرایندی")
+    arg_parser.add_argument('--queue-size', type=int, default=64, help="اندازه صف سرور درون‌فرایندی")
+    args = arg_parser.parse_args(argv)
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
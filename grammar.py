@@ -1,8 +1,20 @@
+import hashlib
+import json
+import os
+from array import array
 from collections import defaultdict
 
+# پوشه پیش‌فرض برای ذخیره جدول‌های محاسبه‌شده گرامر
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+
+# نسخه قالب فایل کش و الگوریتم‌های FIRST/FOLLOW و جدول تجزیه؛ با هر تغییر در آن‌ها یک واحد زیاد
+# می‌شود تا اثر انگشت و در نتیجه نام فایل کش عوض شود و جدول‌های کهنه خوانده نشوند
+CACHE_FORMAT_VERSION = 1
+
 
 class CPPGrammar:
-    def __init__(self):
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        # cache_dir پوشه‌ای است که FIRST/FOLLOW و جدول تجزیه در آن ذخیره می‌شوند؛ None یعنی بدون کش
         # تعریف تولیدات (Production Rules) برای دستور زبان
         # هر نماد غیر پایانی (Non-terminal) به تولیدات خود (کدام نمادها می‌توانند به آن تبدیل شوند) اشاره دارد
         self.productions = {
@@ -56,90 +68,87 @@ class CPPGrammar:
 
         # جدول تجزیه (Parse Table) که برای تجزیه ورودی استفاده خواهد شد
         self.parse_table = defaultdict(dict)
+        # نسخه عددی و فشرده جدول تجزیه که در اولین درخواست ساخته می‌شود
+        self._compiled_table = None
 
-        # محاسبه مجموعه‌های FIRST و FOLLOW
-        self.compute_first()
-        self.compute_follow()
+        # اثر انگشت گرامر؛ با هر تغییر در تولیدات، ترمینال‌ها یا نماد شروع عوض می‌شود
+        self.fingerprint = self.compute_fingerprint()
 
-        # ساخت جدول تجزیه با استفاده از مجموعه‌های FIRST و FOLLOW
-        self.build_parse_table()
+        # اگر جدول‌ها برای همین گرامر قبلاً ذخیره شده باشند، فقط از فایل خوانده می‌شوند
+        if not self.load_tables(cache_dir):
+            # محاسبه مجموعه‌های FIRST و FOLLOW
+            self.compute_first()
+            self.compute_follow()
+
+            # ساخت جدول تجزیه با استفاده از مجموعه‌های FIRST و FOLLOW
+            self.build_parse_table()
+            self.save_tables(cache_dir)
+
+    def compute_fingerprint(self):
+        # هش SHA-256 از نسخه قالب کش و نمایش مرتب و پایدار گرامر
+        data = json.dumps([CACHE_FORMAT_VERSION, self.start, self.productions, sorted(self.terminals)],
+                          sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def cache_path(self, cache_dir):
+        # مسیر فایل جدول‌های ذخیره‌شده برای این گرامر
+        return os.path.join(cache_dir, f'cppgrammar-{self.fingerprint[:16]}.json')
+
+    def load_tables(self, cache_dir):
+        # خواندن FIRST، FOLLOW و جدول تجزیه از فایل؛ اگر فایل نباشد یا معتبر نباشد False برمی‌گرداند
+        if cache_dir is None:
+            return False
+        try:
+            with open(self.cache_path(cache_dir), encoding='utf-8') as f:
+                data = json.load(f)
+            if data['fingerprint'] != self.fingerprint:
+                return False
+            first = {nt: set(symbols) for nt, symbols in data['first'].items()}
+            follow = {nt: set(symbols) for nt, symbols in data['follow'].items()}
+            parse_table = defaultdict(dict)
+            for nt, row in data['parse_table'].items():
+                # هر خانه جدول شماره تولید در self.productions[nt] است
+                parse_table[nt] = {term: self.productions[nt][index] for term, index in row.items()}
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return False
+        self.first, self.follow, self.parse_table = first, follow, parse_table
+        return True
+
+    def save_tables(self, cache_dir):
+        # ذخیره FIRST، FOLLOW و جدول تجزیه در یک فایل JSON فشرده
+        # خطای نوشتن (مثلاً پوشه فقط‌خواندنی) نادیده گرفته می‌شود، چون کش اختیاری است
+        if cache_dir is None:
+            return
+        data = {
+            'fingerprint': self.fingerprint,
+            'first': {nt: sorted(symbols) for nt, symbols in self.first.items()},
+            'follow': {nt: sorted(symbols) for nt, symbols in self.follow.items()},
+            'parse_table': {nt: {term: self.productions[nt].index(prod) for term, prod in row.items()}
+                            for nt, row in self.parse_table.items()},
+        }
+        path = self.cache_path(cache_dir)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            # جایگزینی اتمی تا پردازه‌های هم‌زمان فایل نیمه‌نوشته نبینند
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
 
     def compute_first(self):
         # محاسبه مجموعه FIRST برای هر نماد غیر پایانی
         # مجموعه FIRST نشان‌دهنده نمادهایی است که می‌توانند در ابتدای یک دنباله از نمادهای غیر پایانی ظاهر شوند
-        for nt in self.non_terminals:
-            self.first[nt] = set()  # برای هر نماد غیر پایانی، مجموعه FIRST آن را خالی می‌کنیم
-
-        updated = True
-        while updated:
-            updated = False
-            for nt in self.non_terminals:
-                for prod in self.productions[nt]:
-                    # اولین نماد در تولید (Production) را می‌گیریم
-                    first_symbol = prod[0]
-                    if first_symbol in self.terminals:
-                        # اگر اولین نماد یک نماد پایانی باشد، آن را به مجموعه FIRST اضافه می‌کنیم
-                        if first_symbol not in self.first[nt]:
-                            self.first[nt].add(first_symbol)
-                            updated = True
-                    else:
-                        # اگر اولین نماد یک نماد غیر پایانی باشد، مجموعه FIRST آن را می‌گیریم
-                        prev_len = len(self.first[nt])
-                        # مجموعه FIRST نماد غیر پایانی را با مجموعه FIRST نماد اول تولید به‌روزرسانی می‌کنیم
-                        self.first[nt].update(self.first[first_symbol] - {'ε'})
-                        if len(self.first[nt]) > prev_len:
-                            updated = True
-                        # اگر 'ε' در مجموعه FIRST نماد اول وجود داشته باشد، ادامه تولیدات بررسی می‌شود
-                        if 'ε' in self.first[first_symbol]:
-                            for sym in prod[1:]:
-                                if sym in self.terminals:
-                                    # اگر نماد بعدی پایانی باشد، به مجموعه FIRST اضافه می‌شود
-                                    if sym not in self.first[nt]:
-                                        self.first[nt].add(sym)
-                                        updated = True
-                                    break
-                                else:
-                                    # اگر نماد بعدی غیر پایانی باشد، مجموعه FIRST آن را اضافه می‌کنیم
-                                    prev_len = len(self.first[nt])
-                                    self.first[nt].update(self.first[sym] - {'ε'})
-                                    if len(self.first[nt]) > prev_len:
-                                        updated = True
-                                    if 'ε' not in self.first[sym]:
-                                        break
-                            else:
-                                # اگر تمامی نمادها 'ε' بودند، 'ε' را به مجموعه FIRST اضافه می‌کنیم
-                                if 'ε' not in self.first[nt]:
-                                    self.first[nt].add('ε')
-                                    updated = True
+        self.first = compute_first_sets(self.productions, self.terminals)
 
     def compute_follow(self):
         # محاسبه مجموعه FOLLOW برای هر نماد غیر پایانی
         # مجموعه FOLLOW نشان‌دهنده نمادهایی است که می‌توانند در انتهای یک دنباله از نمادهای غیر پایانی قرار گیرند
-        for nt in self.non_terminals:
-            self.follow[nt] = set()  # برای هر نماد غیر پایانی، مجموعه FOLLOW آن را خالی می‌کنیم
-        self.follow[self.start].add('$')  # نماد شروع باید '$' را در مجموعه FOLLOW خود داشته باشد
-
-        updated = True
-        while updated:
-            updated = False
-            for nt in self.non_terminals:
-                for prod in self.productions[nt]:
-                    for i, sym in enumerate(prod):
-                        if sym in self.non_terminals:
-                            # اگر نماد فعلی یک نماد غیر پایانی باشد، باید دنباله‌های بعدی آن را بررسی کنیم
-                            next_syms = prod[i + 1:]
-                            first_next = self.get_first_of_sequence(next_syms)  # FIRST دنباله بعدی را می‌گیریم
-                            prev_len = len(self.follow[sym])
-                            # مجموعه FOLLOW نماد را با FIRST دنباله بعدی به‌روزرسانی می‌کنیم
-                            self.follow[sym].update(first_next - {'ε'})
-                            if len(self.follow[sym]) > prev_len:
-                                updated = True
-                            # اگر 'ε' در FIRST دنباله بعدی باشد یا دنباله بعدی تهی باشد، باید FOLLOW نماد غیر پایانی اصلی را هم اضافه کنیم
-                            if 'ε' in first_next or len(next_syms) == 0:
-                                prev_len = len(self.follow[sym])
-                                self.follow[sym].update(self.follow[nt])
-                                if len(self.follow[sym]) > prev_len:
-                                    updated = True
+        self.follow = compute_follow_sets(self.productions, self.terminals, self.start, self.first)
 
     def get_first_of_sequence(self, seq):
         # محاسبه مجموعه FIRST برای یک دنباله از نمادها
@@ -173,3 +182,207 @@ class CPPGrammar:
                 if 'ε' in first_alpha and '$' in self.follow[nt]:
                     # اگر 'ε' و '$' در FOLLOW باشد، به جدول برای علامت پایان ('$', '$') هم اضافه می‌کنیم
                     self.parse_table[nt]['$'] = prod
+
+    def compile_parse_table(self):
+        # جدول تجزیه عددی برای پارسر؛ self.parse_table به عنوان نمای قابل خواندن باقی می‌ماند
+        if self._compiled_table is None:
+            self._compiled_table = CompiledParseTable(self.parse_table, self.start, self.follow)
+        return self._compiled_table
+
+
+class CompiledParseTable:
+    """جدول تجزیه LL(1) با نمادهای عددی و آرایه دوبعدی فشرده
+
+    هر نماد پایانی و غیرپایانی یک شماره کوچک دارد (پایانی‌ها از 0، سپس غیرپایانی‌ها).
+    خانه table[top * n_terminals + terminal] شماره تولید یا -1 است و سمت راست هر تولید
+    به صورت تاپل معکوس از شماره‌ها ذخیره شده، پس هر گام پارسر یک خواندن از آرایه و
+    یک جایگزینی برش روی پشته است.
+    """
+
+    def __init__(self, parse_table, start='Start', follow=None):
+        # جدول دیکشنری اصلی برای پیام‌های خطا و اشکال‌زدایی نگه داشته می‌شود
+        # follow (مجموعه‌های FOLLOW گرامر) اختیاری است و فقط در بازیابی از خطا استفاده می‌شود
+        self.parse_table = parse_table
+        non_terminals = sorted(parse_table)
+        terminals = set()
+        for row in parse_table.values():
+            terminals.update(row)
+            for prod in row.values():
+                terminals.update(sym for sym in prod if sym not in parse_table)
+        terminals.discard('ε')
+        terminals.discard('$')
+
+        # '$' شماره 0 دارد و آخرین ستون برای توکن‌هایی است که در گرامر نیستند (None)
+        self.symbols = ['$'] + sorted(terminals) + [None] + non_terminals
+        self.n_terminals = len(terminals) + 2
+        self.end = 0
+        self.unknown = self.n_terminals - 1
+        self.symbol_ids = {sym: i for i, sym in enumerate(self.symbols) if sym is not None}
+        # فقط نمادهای پایانی؛ برای تبدیل نماد ورودی به شماره ستون
+        self.terminal_ids = {sym: i for i, sym in enumerate(self.symbols[:self.n_terminals]) if sym is not None}
+        self.start = self.symbol_ids[start]
+
+        # تولیدات یکتا: (غیرپایانه، قاعده تولید) و سمت راست معکوس و عددی آن
+        self.productions = []
+        self.reversed_rhs = []
+        production_ids = {}
+        self.table = array('i', [-1]) * (len(self.symbols) * self.n_terminals)
+        for nt in non_terminals:
+            base = self.symbol_ids[nt] * self.n_terminals
+            for term, prod in parse_table[nt].items():
+                key = (nt, id(prod))
+                if key not in production_ids:
+                    production_ids[key] = len(self.productions)
+                    self.productions.append((nt, prod))
+                    self.reversed_rhs.append(tuple(self.symbol_ids[sym] for sym in reversed(prod) if sym != 'ε'))
+                self.table[base + self.symbol_ids[term]] = production_ids[key]
+
+        # FOLLOW هر غیرپایانه به صورت مجموعه شماره نمادهای پایانی (اندیس با شماره غیرپایانه)
+        # بدون follow همه مجموعه‌ها خالی‌اند و has_follow نادرست است
+        self.has_follow = follow is not None
+        self.follow = [frozenset()] * len(self.symbols)
+        for nt, terminals in (follow or {}).items():
+            if nt in self.symbol_ids:
+                self.follow[self.symbol_ids[nt]] = frozenset(
+                    self.terminal_ids[term] for term in terminals if term in self.terminal_ids)
+
+    def compute_fingerprint(self):
+        # هش SHA-256 از محتوای جدول (نمادها، تولیدات و خانه‌ها)؛ برای کلید نتایجی که با این جدول محاسبه می‌شوند
+        data = json.dumps([CACHE_FORMAT_VERSION, self.symbols, self.start, self.productions, self.table.tolist()],
+                          ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def terminal_id(self, terminal):
+        # شماره نماد پایانی؛ نمادهای ناشناخته شماره ستون unknown را می‌گیرند
+        return self.terminal_ids.get(terminal, self.unknown)
+
+    def lookup(self, non_terminal, terminal):
+        # تولید متناظر با (غیرپایانه، پایانی) یا None
+        index = self.table[self.symbol_ids[non_terminal] * self.n_terminals + self.terminal_id(terminal)]
+        return None if index < 0 else self.productions[index][1]
+
+
+def _propagate(sets, edges, worklist):
+    # انتشار تغییرات در گراف وابستگی: اگر B -> A یالی باشد، sets[B] زیرمجموعه sets[A] است
+    # فقط نمادهای تازه‌اضافه‌شده (delta) منتشر می‌شوند و فقط غیرپایانه‌های متأثر دوباره بررسی می‌شوند
+    pending = {nt: set(sets[nt]) for nt in worklist}
+    worklist = list(worklist)
+    while worklist:
+        source = worklist.pop()
+        delta = pending.pop(source)
+        for target in edges.get(source, ()):
+            new = delta - sets[target]
+            if new:
+                sets[target] |= new
+                if target in pending:
+                    pending[target] |= new
+                else:
+                    pending[target] = new
+                    worklist.append(target)
+
+
+def compute_nullable(productions, terminals):
+    """مجموعه غیرپایانه‌هایی که می‌توانند به ε تبدیل شوند (با شمارش نمادهای باقی‌مانده هر تولید)"""
+    nullable = set()
+    # برای هر تولید، تعداد نمادهایی که هنوز تهی‌پذیر بودنشان معلوم نیست
+    remaining = []
+    occurrences = defaultdict(list)  # غیرپایانه -> شماره تولیدهایی که در آن‌ها آمده است
+    worklist = []
+    for nt, prods in productions.items():
+        for prod in prods:
+            symbols = [sym for sym in prod if sym != 'ε']
+            if any(sym in terminals for sym in symbols):
+                continue  # تولیدی که نماد پایانی دارد هرگز تهی نیست
+            index = len(remaining)
+            remaining.append([nt, len(symbols)])
+            for sym in symbols:
+                occurrences[sym].append(index)
+            if not symbols and nt not in nullable:
+                nullable.add(nt)
+                worklist.append(nt)
+    while worklist:
+        sym = worklist.pop()
+        for index in occurrences[sym]:
+            entry = remaining[index]
+            entry[1] -= 1
+            if entry[1] == 0 and entry[0] not in nullable:
+                nullable.add(entry[0])
+                worklist.append(entry[0])
+    return nullable
+
+
+def compute_first_sets(productions, terminals):
+    """محاسبه مجموعه‌های FIRST با حل‌کننده مبتنی بر لیست کار (worklist)
+
+    برای هر تولید A -> X1 ... Xn، تا جایی که پیشوند تهی‌پذیر است، نمادهای پایانی مستقیماً به FIRST(A)
+    اضافه می‌شوند و برای هر غیرپایانه Xi یال Xi -> A ساخته می‌شود. سپس تغییرات فقط در طول یال‌ها
+    منتشر می‌شوند و هر تولید تنها یک بار پیمایش می‌شود.
+    """
+    nullable = compute_nullable(productions, terminals)
+    first = {nt: set() for nt in productions}
+    edges = defaultdict(set)
+    for nt, prods in productions.items():
+        for prod in prods:
+            for sym in prod:
+                if sym == 'ε':
+                    continue
+                if sym in terminals:
+                    first[nt].add(sym)
+                    break
+                edges[sym].add(nt)
+                if sym not in nullable:
+                    break
+    _propagate(first, edges, [nt for nt in first if first[nt]])
+    # ε منتشر نمی‌شود؛ تهی‌پذیری جداگانه محاسبه شده است
+    for nt in nullable:
+        first[nt].add('ε')
+    return first
+
+
+def compute_suffix_first(productions, terminals, first):
+    """FIRST هر پسوند هر تولید: suffix[nt][k][i] برابر FIRST(productions[nt][k][i:]) است
+
+    مجموعه‌ها از راست به چپ و یک بار برای هر تولید ساخته می‌شوند؛ پسوند خالی {'ε'} است.
+    """
+    suffix = {}
+    for nt, prods in productions.items():
+        rows = []
+        for prod in prods:
+            sets = [None] * len(prod) + [{'ε'}]
+            for i in range(len(prod) - 1, -1, -1):
+                sym = prod[i]
+                if sym == 'ε':
+                    sets[i] = sets[i + 1]
+                elif sym in terminals:
+                    sets[i] = {sym}
+                elif 'ε' in first[sym]:
+                    sets[i] = (first[sym] - {'ε'}) | sets[i + 1]
+                else:
+                    sets[i] = first[sym]
+            rows.append(sets)
+        suffix[nt] = rows
+    return suffix
+
+
+def compute_follow_sets(productions, terminals, start, first):
+    """محاسبه مجموعه‌های FOLLOW با حل‌کننده مبتنی بر لیست کار (worklist)
+
+    برای هر رخداد B در A -> α B β، مقدار FIRST(β) - {ε} یک بار از روی FIRST پسوندهای از پیش
+    محاسبه‌شده به FOLLOW(B) اضافه می‌شود و اگر β تهی‌پذیر باشد یال A -> B ساخته می‌شود.
+    """
+    follow = {nt: set() for nt in productions}
+    follow[start].add('$')
+    suffix = compute_suffix_first(productions, terminals, first)
+    edges = defaultdict(set)
+    for nt, prods in productions.items():
+        for prod, sets in zip(prods, suffix[nt]):
+            for i, sym in enumerate(prod):
+                if sym in productions:
+                    rest = sets[i + 1]
+                    follow[sym].update(rest)
+                    if 'ε' in rest:
+                        follow[sym].discard('ε')
+                        if sym != nt:
+                            edges[nt].add(sym)
+    _propagate(follow, edges, [nt for nt in follow if follow[nt]])
+    return follow
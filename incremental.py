@@ -0,0 +1,396 @@
+"""توکنایز و تجزیه افزایشی یک سند پس از ویرایش‌های کوچک (مثلاً در ویرایشگر)
+
+پس از هر ویرایش (offset، طول حذف‌شده، متن درج‌شده) فقط از آخرین مرز امن توکن‌ها (وضعیت start)
+دوباره توکنایز می‌شود تا جایی که جریان توکن‌ها دوباره با جریان قبلی هم‌راستا شود. سپس تجزیه از
+آخرین وضعیت ذخیره‌شده پارسر پیش از ناحیه تغییر (مرز دستورها) ادامه می‌یابد تا جایی که پشته با
+وضعیت ذخیره‌شده قبلی برابر شود و بقیه تولیدات بدون تغییر استفاده می‌شوند.
+
+توکن‌ها، موقعیت آن‌ها، تولیدات و وضعیت‌های پارسر مانند بافر شکاف‌دار نگه داشته می‌شوند: موارد
+پیش از شکاف به ترتیب و با موقعیت مطلق و موارد پس از آن به ترتیب معکوس و با فاصله از انتهای سند،
+پس ویرایش نیازی به جابه‌جا کردن موارد بعد از خود ندارد و فقط فاصله بین دو ویرایش متوالی پیمایش
+می‌شود. متن در تکه‌های حداکثر چند ده کیلوبایتی نگه داشته می‌شود و ویرایش فقط تکه‌های محل ویرایش
+را دوباره می‌سازد. ویژگی‌های text، tokens و productions کل سند را کپی می‌کنند و برای خواندن
+گاه‌به‌گاه‌اند، نه برای هر ویرایش.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from lexical_analyzer import CompiledTokenizer, TOKEN_TYPE_IDS
+from predictive_parser import PredictiveParser, VALUE_TOKEN_TYPES, token_terminal
+
+# مقدار کار انجام‌شده در یک ویرایش: تعداد توکن‌های دوباره ساخته‌شده و تولیدات دوباره تجزیه‌شده
+EditStats = namedtuple('EditStats', ['relexed', 'reparsed'])
+
+# پس از انتقال این نمادها (مرز دستورها و بلوک‌ها) وضعیت پارسر ذخیره می‌شود
+CHECKPOINT_SYMBOLS = frozenset({';', '{', '}'})
+
+# اندازه تکه‌های متن سند؛ تکه‌ای که با درج از دو برابر این اندازه بزرگ‌تر شود تقسیم می‌شود
+TEXT_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkedText:
+    # متن سند به صورت لیست تکه‌ها و موقعیت شروع هر تکه
+    def __init__(self, text):
+        self.chunks = [text[i:i + TEXT_CHUNK_SIZE] for i in range(0, len(text), TEXT_CHUNK_SIZE)] or ['']
+        self.starts = list(range(0, len(text), TEXT_CHUNK_SIZE)) or [0]
+        self.size = len(text)
+
+    def __str__(self):
+        return ''.join(self.chunks)
+
+    def _chunk(self, offset):
+        # شماره تکه‌ای که offset در آن است (offset برابر طول متن در تکه آخر)
+        return bisect_right(self.starts, offset) - 1
+
+    def slice(self, start, end):
+        # متن بین start و end
+        if start >= end:
+            return ''
+        i, j = self._chunk(start), self._chunk(end - 1)
+        chunks, starts = self.chunks, self.starts
+        if i == j:
+            return chunks[i][start - starts[i]:end - starts[i]]
+        return ''.join([chunks[i][start - starts[i]:], *chunks[i + 1:j], chunks[j][:end - starts[j]]])
+
+    def replace(self, offset, deleted, inserted):
+        # جایگزینی deleted کاراکتر از offset با inserted؛ فقط تکه‌های درگیر دوباره ساخته می‌شوند
+        # و موقعیت شروع تکه‌های بعدی جابه‌جا می‌شود
+        chunks, starts = self.chunks, self.starts
+        end = offset + deleted
+        i, j = self._chunk(offset), self._chunk(end)
+        merged = chunks[i][:offset - starts[i]] + inserted + chunks[j][end - starts[j]:]
+        if len(merged) > 2 * TEXT_CHUNK_SIZE:
+            pieces = [merged[k:k + TEXT_CHUNK_SIZE] for k in range(0, len(merged), TEXT_CHUNK_SIZE)]
+        elif merged or j - i + 1 == len(chunks):
+            pieces = [merged]
+        else:
+            pieces = []
+        delta = len(inserted) - deleted
+        position = starts[i]
+        new_starts = []
+        for piece in pieces:
+            new_starts.append(position)
+            position += len(piece)
+        starts[i:] = new_starts + [start + delta for start in starts[j + 1:]]
+        chunks[i:j + 1] = pieces
+        self.size += delta
+
+    def line_column(self, offset):
+        # (خط، ستون) یک‌مبنا برای offset؛ همه تکه‌های پیش از آن پیمایش می‌شوند
+        chunks, starts = self.chunks, self.starts
+        i = self._chunk(offset)
+        local = offset - starts[i]
+        line = 1 + chunks[i].count('\n', 0, local) + sum(chunk.count('\n') for chunk in chunks[:i])
+        newline = chunks[i].rfind('\n', 0, local)
+        if newline >= 0:
+            return line, local - newline
+        for k in range(i - 1, -1, -1):
+            newline = chunks[k].rfind('\n')
+            if newline >= 0:
+                return line, offset - starts[k] - newline
+        return line, offset + 1
+
+
+def _move_items(head, tail, gap):
+    # جابه‌جایی شکاف یک لیست شکاف‌دار تا head دقیقاً gap مورد اول را داشته باشد (tail معکوس است)
+    if len(head) > gap:
+        tail.extend(reversed(head[gap:]))
+        del head[gap:]
+    elif len(head) < gap:
+        count = gap - len(head)
+        head.extend(reversed(tail[-count:]))
+        del tail[-count:]
+
+
+class IncrementalDocument:
+    def __init__(self, parse_table, text=''):
+        # parse_table مانند PredictiveParser جدول دیکشنری یا CompiledParseTable است
+        self.parser = PredictiveParser(parse_table)
+        self.tokenizer = CompiledTokenizer()
+        self._text = _ChunkedText(text)
+        self._rebuild()
+
+    @property
+    def text(self):
+        # متن فعلی سند (کپی کامل)
+        return str(self._text)
+
+    @property
+    def tokens(self):
+        # لیست توکن‌های سند (کپی کامل)
+        return self._tokens + self._tail_tokens[::-1]
+
+    @property
+    def productions(self):
+        # لیست تولیدات سند (کپی کامل)
+        return self._productions + self._tail_productions[::-1]
+
+    def _token_count(self):
+        return len(self._tokens) + len(self._tail_tokens)
+
+    def _token(self, index):
+        # توکن شماره index در دو طرف شکاف
+        if index < len(self._tokens):
+            return self._tokens[index]
+        return self._tail_tokens[self._token_count() - 1 - index]
+
+    @property
+    def error(self):
+        # خطای سند فعلی (ValueError برای خطای واژگانی، SyntaxError با خط و ستون) یا None
+        if self._error is None:
+            return None
+        kind, message, tokens_from_end = self._error
+        if kind == 'lexical':
+            return ValueError(message)
+        n = self._token_count()
+        index = n - tokens_from_end
+        offset = self._start(index) if index < n else self._text.size
+        line, column = self._text.line_column(offset)
+        return SyntaxError(f"{message} (خط {line}، ستون {column})")
+
+    def edit(self, offset, deleted, inserted):
+        """اعمال یک ویرایش: حذف deleted کاراکتر از offset و درج inserted به جای آن
+
+        توکن‌ها، تولیدات و خطای سند به‌روز می‌شوند و EditStats برگردانده می‌شود.
+        """
+        size = self._text.size
+        if offset < 0 or deleted < 0 or offset + deleted > size:
+            raise ValueError(f"ویرایش خارج از محدوده متن: {offset}، {deleted}")
+        self._text.replace(offset, deleted, inserted)
+        if self._error is not None and self._error[0] == 'lexical':
+            # پس از خطای واژگانی جریان توکن قبلی وجود ندارد و سند دوباره کامل ساخته می‌شود
+            self._rebuild()
+            return EditStats(self._token_count(), len(self._productions))
+
+        n_old = self._token_count()
+        m_old = len(self._productions) + len(self._tail_productions)
+        try:
+            first, stop, restart, store, count = self._relex(size, offset, deleted, len(inserted) - deleted)
+        except ValueError as e:
+            self._set_lexical_error(e)
+            return EditStats(0, 0)
+
+        # وضعیت‌های ذخیره‌شده پارسر: موارد بعد از first به بخش انتهایی می‌روند و موارد مربوط به
+        # توکن‌های جایگزین‌شده (first تا stop) حذف می‌شوند؛ وضعیت پیش از توکن stop معتبر می‌ماند
+        self._move_checkpoint_gap(first, n_old, m_old)
+        tail = self._tail_checkpoints
+        while tail and tail[-1][0] > n_old - stop:
+            tail.pop()
+
+        # جایگزینی توکن‌ها و موقعیت‌ها؛ توکن‌های first تا stop آخرین موارد بخش انتهایی‌اند و
+        # موقعیت توکن‌های بعدی نسبت به انتهای متن ثابت مانده است
+        new_tokens = list(store)[:count]
+        replaced = len(self._tail_tokens) - (stop - first)
+        del self._tail_tokens[replaced:], self._tail_starts[replaced:], self._tail_ends[replaced:]
+        self._tokens.extend(new_tokens)
+        self._starts.extend([restart + start for start in store.starts[:count]])
+        self._ends.extend([restart + end for end in store.ends[:count]])
+
+        # تجزیه دوباره از آخرین وضعیت ذخیره‌شده پیش از first؛ شکاف تولیدات به همان وضعیت می‌رود
+        index, produced, stack = self._checkpoints[-1]
+        _move_items(self._productions, self._tail_productions, produced)
+        old_error = self._error
+        self._error = None
+        middle, prods_from_end = self._parse(index, list(stack), produced)
+        if prods_from_end is None:
+            self._tail_productions.clear()
+        else:
+            # پشته با وضعیت قبلی برابر شد: بقیه تولیدات و خطای قبلی (اگر بود) همان قبلی‌اند
+            del self._tail_productions[prods_from_end:]
+            self._error = old_error
+        self._productions.extend(middle)
+        return EditStats(len(new_tokens), len(middle))
+
+    def _rebuild(self):
+        # توکنایز و تجزیه کامل سند
+        self._tail_starts = array('I')
+        self._tail_ends = array('I')
+        self._tail_checkpoints = []  # (فاصله توکن از انتها، فاصله تولید از انتها، پشته)
+        self._tail_tokens = []
+        self._tail_productions = []
+        try:
+            store = self.tokenizer.tokenize_store(str(self._text))
+        except ValueError as e:
+            self._set_lexical_error(e)
+            return
+        self._tokens = list(store)
+        self._starts = store.starts
+        self._ends = store.ends
+        compiled = self.parser.compiled_table
+        stack = (compiled.end, compiled.start)
+        self._checkpoints = [(0, 0, stack)]  # (شماره توکن، تعداد تولیدات، پشته)
+        self._error = None
+        self._productions, _ = self._parse(0, list(stack), 0)
+
+    def _set_lexical_error(self, error):
+        # سند با خطای واژگانی توکن و تولیدی ندارد
+        self._tokens = []
+        self._tail_tokens = []
+        self._productions = []
+        self._tail_productions = []
+        self._starts = array('I')
+        self._ends = array('I')
+        self._tail_starts = array('I')
+        self._tail_ends = array('I')
+        self._checkpoints = []
+        self._tail_checkpoints = []
+        self._error = ('lexical', str(error), 0)
+
+    def _start(self, index):
+        # موقعیت شروع توکن شماره index در متن فعلی
+        if index < len(self._starts):
+            return self._starts[index]
+        return self._text.size - self._tail_starts[self._token_count() - 1 - index]
+
+    def _move_gap(self, gap, size):
+        # جابه‌جایی شکاف توکن‌ها و موقعیت‌ها تا gap توکن اول با موقعیت مطلق نگه داشته شوند
+        # بخش انتهایی معکوس و بر حسب فاصله از انتهای متن (به طول size) ذخیره شده است
+        _move_items(self._tokens, self._tail_tokens, gap)
+        starts, ends = self._starts, self._ends
+        tail_starts, tail_ends = self._tail_starts, self._tail_ends
+        if len(starts) > gap:
+            tail_starts.extend([size - start for start in reversed(starts[gap:])])
+            tail_ends.extend([size - end for end in reversed(ends[gap:])])
+            del starts[gap:], ends[gap:]
+        elif len(starts) < gap:
+            count = gap - len(starts)
+            starts.extend([size - start for start in reversed(tail_starts[-count:])])
+            ends.extend([size - end for end in reversed(tail_ends[-count:])])
+            del tail_starts[-count:], tail_ends[-count:]
+
+    def _move_checkpoint_gap(self, index, n, m):
+        # وضعیت‌های پارسر تا توکن index با شماره مطلق و بعد از آن با فاصله از انتها نگه داشته می‌شوند
+        checkpoints, tail = self._checkpoints, self._tail_checkpoints
+        while checkpoints[-1][0] > index:
+            position, produced, stack = checkpoints.pop()
+            tail.append((n - position, m - produced, stack))
+        while tail and n - tail[-1][0] <= index:
+            tokens_from_end, prods_from_end, stack = tail.pop()
+            checkpoints.append((n - tokens_from_end, m - prods_from_end, stack))
+
+    def _relex(self, size, offset, deleted, delta):
+        """توکنایز دوباره ناحیه ویرایش‌شده؛ متن سند ویرایش شده و size طول متن پیش از ویرایش است
+
+        (first، stop، restart، store، count) برمی‌گرداند: توکن‌های قدیمی first تا stop با count
+        توکن اول store جایگزین می‌شوند و موقعیت‌های store نسبت به restart در متن جدید هستند.
+        """
+        text = self._text
+        n = self._token_count()
+
+        # اولین توکنی که ممکن است تغییر کند: اولین توکنی که انتهایش به offset رسیده است
+        # (درج چسبیده به یک توکن ممکن است آن را ادامه دهد)
+        if self._ends and self._ends[-1] >= offset:
+            first = bisect_left(self._ends, offset)
+        else:
+            first = n - bisect_right(self._tail_ends, size - offset)
+        # بعد از پیش‌پردازنده وضعیت start نیست ('#include <...>')، پس از خود آن شروع می‌شود
+        while first > 0 and self._token(first - 1)[0] == 'PREPROCESSOR':
+            first -= 1
+        self._move_gap(first, size)
+        tokens = self._tail_tokens  # پس از جابه‌جایی شکاف، توکن شماره i (i >= first) در tokens[n - 1 - i] است
+        restart = offset
+        if first < n:
+            start = size - self._tail_starts[n - 1 - first]
+            if tokens[n - 1 - first][0] == 'STRING':
+                # محدوده توکن رشته فقط محتوای آن است؛ توکنایز از گیومه آغازین شروع می‌شود
+                start -= 1
+            restart = min(restart, start)
+
+        # نقطه هم‌راستایی: توکن قدیمی stop بعد از ناحیه حذف‌شده که از وضعیت start شروع شده باشد
+        # و توکنایز دوباره تا انتهای آن همان توکن را در همان موقعیت بسازد؛ از آنجا به بعد همه
+        # توکن‌ها همان توکن‌های قبلی‌اند. فاصله نقاط آزموده‌شده هر بار دو برابر می‌شود.
+        tail_starts, tail_ends = self._tail_starts, self._tail_ends
+        stop = n - bisect_right(tail_starts, size - offset - deleted)
+        step = 1
+        while True:
+            while stop < n and (tokens[n - 1 - stop][0] == 'HEADER'
+                                or (stop > 0 and self._token(stop - 1)[0] == 'PREPROCESSOR')):
+                stop += 1
+            if stop >= n:
+                break
+            start = size - tail_starts[n - 1 - stop] + delta - restart
+            end = size - tail_ends[n - 1 - stop] + delta - restart
+            try:
+                store = self.tokenizer.tokenize_store(text.slice(restart, restart + end))
+            except ValueError:
+                store = None
+            if (store is not None and len(store) and store.starts[-1] == start and store.ends[-1] == end
+                    and store.types[-1] == TOKEN_TYPE_IDS[tokens[n - 1 - stop][0]]
+                    and (len(store) < 2 or store.types[-2] != TOKEN_TYPE_IDS['PREPROCESSOR'])):
+                return first, stop, restart, store, len(store) - 1
+            stop += step
+            step *= 2
+
+        # هم‌راستایی پیدا نشد: بقیه متن دوباره توکنایز می‌شود
+        store = self.tokenizer.tokenize_store(text.slice(restart, text.size))
+        return first, n, restart, store, len(store)
+
+    def _parse(self, index, stack, produced):
+        """تجزیه از توکن index با پشته stack تا پایان ورودی یا هم‌راستایی با وضعیت ذخیره‌شده قبلی
+
+        (تولیدات جدید، فاصله تولید از انتها در نقطه هم‌راستایی یا None) برمی‌گرداند.
+        produced تعداد تولیدات پیش از index است و در وضعیت‌های ذخیره‌شده جدید استفاده می‌شود.
+        """
+        # توکن شماره i پیش از شکاف در head[i] و پس از آن در tail_tokens[last - i] است
+        head, tail_tokens = self._tokens, self._tail_tokens
+        split = len(head)
+        n = split + len(tail_tokens)
+        last = n - 1
+        checkpoints, tail = self._checkpoints, self._tail_checkpoints
+        compiled = self.parser.compiled_table
+        table = compiled.table
+        n_terminals = compiled.n_terminals
+        reversed_rhs = compiled.reversed_rhs
+        productions = compiled.productions
+        terminal_ids = compiled.terminal_ids
+        symbols = compiled.symbols
+        unknown = compiled.unknown
+        end = compiled.end
+        middle = []
+        emit = middle.append
+
+        token = (head[index] if index < split else tail_tokens[last - index]) if index < n else None
+        if token is None:
+            current = end
+        else:
+            current = terminal_ids.get(token[1] if token[0] in VALUE_TOKEN_TYPES else token[0], unknown)
+        while True:
+            top = stack[-1]
+
+            if top < n_terminals:
+                if top == current:
+                    if top == end:
+                        tail.clear()
+                        return middle, None
+                elif token is None or token[0] != 'NUMBER' or symbols[top] != token[1]:
+                    # فقط عددی که مقدارش خود نماد است (مثل '0' در return 0) با مقدار تطبیق داده می‌شود
+                    self._error = ('syntax', f"خطای نحوی: غیرپایانه ناشناخته {symbols[top]}", n - index)
+                    tail.clear()
+                    return middle, None
+                stack.pop()
+                index += 1
+                if token[1] in CHECKPOINT_SYMBOLS:
+                    # مرز دستور: اگر وضعیت با وضعیت قبلی در همین توکن برابر باشد، بقیه تجزیه تکراری است
+                    tokens_from_end = n - index
+                    while tail and tail[-1][0] > tokens_from_end:
+                        tail.pop()
+                    state = tuple(stack)
+                    if tail and tail[-1][0] == tokens_from_end and tail[-1][2] == state:
+                        return middle, tail[-1][1]
+                    checkpoints.append((index, produced + len(middle), state))
+                token = (head[index] if index < split else tail_tokens[last - index]) if index < n else None
+                if token is None:
+                    current = end
+                else:
+                    current = terminal_ids.get(token[1] if token[0] in VALUE_TOKEN_TYPES else token[0], unknown)
+            else:
+                rule = table[top * n_terminals + current]
+                if rule < 0:
+                    current_input = '$' if token is None else token_terminal(token)
+                    expected = list(self.parser.parse_table[symbols[top]].keys())
+                    self._error = ('syntax', f"خطای نحوی در {current_input}. انتظار می‌رفت: {expected}", n - index)
+                    tail.clear()
+                    return middle, None
+                stack[-1:] = reversed_rhs[rule]
+                emit(productions[rule])
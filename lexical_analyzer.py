@@ -1,8 +1,30 @@
+import codecs
+import mmap
 import re
-from collections import deque, defaultdict
+from array import array
+from bisect import bisect_right
+
+# نمادهای تک‌کاراکتری و چندکاراکتری زبان
+SINGLE_SYMBOLS = frozenset({'(', ')', '{', '}', '[', ']', ',', ';', '+', '-', '*', '/', '='})
+MULTI_SYMBOLS = frozenset({'==', '!=', '>=', '<=', '>>', '<<', '||', '&&'})
+# کاراکترهایی که ممکن است شروع یک نماد چندکاراکتری باشند
+MULTI_STARTS = frozenset({'<', '>', '!', '|', '&', '='})
+# انواع توکن؛ شماره هر نوع در TokenStore همان اندیس آن در این تاپل است
+# ERROR فقط در حالت recover تولید می‌شود: کاراکتر نامعتبر، یا رشته/هدر ناتمام تا انتهای ورودی
+TOKEN_TYPES = ('PREPROCESSOR', 'HEADER', 'RESERVEDWORD', 'IDENTIFIER', 'NUMBER', 'STRING', 'SYMBOL', 'ERROR')
+TOKEN_TYPE_IDS = {name: i for i, name in enumerate(TOKEN_TYPES)}
+# لیست کلمات رزرو شده
+RESERVED_WORDS = frozenset({'int', 'float', 'void', 'return', 'if', 'while',
+                            'cin', 'cout', 'continue', 'break', 'include',
+                            'using', 'iostream', 'namespace', 'std', 'main'})
+
 
 class DFATokenizer:
-    def __init__(self):
+    def __init__(self, recover=False, state_chars=None):
+        # با recover، خطای واژگانی به جای ValueError یک توکن ERROR تولید می‌کند و توکنایز ادامه می‌یابد
+        # state_chars (مثلاً یک Counter) اختیاری است: وضعیت -> تعداد کاراکترهای ورودی پردازش‌شده در آن
+        self.recover = recover
+        self.state_chars = state_chars
         # وضعیت فعلی تجزیه را به حالت شروع تعیین می‌کند
         self.state = 'start'
         # لیستی برای ذخیره توکن‌های شناسایی‌شده
@@ -11,8 +33,8 @@ class DFATokenizer:
         self.current_token = ''
         # دیکشنری که نمادهای تک و چندکلمه‌ای را تعریف می‌کند
         self.symbols = {
-            'single': {'(', ')', '{', '}', '[', ']', ',', ';', '+', '-', '*', '/', '='},
-            'multi': {'==', '!=', '>=', '<=', '>>', '<<', '||', '&&'}
+            'single': set(SINGLE_SYMBOLS),
+            'multi': set(MULTI_SYMBOLS)
         }
 
     def transition(self, char):
@@ -21,25 +43,29 @@ class DFATokenizer:
         if self.state == 'start':
             # اگر کاراکتر '# ' باشد، وارد وضعیت پیش‌پردازنده می‌شویم
             if char == '#':
-                self.begin_token('preprocessor')
+                self.begin_token('preprocessor', char)
             # اگر کاراکتر حرف باشد یا زیرخط (_) باشد، وارد وضعیت شناسه می‌شویم
             elif char.isalpha() or char == '_':
-                self.begin_token('identifier')
+                self.begin_token('identifier', char)
             # اگر کاراکتر عدد باشد، وارد وضعیت عدد می‌شویم
             elif char.isdigit():
-                self.begin_token('number')
-            # اگر کاراکتر " باشد، وارد وضعیت رشته می‌شویم
+                self.begin_token('number', char)
+            # اگر کاراکتر " باشد، وارد وضعیت رشته می‌شویم (خود " جزو مقدار رشته نیست)
             elif char == '"':
                 self.begin_token('string')
+            # اگر کاراکتر یکی از این کاراکترها باشد، احتمالاً نماد چندکلمه‌ای داریم
+            # (این بررسی قبل از نمادهای تک انجام می‌شود تا '==' هم شناسایی شود)
+            elif char in MULTI_STARTS:
+                self.begin_token('potential_multi', char)
             # اگر کاراکتر نماد تک باشد (مثل پرانتز، کاما و ...)، توکن نماد تولید می‌کنیم
             elif char in self.symbols['single']:
                 self.emit_token('symbol', char)
-            # اگر کاراکتر یکی از این کاراکترها باشد، احتمالاً نماد چندکلمه‌ای داریم
-            elif char in ['<', '>', '!', '|', '&']:
-                self.begin_token('potential_multi')
             # اگر کاراکتر فاصله باشد، هیچ عملی انجام نمی‌دهیم
             elif char.isspace():
                 pass
+            elif self.recover:
+                # در حالت recover کاراکتر نامعتبر به صورت توکن ERROR گزارش می‌شود
+                self.emit_token('error', char)
             else:
                 raise ValueError(f'Invalid character: {char}')  # اگر کاراکتر معتبر نباشد، خطا می‌دهیم
 
@@ -82,18 +108,29 @@ class DFATokenizer:
                 self.reset_and_process(char)
 
         elif self.state == 'preprocessor':
-            # اگر در وضعیت پیش‌پردازنده باشیم و کاراکتر < باشد، وارد وضعیت هدر می‌شویم
+            # اگر در وضعیت پیش‌پردازنده باشیم و کاراکتر < باشد، توکن پیش‌پردازنده تولید شده و وارد وضعیت هدر می‌شویم
             if char == '<':
-                self.current_token += char
-                self.state = 'header_body'
+                self.emit_token('preprocessor')
+                self.begin_token('header_body', char)
             # اگر کاراکتر فاصله باشد، توکن پیش‌پردازنده تولید می‌شود
             elif char.isspace():
+                directive = self.current_token
                 self.emit_token('preprocessor')
-                self.state = 'start'
+                # بعد از #include ممکن است پس از چند فاصله، هدر (مثل <iostream>) بیاید
+                if directive == '#include':
+                    self.state = 'include'
             else:
                 # در غیر این صورت، کاراکتر را به توکن پیش‌پردازنده اضافه می‌کنیم
                 self.current_token += char
 
+        elif self.state == 'include':
+            # فاصله‌های بین #include و هدر نادیده گرفته می‌شوند
+            if char == '<':
+                self.begin_token('header_body', char)
+            elif not char.isspace():
+                # اگر هدری نیامد، کاراکتر در وضعیت شروع پردازش می‌شود
+                self.reset_and_process(char)
+
         elif self.state == 'header_body':
             # در اینجا هدر را پردازش می‌کنیم و وقتی به > برسیم، توکن هدر تولید می‌شود
             self.current_token += char
@@ -102,15 +139,40 @@ class DFATokenizer:
                 self.state = 'start'
 
     def tokenize(self, code):
-        # در این متد، کد ورودی را کاراکتر به کاراکتر پردازش کرده و توکن‌ها را برمی‌گرداند
-        for char in code:
-            self.transition(char)
+        # در این متد، کل کد ورودی به عنوان یک سند مستقل توکنایز می‌شود
+        # وضعیت قبلی پاک می‌شود تا یک نمونه بارها قابل استفاده باشد
+        self.reset()
+        self.tokens = []
+        self.feed(code)
+        return self.finish()
+
+    def tokenize_many(self, sources):
+        # توکنایز دسته‌ای چند سند با همین نمونه
+        return _tokenize_many(self, sources)
+
+    def feed(self, code):
+        # کد ورودی را کاراکتر به کاراکتر پردازش می‌کند؛ وضعیت بین فراخوانی‌ها حفظ می‌شود
+        # با state_chars هر کاراکتر در وضعیتی که پردازش آن از آن شروع شد شمرده می‌شود
+        state_chars = self.state_chars
+        if state_chars is None:
+            for char in code:
+                self.transition(char)
+        else:
+            for char in code:
+                state_chars[self.state] += 1
+                self.transition(char)
         return self.tokens
 
-    def begin_token(self, new_state):
+    def finish(self):
+        # در پایان ورودی، توکن نیمه‌کاره (در صورت وجود) تولید شده و توکن‌ها برگردانده می‌شوند
+        _finish_pending(self)
+        return self.tokens
+
+    def begin_token(self, new_state, char=''):
         # این متد وضعیت جدیدی برای توکن جاری تعیین می‌کند
+        # کاراکتر شروع‌کننده (در صورت وجود) اولین کاراکتر توکن جاری است
         self.state = new_state
-        self.current_token = ''
+        self.current_token = char
 
     def emit_token(self, token_type, value=None):
         # این متد توکن جاری را تولید کرده و به لیست توکن‌ها اضافه می‌کند
@@ -119,12 +181,8 @@ class DFATokenizer:
         self.reset()
 
     def check_reserved(self):
-        # لیست کلمات رزرو شده
-        reserved = {'int', 'float', 'void', 'return', 'if', 'while',
-                   'cin', 'cout', 'continue', 'break', 'include',
-                   'using', 'iostream', 'namespace', 'std', 'main'}
         # اگر شناسه جاری در کلمات رزرو شده باشد، توکن RESERVEDWORD تولید می‌شود
-        if self.current_token in reserved:
+        if self.current_token in RESERVED_WORDS:
             self.emit_token('RESERVEDWORD')
         else:
             # در غیر این صورت، به عنوان شناسه (IDENTIFIER) ثبت می‌شود
@@ -140,3 +198,650 @@ class DFATokenizer:
         self.state = 'start'
         # توکن جاری را خالی می‌کند
         self.current_token = ''
+
+
+def _tokenize_many(tokenizer, sources):
+    # برای هر سند به ترتیب لیست توکن‌ها، یا ValueError اگر سند کاراکتر نامعتبر داشته باشد، تولید می‌شود
+    for code in sources:
+        try:
+            yield tokenizer.tokenize(code)
+        except ValueError as e:
+            yield e
+
+
+def _finish_pending(tokenizer):
+    # توکن نیمه‌کاره یک توکنایزر را در پایان ورودی تولید کرده و وضعیت را به شروع برمی‌گرداند
+    state, current = tokenizer.state, tokenizer.current_token
+    tokenizer.state, tokenizer.current_token = 'start', ''
+    if state == 'identifier':
+        tokenizer.tokens.append(('RESERVEDWORD' if current in RESERVED_WORDS else 'IDENTIFIER', current))
+    elif state == 'number':
+        tokenizer.tokens.append(('NUMBER', current))
+    elif state == 'potential_multi':
+        tokenizer.tokens.append(('SYMBOL', current))
+    elif state == 'preprocessor':
+        tokenizer.tokens.append(('PREPROCESSOR', current))
+    elif state == 'string':
+        if not tokenizer.recover:
+            raise ValueError('Unterminated string literal')
+        # مقدار توکن ERROR از گیومه آغازین شروع می‌شود تا محل آن در کد معلوم باشد
+        tokenizer.tokens.append(('ERROR', '"' + current))
+    elif state == 'header_body':
+        if not tokenizer.recover:
+            raise ValueError(f'Unterminated header name: {current}')
+        tokenizer.tokens.append(('ERROR', current))
+
+
+def error_message(value):
+    # پیام خطای واژگانی برای مقدار یک توکن ERROR (همان پیام ValueError بدون recover)
+    if value.startswith('"'):
+        return 'Unterminated string literal'
+    if value.startswith('<'):
+        return f'Unterminated header name: {value}'
+    return f'Invalid character: {value}'
+
+
+# کلاس‌های کاراکتر برای جدول انتقال موتور کامپایل‌شده
+_C_INVALID, _C_PREPROCESSOR, _C_IDENTIFIER, _C_NUMBER, _C_STRING, _C_MULTI, _C_SINGLE, _C_SPACE = range(8)
+
+# الگوهایی که یک دنباله کامل از کاراکترها را در یک گام مصرف می‌کنند
+# (\w دقیقاً معادل isalnum() یا '_' و \s دقیقاً معادل isspace() است)
+_WORD_RUN = re.compile(r'\w*')
+_SPACE_RUN = re.compile(r'\s*')
+_ASCII_DIGIT_RUN = re.compile(r'[0-9]*')
+_PREPROCESSOR_RUN = re.compile(r'[^<\s]*')
+
+# عبارت منظم ترکیبی برای توکن‌های رایج؛ هر گروه یک نوع توکن است
+# پیش‌پردازنده‌ها، رشته‌های ناتمام و کاراکترهای غیر ASCII در ابتدای توکن به مسیر گام‌به‌گام می‌روند
+_MASTER_PATTERN = re.compile(r'''\s*(?:
+    ({reserved})(?!\w)              # 1: کلمه رزرو شده
+  | ([A-Za-z_]\w*)                  # 2: شناسه
+  | ([0-9]+)(?![0-9]|[^\x00-\x7f])  # 3: عدد (اگر کاراکتر بعدی غیر ASCII باشد، مسیر گام‌به‌گام)
+  | "([^"]*)"                       # 4: رشته
+  | ({multi}|[{starts}])            # 5: نماد چندکاراکتری یا شروع آن
+  | ([{single}])                    # 6: نماد تک
+)'''.format(
+    reserved='|'.join(sorted(RESERVED_WORDS)),
+    multi='|'.join(re.escape(s) for s in sorted(MULTI_SYMBOLS)),
+    starts=''.join(re.escape(c) for c in sorted(MULTI_STARTS)),
+    single=''.join(re.escape(c) for c in sorted(SINGLE_SYMBOLS - MULTI_STARTS)),
+), re.VERBOSE)
+_K_MULTI = 5
+_MASTER_TYPES = (None, 'RESERVEDWORD', 'IDENTIFIER', 'NUMBER', 'STRING', 'SYMBOL', 'SYMBOL')
+_MASTER_TYPE_IDS = (None,) + tuple(TOKEN_TYPE_IDS[name] for name in _MASTER_TYPES[1:])
+# وضعیت DFA برای توکنی که در انتهای ورودی قطع شده است
+_PENDING_STATES = {1: 'identifier', 2: 'identifier', 3: 'number', _K_MULTI: 'potential_multi'}
+
+
+def _classify(char):
+    # کلاس کاراکتر در وضعیت شروع، با همان ترتیب بررسی DFATokenizer.transition
+    if char == '#':
+        return _C_PREPROCESSOR
+    if char.isalpha() or char == '_':
+        return _C_IDENTIFIER
+    if char.isdigit():
+        return _C_NUMBER
+    if char == '"':
+        return _C_STRING
+    if char in MULTI_STARTS:
+        return _C_MULTI
+    if char in SINGLE_SYMBOLS:
+        return _C_SINGLE
+    if char.isspace():
+        return _C_SPACE
+    return _C_INVALID
+
+
+# جدول انتقال وضعیت شروع: کاراکترهای ASCII از قبل محاسبه می‌شوند و بقیه در اولین برخورد اضافه می‌شوند
+_START_CLASSES = {chr(i): _classify(chr(i)) for i in range(128)}
+
+# نام مسیر گام‌به‌گام برای هر کلاس کاراکتر، در شمارنده path_chars موتور کامپایل‌شده
+_STEP_PATHS = ('step: invalid', 'step: preprocessor', 'step: identifier', 'step: number', 'step: string',
+               'step: symbol', 'step: symbol', 'step: space')
+
+
+def _step_path(char):
+    cls = _START_CLASSES.get(char)
+    return _STEP_PATHS[_classify(char) if cls is None else cls]
+
+
+def _digit_run_end(code, pos, n):
+    # انتهای دنباله ارقام؛ مسیر سریع برای ارقام ASCII و بررسی isdigit() برای بقیه
+    while True:
+        pos = _ASCII_DIGIT_RUN.match(code, pos).end()
+        if pos < n and code[pos] > '\x7f' and code[pos].isdigit():
+            pos += 1
+        else:
+            return pos
+
+
+class CompiledTokenizer:
+    """موتور توکنایزر جدول‌محور که خروجی آن توکن به توکن با DFATokenizer یکسان است
+
+    به جای فراخوانی transition برای هر کاراکتر، قواعد توکن‌ها در یک عبارت منظم ترکیبی و یک
+    جدول انتقال روی کلاس کاراکترها کامپایل شده‌اند و بدنه شناسه‌ها، ارقام، فاصله‌ها و رشته‌ها
+    هر کدام در یک گام مصرف می‌شوند.
+    """
+
+    def __init__(self, recover=False, path_chars=None):
+        # recover همان معنای DFATokenizer را دارد: توکن ERROR به جای ValueError
+        # path_chars (مثلاً یک Counter) اختیاری است: مسیر پویش ('fast path'، 'resume' یا 'step: <کلاس>')
+        # -> تعداد کاراکترهای مصرف‌شده در آن؛ فقط یک بررسی به ازای هر جابه‌جایی بین دو مسیر هزینه دارد
+        self.recover = recover
+        self.path_chars = path_chars
+        # همان وضعیت‌هایی که DFATokenizer نگه می‌دارد، تا ادامه توکن نیمه‌کاره ممکن باشد
+        self.state = 'start'
+        self.tokens = []
+        self.current_token = ''
+        # ادامه‌های توکن نیمه‌کاره که بعد از current_token در چند ورودی feed آمده‌اند؛ فقط یک بار
+        # در پایان توکن به هم وصل می‌شوند تا توکن‌های طولانی در هر قطعه دوباره کپی نشوند
+        self._parts = []
+
+    def tokenize(self, code):
+        # کل کد ورودی به عنوان یک سند مستقل توکنایز می‌شود
+        # وضعیت قبلی پاک می‌شود تا یک نمونه بارها قابل استفاده باشد
+        self.state, self.current_token = 'start', ''
+        self._parts.clear()
+        self.tokens = []
+        self.feed(code)
+        return self.finish()
+
+    def tokenize_many(self, sources):
+        # توکنایز دسته‌ای چند سند با همین نمونه
+        return _tokenize_many(self, sources)
+
+    def tokenize_store(self, code):
+        # کل کد ورودی به صورت TokenStore توکنایز می‌شود: فقط نوع و محدوده هر توکن ذخیره می‌شود
+        # و مقدار رشته‌ای توکن‌ها ساخته نمی‌شود
+        self.state, self.current_token = 'start', ''
+        self._parts.clear()
+        self.tokens = []
+        store = TokenStore(code)
+        n = len(code)
+        pos = 0
+        counts = self.path_chars
+        while pos < n:
+            start = pos
+            pos = self._scan_fast_store(code, pos, store)
+            if counts is not None:
+                counts['fast path'] += pos - start
+            if pos < n:
+                end = self._scan_step(code, pos)
+                self._store_step_tokens(code, pos, store)
+                if counts is not None:
+                    counts[_step_path(code[pos])] += end - pos
+                pos = end
+        # توکن نیمه‌کاره انتهای ورودی دقیقاً به انتهای کد ختم می‌شود
+        for token_type, value in self.finish():
+            store.append(TOKEN_TYPE_IDS[token_type], n - len(value), n)
+        self.tokens = []
+        return store
+
+    def _scan_fast_store(self, code, pos, store):
+        # مانند _scan_fast، ولی به جای تاپل (نوع، مقدار) شماره نوع و محدوده گروه را ذخیره می‌کند
+        # چون کل ورودی در دسترس است، توکن انتهای ورودی نیمه‌کاره نیست
+        append_type = store.types.append
+        append_start = store.starts.append
+        append_end = store.ends.append
+        type_ids = _MASTER_TYPE_IDS
+        match = None
+        for match in iter(_MASTER_PATTERN.scanner(code, pos).match, None):
+            kind = match.lastindex
+            start, end = match.span(kind)
+            append_type(type_ids[kind])
+            append_start(start)
+            append_end(end)
+        return pos if match is None else match.end()
+
+    def _store_step_tokens(self, code, pos, store):
+        # توکن‌هایی که _scan_step از موقعیت pos تولید کرده به ترتیب در کد پیدا و ذخیره می‌شوند
+        # (بین آن‌ها فقط فاصله است و مقدار رشته همان متن بین دو ")
+        for token_type, value in self.tokens:
+            if token_type == 'STRING':
+                start = code.index('"', pos) + 1
+            else:
+                start = code.index(value, pos)
+            pos = start + len(value)
+            store.append(TOKEN_TYPE_IDS[token_type], start, pos)
+        self.tokens.clear()
+
+    def feed(self, code):
+        # ادامه پویش از وضعیت فعلی؛ توکن نیمه‌کاره انتهای ورودی برای فراخوانی بعدی می‌ماند
+        code, pos = self._resume(code)
+        if pos and self.path_chars is not None:
+            self.path_chars['resume'] += pos
+        self._scan(code, pos)
+        return self.tokens
+
+    def finish(self):
+        # در پایان ورودی، توکن نیمه‌کاره (در صورت وجود) تولید شده و توکن‌ها برگردانده می‌شوند
+        self.current_token += ''.join(self._parts)
+        self._parts.clear()
+        _finish_pending(self)
+        return self.tokens
+
+    def _resume(self, code):
+        # اگر توکنی از فراخوانی قبلی نیمه‌کاره مانده باشد، ادامه آن را آماده می‌کند
+        # فقط ورودی جدید پویش می‌شود؛ اگر توکن در آن هم تمام نشود، ادامه‌اش به self._parts اضافه می‌شود
+        state = self.state
+        if state == 'start':
+            return code, 0
+        if state == 'potential_multi':
+            # نماد چندکاراکتری دو کاراکتر است، پس کاراکتر خوانده‌شده پیش از ورودی جدید قرار می‌گیرد
+            current = self.current_token
+            self.state, self.current_token = 'start', ''
+            return current + code, 0
+        n = len(code)
+        if state == 'string':
+            end = code.find('"')
+            if end < 0:
+                return self._extend(code, 0)
+            self.tokens.append(('STRING', self._take(code[:end])))
+            return code, end + 1
+
+        pos = 0
+        if state == 'include':
+            pos = _SPACE_RUN.match(code).end()
+            if pos == n:
+                return code, pos
+            if code[pos] != '<':
+                self.state = 'start'
+                return code, pos
+            state = self.state = 'header_body'
+        if state == 'header_body':
+            # ادامه هدر تا رسیدن به >
+            close = code.find('>', pos)
+            if close < 0:
+                return self._extend(code, pos)
+            self.tokens.append(('HEADER', self._take(code[pos:close + 1])))
+            return code, close + 1
+
+        # شناسه، عدد یا دستور پیش‌پردازنده
+        if state == 'identifier':
+            end = _WORD_RUN.match(code).end()
+        elif state == 'number':
+            end = _digit_run_end(code, 0, n)
+        else:
+            end = _PREPROCESSOR_RUN.match(code).end()
+        if end == n:
+            return self._extend(code, 0)
+        value = self._take(code[:end])
+        if state == 'identifier':
+            self.tokens.append(('RESERVEDWORD' if value in RESERVED_WORDS else 'IDENTIFIER', value))
+        elif state == 'number':
+            self.tokens.append(('NUMBER', value))
+        else:
+            self.tokens.append(('PREPROCESSOR', value))
+            return code, self._scan_directive_end(code, value, end)
+        return code, end
+
+    def _extend(self, code, pos):
+        # کل ورودی از pos ادامه توکن نیمه‌کاره است
+        if pos < len(code):
+            self._parts.append(code[pos:])
+        return code, len(code)
+
+    def _take(self, tail):
+        # مقدار کامل توکن نیمه‌کاره با پایان tail؛ وضعیت به شروع برمی‌گردد
+        value = self.current_token + ''.join(self._parts) + tail
+        self._parts.clear()
+        self.state, self.current_token = 'start', ''
+        return value
+
+    def _scan(self, code, pos):
+        # مسیر سریع و مسیر گام‌به‌گام به نوبت اجرا می‌شوند تا کل ورودی مصرف شود
+        n = len(code)
+        counts = self.path_chars
+        while pos < n:
+            start = pos
+            pos = self._scan_fast(code, pos)
+            if counts is not None:
+                counts['fast path'] += pos - start
+            if pos < n:
+                start = pos
+                pos = self._scan_step(code, pos)
+                if counts is not None:
+                    counts[_step_path(code[start])] += pos - start
+
+    def _scan_fast(self, code, pos):
+        # پویش با عبارت منظم ترکیبی؛ هر تطبیق فاصله‌های قبل و یک توکن کامل را مصرف می‌کند
+        # در اولین کاراکتری که این الگو پوشش نمی‌دهد، کار به _scan_step سپرده می‌شود
+        append = self.tokens.append
+        types = _MASTER_TYPES
+        match = None
+        for match in iter(_MASTER_PATTERN.scanner(code, pos).match, None):
+            kind = match.lastindex
+            append((types[kind], match[kind]))
+        if match is None:
+            return pos
+
+        end = match.end()
+        if end == len(code):
+            # توکنی که به انتهای ورودی رسیده ممکن است در ورودی بعدی ادامه داشته باشد
+            state = _PENDING_STATES.get(kind)
+            if state is not None and (kind != _K_MULTI or end - match.start(kind) == 1):
+                self.tokens.pop()
+                self.state, self.current_token = state, match[kind]
+        return end
+
+    def _scan_step(self, code, pos):
+        # پردازش یک توکن با جدول انتقال کلاس کاراکترها و برگرداندن موقعیت بعدی
+        append = self.tokens.append
+        n = len(code)
+        char = code[pos]
+        cls = _START_CLASSES.get(char)
+        if cls is None:
+            cls = _START_CLASSES[char] = _classify(char)
+
+        if cls == _C_SPACE:
+            return _SPACE_RUN.match(code, pos + 1).end()
+
+        if cls == _C_IDENTIFIER:
+            end = _WORD_RUN.match(code, pos + 1).end()
+            if end == n:
+                self.state, self.current_token = 'identifier', code[pos:]
+                return n
+            value = code[pos:end]
+            append(('RESERVEDWORD' if value in RESERVED_WORDS else 'IDENTIFIER', value))
+            return end
+
+        if cls == _C_SINGLE:
+            append(('SYMBOL', char))
+            return pos + 1
+
+        if cls == _C_MULTI:
+            if pos + 1 == n:
+                self.state, self.current_token = 'potential_multi', char
+                return n
+            pair = code[pos:pos + 2]
+            if pair in MULTI_SYMBOLS:
+                append(('SYMBOL', pair))
+                return pos + 2
+            append(('SYMBOL', char))
+            return pos + 1
+
+        if cls == _C_NUMBER:
+            end = _digit_run_end(code, pos + 1, n)
+            if end == n:
+                self.state, self.current_token = 'number', code[pos:]
+                return n
+            append(('NUMBER', code[pos:end]))
+            return end
+
+        if cls == _C_STRING:
+            end = code.find('"', pos + 1)
+            if end < 0:
+                self.state, self.current_token = 'string', code[pos + 1:]
+                return n
+            append(('STRING', code[pos + 1:end]))
+            return end + 1
+
+        if cls == _C_PREPROCESSOR:
+            end = _PREPROCESSOR_RUN.match(code, pos + 1).end()
+            if end == n:
+                self.state, self.current_token = 'preprocessor', code[pos:]
+                return n
+            directive = code[pos:end]
+            append(('PREPROCESSOR', directive))
+            return self._scan_directive_end(code, directive, end)
+
+        if self.recover:
+            append(('ERROR', char))
+            return pos + 1
+        raise ValueError(f'Invalid character: {char}')
+
+    def _scan_directive_end(self, code, directive, end):
+        # بعد از دستور پیش‌پردازنده‌ای که در end تمام شده: کاراکتر پایان‌دهنده و در صورت وجود
+        # نام هدر <...> مصرف می‌شود
+        append = self.tokens.append
+        n = len(code)
+        if code[end] == '<':
+            pos = end
+        else:
+            # کاراکتر فاصله پایان‌دهنده هم مصرف می‌شود
+            pos = end + 1
+            if directive != '#include':
+                return pos
+            pos = _SPACE_RUN.match(code, pos).end()
+            if pos == n:
+                self.state = 'include'
+                return n
+            if code[pos] != '<':
+                return pos
+        close = code.find('>', pos)
+        if close < 0:
+            self.state, self.current_token = 'header_body', code[pos:]
+            return n
+        append(('HEADER', code[pos:close + 1]))
+        return close + 1
+
+
+class TokenStore:
+    """ذخیره فشرده توکن‌ها در ستون‌های موازی array روی بافر اصلی کد
+
+    برای هر توکن فقط شماره نوع (اندیس در TOKEN_TYPES) و محدوده [start, end) آن در source نگه
+    داشته می‌شود. مقدار توکن فقط هنگام درخواست برش داده می‌شود و خط/ستون با جستجوی دودویی در
+    فهرست شروع خطوط محاسبه می‌شود. پیمایش آن مانند لیست توکن‌ها تاپل (نوع، مقدار) تولید می‌کند.
+    source می‌تواند str یا بایت‌های UTF-8 (bytes یا mmap) باشد؛ در حالت دوم مقادیر هنگام برش رمزگشایی می‌شوند،
+    پس سازنده باید UTF-8 بودن بافر را از قبل بررسی کرده باشد (مثل _tokenize_bytes).
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self._line_starts = None  # در اولین درخواست خط/ستون ساخته می‌شود
+
+    def append(self, type_id, start, end):
+        self.types.append(type_id)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        return TOKEN_TYPES[self.types[index]], self.value(index)
+
+    def __iter__(self):
+        source = self.source
+        if isinstance(source, str):
+            for type_id, start, end in zip(self.types, self.starts, self.ends):
+                yield TOKEN_TYPES[type_id], source[start:end]
+        else:
+            for type_id, start, end in zip(self.types, self.starts, self.ends):
+                yield TOKEN_TYPES[type_id], source[start:end].decode('utf-8')
+
+    def type_name(self, index):
+        return TOKEN_TYPES[self.types[index]]
+
+    def value(self, index):
+        # برش تنبل مقدار توکن از بافر اصلی
+        value = self.source[self.starts[index]:self.ends[index]]
+        return value if isinstance(value, str) else value.decode('utf-8')
+
+    def line_starts(self):
+        # موقعیت شروع هر خط در بافر (یک بار محاسبه می‌شود)
+        if self._line_starts is None:
+            line_starts = array('I', [0])
+            source = self.source
+            newline = '\n' if isinstance(source, str) else b'\n'
+            pos = source.find(newline)
+            while pos >= 0:
+                line_starts.append(pos + 1)
+                pos = source.find(newline, pos + 1)
+            self._line_starts = line_starts
+        return self._line_starts
+
+    def location(self, offset):
+        # (خط، ستون) یک‌مبنا برای یک موقعیت در بافر
+        line_starts = self.line_starts()
+        line = bisect_right(line_starts, offset)
+        line_start = line_starts[line - 1]
+        if isinstance(self.source, str):
+            return line, offset - line_start + 1
+        # در بافر بایتی، ستون بر حسب کاراکتر (و نه بایت) شمرده می‌شود
+        return line, len(self.source[line_start:offset].decode('utf-8', 'replace')) + 1
+
+    def position(self, index):
+        # (خط، ستون) شروع توکن شماره index
+        return self.location(self.starts[index])
+
+
+# همان عبارت منظم ترکیبی برای پویش مستقیم بایت‌ها (فقط ASCII)؛ هر توکنی که به بایت غیر ASCII
+# برسد تطبیق نمی‌خورد تا رمزگشایی و مسیر str استفاده شود. فقط محتوای رشته‌ها می‌تواند غیر ASCII باشد.
+_BYTES_MASTER_PATTERN = re.compile(r'''[ \t\n\r\f\v]*(?:
+    ({reserved})(?![\w\x80-\xff])      # 1: کلمه رزرو شده
+  | ([A-Za-z_]\w*)(?![\w\x80-\xff])    # 2: شناسه
+  | ([0-9]+)(?![0-9\x80-\xff])          # 3: عدد
+  | "([^"]*)"                           # 4: رشته
+  | ({multi}|[{starts}])                # 5: نماد چندکاراکتری یا شروع آن
+  | ([{single}])                        # 6: نماد تک
+  | (\#[^<\s\x1c-\x1f\x80-\xff]*)(?=[<\s])  # 7: پیش‌پردازنده (بعد از آن < یا فاصله)
+)'''.format(
+    reserved='|'.join(sorted(RESERVED_WORDS)),
+    multi='|'.join(re.escape(s) for s in sorted(MULTI_SYMBOLS)),
+    starts=''.join(re.escape(c) for c in sorted(MULTI_STARTS)),
+    single=''.join(re.escape(c) for c in sorted(SINGLE_SYMBOLS - MULTI_STARTS)),
+).encode('utf-8'), re.VERBOSE)
+_K_BYTES_PREPROCESSOR = 7
+_BYTES_SPACE_RUN = re.compile(rb'[ \t\n\r\f\v]*')
+_NON_ASCII_BYTE = re.compile(rb'[\x80-\xff]')
+
+
+def _is_utf8(buffer):
+    # آیا بافر UTF-8 معتبر است؟ بافر تمام ASCII (حالت معمول) بدون رمزگشایی پذیرفته می‌شود
+    if _NON_ASCII_BYTE.search(buffer) is None:
+        return True
+    try:
+        str(buffer, 'utf-8')
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _tokenize_bytes(buffer, path_chars=None):
+    # پویش مستقیم بافر بایتی به TokenStore؛ اگر به ورودی غیر ASCII بیرون از رشته‌ها
+    # (یا هر حالت نادر دیگری) برسد None برمی‌گرداند تا مسیر str استفاده شود
+    # با path_chars بایت‌های پویش‌شده زیر 'bytes path' یا (اگر پویش رها شد) 'bytes path, discarded' شمرده می‌شوند
+    store = TokenStore(buffer)
+    append_type = store.types.append
+    append_start = store.starts.append
+    append_end = store.ends.append
+    type_ids = _MASTER_TYPE_IDS + (TOKEN_TYPE_IDS['PREPROCESSOR'],)
+    header_id = TOKEN_TYPE_IDS['HEADER']
+    n = len(buffer)
+    pos = 0
+    while True:
+        match = None
+        for match in iter(_BYTES_MASTER_PATTERN.scanner(buffer, pos).match, None):
+            kind = match.lastindex
+            start, end = match.span(kind)
+            append_type(type_ids[kind])
+            append_start(start)
+            append_end(end)
+            if kind == _K_BYTES_PREPROCESSOR:
+                break
+        else:
+            # پایان تطبیق‌ها: فقط فاصله تا انتهای بافر مجاز است
+            if match is not None:
+                pos = match.end()
+            pos = _BYTES_SPACE_RUN.match(buffer, pos).end()
+            if pos != n:
+                return _discard_bytes_scan(path_chars, pos)
+            if not _is_utf8(buffer):
+                # مقادیر TokenStore تنبل رمزگشایی می‌شوند، پس بایت‌های نامعتبر باید همین‌جا و پیش از
+                # هر خروجی کشف شوند؛ مسیر str خطا می‌دهد یا (با recover) آن‌ها را جایگزین می‌کند
+                return _discard_bytes_scan(path_chars, n)
+            if path_chars is not None:
+                path_chars['bytes path'] += n
+            return store
+
+        # پیش‌پردازنده: اگر با فاصله تمام شده باشد، آن فاصله هم مصرف می‌شود و بعد از
+        # #include (پس از چند فاصله) ممکن است هدر بیاید
+        pos = end
+        if buffer[pos:pos + 1] != b'<':
+            pos += 1
+            if buffer[start:end] != b'#include':
+                continue
+            pos = _BYTES_SPACE_RUN.match(buffer, pos).end()
+            if buffer[pos:pos + 1] != b'<':
+                continue
+        close = buffer.find(b'>', pos)
+        if close < 0:
+            return _discard_bytes_scan(path_chars, pos)
+        append_type(header_id)
+        append_start(pos)
+        append_end(close + 1)
+        pos = close + 1
+
+
+def _discard_bytes_scan(path_chars, pos):
+    # پویش بایتی در pos رها می‌شود؛ بایت‌های تا آنجا هزینه بی‌حاصل مسیر بایتی‌اند
+    if path_chars is not None:
+        path_chars['bytes path, discarded'] += pos
+    return None
+
+
+def tokenize_file(path, recover=False, path_chars=None):
+    """توکنایز یک فایل با نگاشت حافظه (mmap) و پویش مستقیم بایت‌ها
+
+    فایل خوانده یا کامل رمزگشایی نمی‌شود: خروجی یک TokenStore روی خود mmap است و مقادیر
+    (از جمله محتوای رشته‌ها) فقط هنگام درخواست رمزگشایی می‌شوند؛ فقط اگر فایل بایت غیر ASCII داشته
+    باشد، UTF-8 بودن آن یک بار و پیش از بازگشت بررسی می‌شود. اگر فایل بیرون از رشته‌ها کاراکتر
+    غیر ASCII (یا کاراکتر نامعتبر) یا UTF-8 نامعتبر داشته باشد، کل فایل رمزگشایی شده و با
+    CompiledTokenizer پویش می‌شود. با recover خطاهای واژگانی به صورت توکن ERROR در خروجی می‌آیند
+    و بایت‌های نامعتبر UTF-8 با U+FFFD جایگزین می‌شوند؛ بدون آن UnicodeDecodeError (یک ValueError) رخ می‌دهد.
+    path_chars شمارنده اختیاری مسیرهای پویش است (CompiledTokenizer و _tokenize_bytes).
+    """
+    with open(path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # فایل خالی را نمی‌توان نگاشت کرد
+            buffer = b''
+    store = _tokenize_bytes(buffer, path_chars)
+    if store is None:
+        code = buffer[:].decode('utf-8', 'replace' if recover else 'strict')
+        store = CompiledTokenizer(recover, path_chars).tokenize_store(code)
+    return store
+
+
+def iter_tokens(stream, chunk_size=64 * 1024, encoding='utf-8', recover=False):
+    """تولید تدریجی توکن‌ها از یک شیء فایل‌مانند یا سوکت‌مانند
+
+    ورودی در قطعه‌های chunk_size تایی خوانده می‌شود و وضعیت DFA (مثلاً یک >= نیمه‌خوانده،
+    رشته باز یا #include <...> شکسته‌شده) بین قطعه‌ها حفظ می‌شود. فقط توکن‌های یک قطعه در حافظه
+    نگه داشته می‌شوند، پس مصرف حافظه به اندازه کل ورودی بستگی ندارد.
+    با recover خطاهای واژگانی به صورت توکن ERROR تولید می‌شوند.
+    """
+    # اشیاء سوکت‌مانند به جای read متد recv دارند
+    read = getattr(stream, 'read', None) or stream.recv
+    decoder = codecs.getincrementaldecoder(encoding)()
+    tokenizer = CompiledTokenizer(recover)
+
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            # کاراکترهای چندبایتی که بین دو قطعه شکسته شده‌اند در رمزگشا می‌مانند
+            chunk = decoder.decode(chunk)
+        yield from _drain(tokenizer, tokenizer.feed, chunk)
+
+    yield from _drain(tokenizer, tokenizer.feed, decoder.decode(b'', final=True))
+    yield from _drain(tokenizer, tokenizer.finish)
+
+
+def _drain(tokenizer, step, *args):
+    # توکن‌های تولیدشده در یک گام را برمی‌گرداند و لیست توکنایزر را خالی می‌کند
+    # اگر خطایی رخ دهد، توکن‌های معتبر پیش از آن هم تحویل داده می‌شوند
+    try:
+        step(*args)
+    except ValueError:
+        tokens, tokenizer.tokens = tokenizer.tokens, []
+        yield from tokens
+        raise
+    tokens, tokenizer.tokens = tokenizer.tokens, []
+    yield from tokens
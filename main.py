@@ -1,11 +1,14 @@
-from lexical_analyzer import DFATokenizer
+import argparse
+import sys
+
+from lexical_analyzer import DFATokenizer, tokenize_file
 from token_table import TokenTable
 from grammar import CPPGrammar
-from predictive_parser import PredictiveParser, build_parse_tree
+from predictive_parser import PredictiveParser, build_parse_tree, write_tree
+from profiling import PipelineStats
 
-if __name__ == "__main__":
-    # مثال ورودی
-    code = """
+# مثال ورودی
+EXAMPLE_CODE = """
     #include <iostream>
     using namespace std;
     int main(){
@@ -21,45 +24,174 @@ if __name__ == "__main__":
     }
     """
 
+
+def run_example(stats=None):
+    # اجرای همه مراحل روی کد نمونه
+    stats = stats or PipelineStats(enabled=False)
+    code = EXAMPLE_CODE
+
     # مرحله ۱: توکنایز کردن
-    tokenizer = DFATokenizer()
-    tokens = tokenizer.tokenize(code)
+    with stats.stage('tokenize'):
+        tokenizer = DFATokenizer(state_chars=stats.state_chars())
+        tokens = tokenizer.tokenize(code)
+    stats.count_source(code, len(tokens))
     print("Generated Tokens:")
     for token in tokens:
         print(token)
 
     # مرحله ۲: ساخت Token Table
-    token_table = TokenTable()
-    for ttype, value in tokens:
-        token_table.add_token(ttype, value)
+    with stats.stage('token table'):
+        token_table = TokenTable()
+        for ttype, value in tokens:
+            token_table.add_token(ttype, value)
 
     print("\nToken Table:")
-    table = token_table.generate_table()
-    print("{:<10} {:<15} {:<10}".format("Type", "Value", "Hash"))
-    for entry in table:
-        print("{:<10} {:<15} {:<10}".format(entry[0], entry[1], entry[2]))
+    print_token_table(token_table)
 
     # مرحله ۳: ساخت Parse Table
-    grammar = CPPGrammar()
-    parse_table = grammar.parse_table
+    with stats.stage('grammar'):
+        grammar = CPPGrammar()
+        parse_table = grammar.parse_table
     print("\nParse Table:")
     for nt in grammar.non_terminals:
         print(f"{nt}: {dict(parse_table[nt])}")
 
     # مرحله ۴: تجزیه نحوی
-    parser = PredictiveParser(parse_table)
+    parser = PredictiveParser(parse_table, counters=stats.enabled)
     # try:
-    success = parser.parse(tokens)
+    with stats.stage('parse'):
+        success = parser.parse(tokens)
+    stats.count_parse(parser)
     if success:
         print("\nParse Tree Productions:")
-        for prod in parser.productions:
-            print(f"{prod[0]} -> {' '.join(prod[1])}")
+        print_productions(parser.productions)
 
         # ساخت درخت پارس
-        parse_tree = build_parse_tree(parser.productions, grammar)
+        with stats.stage('tree'):
+            parse_tree = build_parse_tree(parser.productions, grammar)
 
         print("\nParse Tree Structure:")
         print(parse_tree)
 
     # except SyntaxError as e:
-    #     print(f"Parse Error: {e}")
\ No newline at end of file
+    #     print(f"Parse Error: {e}")
+
+
+def print_token_table(token_table):
+    # Bucket خانه ورودی در جدول درهم‌سازی و Chain جایگاه آن در زنجیره همان خانه است
+    table = token_table.generate_table()
+    print("{:<12} {:<15} {:<10} {:>6} {:>5} {:>6} {:>6}".format(
+        "Type", "Value", "Hash", "Bucket", "Chain", "Count", "First"))
+    for entry in table:
+        print("{:<12} {:<15} {:08x}   {:>6} {:>5} {:>6} {:>6}".format(*entry))
+
+
+def print_productions(productions):
+    for prod in productions:
+        print(f"{prod[0]} -> {' '.join(prod[1])}")
+
+
+def run_file(path, args, parser, stats=None):
+    # اجرای مراحل انتخاب‌شده روی یک فایل؛ فقط هزینه مراحل درخواست‌شده پرداخت می‌شود
+    # در حالت --recover همه خطاها در خروجی خطا چاپ می‌شوند و مقدار برگشتی False است
+    stats = stats or PipelineStats(enabled=False)
+    with stats.stage('tokenize'):
+        tokens = tokenize_file(path, recover=args.recover, path_chars=stats.path_chars())
+    stats.count_source(tokens.source, len(tokens))
+
+    if args.tokens:
+        print(f"{path}: Generated Tokens:")
+        for token in tokens:
+            print(token)
+
+    if args.table:
+        with stats.stage('token table'):
+            token_table = TokenTable()
+            token_table.add_tokens(tokens)
+        print(f"\n{path}: Token Table:")
+        print_token_table(token_table)
+
+    if args.parse or args.tree:
+        # در حالت عادی درخت پس از تجزیه از تولیدات ساخته می‌شود تا زمان دو مرحله جدا باشد؛
+        # در حالت recover درخت همراه تجزیه ساخته می‌شود، چون تولیدات گره‌های کنارگذاشته را ندارند
+        try:
+            with stats.stage('parse'):
+                parser.parse(tokens, build_tree=args.tree and args.recover)
+        except SyntaxError:
+            stats.count_parse(parser)
+            raise
+        stats.count_parse(parser)
+        if args.tree and not args.recover:
+            with stats.stage('tree'):
+                parser.build_tree()
+        if args.parse:
+            print(f"\n{path}: Parse Tree Productions:")
+            print_productions(parser.productions)
+        if args.tree:
+            print(f"\n{path}: Parse Tree Structure:")
+            write_tree(parser.tree, sys.stdout)
+        for diagnostic in parser.diagnostics:
+            print(f"{path}: {diagnostic.message}", file=sys.stderr)
+        return not parser.diagnostics
+    return True
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="تحلیلگر واژگانی و نحوی برای زیرمجموعه‌ای از C++")
+    arg_parser.add_argument('files', nargs='*', help="فایل‌های ورودی؛ بدون فایل، کد نمونه اجرا می‌شود")
+    arg_parser.add_argument('--tokens', action='store_true', help="چاپ توکن‌ها")
+    arg_parser.add_argument('--table', action='store_true', help="چاپ جدول توکن‌ها")
+    arg_parser.add_argument('--parse', action='store_true', help="تجزیه و چاپ تولیدات")
+    arg_parser.add_argument('--tree', action='store_true', help="تجزیه و چاپ درخت پارس")
+    arg_parser.add_argument('--recover', action='store_true',
+                            help="ادامه پس از خطا و گزارش همه خطاهای واژگانی و نحوی فایل")
+    arg_parser.add_argument('--profile', action='store_true',
+                            help="اندازه‌گیری زمان مراحل و شمارنده‌ها و چاپ خلاصه در خروجی خطا")
+    arg_parser.add_argument('--profile-json', metavar='PATH',
+                            help="مانند --profile، ولی نتایج به صورت JSON در PATH نوشته می‌شوند ('-' برای خروجی استاندارد)")
+    args = arg_parser.parse_args(argv)
+    stats = PipelineStats(enabled=args.profile or args.profile_json is not None)
+
+    if not args.files:
+        run_example(stats)
+        report_stats(stats, args)
+        return 0
+
+    if not (args.tokens or args.table or args.parse or args.tree):
+        # بدون انتخاب مرحله، همه مراحل اجرا می‌شوند
+        args.tokens = args.table = args.parse = args.tree = True
+
+    parser = None
+    if args.parse or args.tree:
+        # گرامر و جدول تجزیه فقط یک بار و فقط در صورت نیاز ساخته می‌شوند
+        with stats.stage('grammar'):
+            parser = PredictiveParser(CPPGrammar().compile_parse_table(), recover=args.recover,
+                                      counters=stats.enabled)
+
+    status = 0
+    for path in args.files:
+        try:
+            if not run_file(path, args, parser, stats):
+                status = 1
+        except (OSError, ValueError, SyntaxError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            status = 1
+    report_stats(stats, args)
+    return status
+
+
+def report_stats(stats, args):
+    # چاپ خلاصه --profile یا نوشتن JSON برای --profile-json
+    if not stats.enabled:
+        return
+    if args.profile_json is None:
+        print(stats.summary(), file=sys.stderr)
+    elif args.profile_json == '-':
+        stats.write_json(sys.stdout)
+    else:
+        with open(args.profile_json, 'w', encoding='utf-8') as f:
+            stats.write_json(f)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""تولید یک ماژول پارسر پایتون اختصاصی از جدول تجزیه LL(1)
+
+برای هر غیرپایانه یک تابع parse_<غیرپایانه> ساخته می‌شود که مستقیماً روی نماد پایانی پیش‌رو
+شاخه می‌زند (مجموعه پیش‌بینی هر تولید همان خانه‌های جدول است، پس تولیدهای 'ε' با FOLLOW
+انتخاب می‌شوند)، نمادهای پایانی را درجا تطبیق می‌دهد و گره‌های درخت را بدون پشته می‌سازد.
+دنباله تولیدات، درخت پارس و پیام‌های خطا همان خروجی PredictiveParser است.
+
+بازگشت انتهایی یک غیرپایانه به خودش (مثل T -> Id T) به حلقه تبدیل می‌شود، پس عمق بازگشت فقط به
+تودرتویی while بستگی دارد و نه به تعداد دستورها. اگر تودرتویی ورودی به حد بازگشت پایتون نزدیک شود،
+تجزیه از همان نقطه با PredictiveParser روی جدول تجزیه‌ای که در همان ماژول ذخیره شده ادامه می‌یابد.
+"""
+import argparse
+import sys
+import types
+
+from grammar import CPPGrammar
+
+_HEADER = '''\
+# این فایل با parser_codegen از جدول تجزیه CPPGrammar ساخته شده است؛ آن را دستی ویرایش نکنید
+import itertools
+import sys
+
+from grammar import CompiledParseTable
+from predictive_parser import (PredictiveParser, ParseTreeBuilder, TreeNode, VALUE_TOKEN_TYPES,
+                               _error_location)
+
+GRAMMAR_FINGERPRINT = {fingerprint!r}
+START = {start!r}
+
+# تولیدات به همان ترتیب CompiledParseTable.productions
+PRODUCTIONS = [
+{productions}
+]
+
+# جدول تجزیه به همان ترتیب CPPGrammar.parse_table، برای PredictiveParser در ورودی‌های بسیار عمیق
+PARSE_TABLE = {{
+{parse_table}
+}}
+
+_fallback_table = None
+
+
+class _TooDeep(Exception):
+    # تودرتویی ورودی به حد بازگشت پایتون نزدیک شده است
+    pass
+
+
+def parse(tokens, build_tree=False):
+    """تجزیه توکن‌ها و بازگرداندن (لیست تولیدات، ریشه درخت پارس یا None)
+
+    مانند PredictiveParser.parse، در صورت خطا SyntaxError با همان پیام پرتاب می‌شود. اگر
+    تودرتویی ورودی به حد بازگشت پایتون نزدیک شود، تجزیه از همان توکن با PredictiveParser
+    جدول‌محور ادامه می‌یابد؛ توکن‌ها نگه داشته نمی‌شوند، پس یک پیمایشگر یک‌بارمصرف هم کافی است.
+    """
+    source = tokens
+    tokens = iter(tokens)
+    productions = []
+    emit = productions.append
+    position = 0
+    # تعداد فراخوانی‌های بازگشتی باز (مثل T -> Loop -> T برای هر سطح while)؛ پیش از رسیدن به حد
+    # بازگشت پایتون _TooDeep پرتاب می‌شود تا تجزیه با PredictiveParser ادامه یابد
+    depth = 0
+    depth_limit = sys.getrecursionlimit() // 2
+    token = next(tokens, None)
+    if token is None:
+        la, value = '$', None
+    else:
+        value = token[1]
+        la = value if token[0] in VALUE_TOKEN_TYPES else token[0]
+'''
+
+_FOOTER = '''\
+    root = None
+    try:
+        if build_tree:
+            root = TreeNode(START)
+            parse_{start}_tree(root)
+        else:
+            parse_{start}()
+    except _TooDeep:
+        productions.extend(_continue_table_driven(productions, position, la, value, tokens, source))
+        if build_tree:
+            builder = ParseTreeBuilder(frozenset(PARSE_TABLE), START)
+            for production in productions:
+                builder.add(*production)
+            root = builder.root
+        return productions, root
+    if la != '$':
+        raise SyntaxError("خطای نحوی: غیرپایانه ناشناخته $" + _error_location(source, position))
+    return productions, root
+
+
+def _continue_table_driven(productions, position, la, value, tokens, source):
+    # ادامه تجزیه با PredictiveParser از جایی که _TooDeep پرتاب شد؛ پشته جدول‌محور در آن لحظه از
+    # بازپخش تولیدات تا اینجا ساخته می‌شود: پیش از گسترش هر غیرپایانه، نمادهای پایانی بالای آن
+    # تطبیق یافته‌اند و پس از آخرین تولید، نمادهای پایانی تا رسیدن به position توکن برداشته می‌شوند
+    global _fallback_table
+    if _fallback_table is None:
+        _fallback_table = CompiledParseTable(PARSE_TABLE, START)
+    compiled = _fallback_table
+    symbol_ids = compiled.symbol_ids
+    n_terminals = compiled.n_terminals
+    stack = [compiled.end, compiled.start]
+    matched = 0
+    for _, rhs in productions:
+        while stack[-1] < n_terminals:
+            stack.pop()
+            matched += 1
+        stack[-1:] = [symbol_ids[symbol] for symbol in reversed(rhs) if symbol != 'ε']
+    while matched < position:
+        stack.pop()
+        matched += 1
+    # توکن پیش‌رو از (la، value) بازسازی می‌شود؛ برای نمادهایی که با مقدار شناخته می‌شوند هر نوع
+    # VALUE_TOKEN_TYPES همان نماد پایانی را می‌دهد
+    lookahead = [] if la == '$' else [('SYMBOL' if la == value else la, value)]
+    parser = PredictiveParser(compiled)
+    return parser.iter_parse_from(itertools.chain(lookahead, tokens), stack, position, source)
+'''
+
+
+class _Writer:
+    # جمع‌آوری خطوط کد با تورفتگی
+    def __init__(self):
+        self.lines = []
+        self.level = 0
+
+    def line(self, text=''):
+        self.lines.append('    ' * self.level + text if text else '')
+
+
+def _condition(terminals):
+    # شرط انتخاب یک تولید روی نماد پیش‌رو
+    terminals = sorted(terminals)
+    if len(terminals) == 1:
+        return f"la == {terminals[0]!r}"
+    return "la in {" + ", ".join(repr(t) for t in terminals) + "}"
+
+
+def _write_match(out, symbol):
+    # تطبیق درجای یک نماد پایانی و خواندن توکن بعدی؛ نماد عددی (مثل '0' در return 0) با مقدار
+    # یک توکن NUMBER تطبیق داده می‌شود
+    if symbol.isdigit():
+        out.line(f"if la != {symbol!r} and (la != 'NUMBER' or value != {symbol!r}):")
+    else:
+        out.line(f"if la != {symbol!r}:")
+    out.line(f"    raise SyntaxError({('خطای نحوی: غیرپایانه ناشناخته ' + symbol)!r} + _error_location(source, position))")
+    _write_advance(out)
+
+
+def _write_advance(out):
+    # خواندن توکن بعدی و محاسبه نماد پیش‌رو
+    out.line("position += 1")
+    out.line("token = next(tokens, None)")
+    out.line("if token is None:")
+    out.line("    la, value = '$', None")
+    out.line("else:")
+    out.line("    value = token[1]")
+    out.line("    la = value if token[0] in VALUE_TOKEN_TYPES else token[0]")
+
+
+def _write_function(out, nt, branches, expected, non_terminals, build_tree, recursive):
+    # تابع parse_<nt> (یا parse_<nt>_tree که گره node را گسترش می‌دهد)
+    # recursive غیرپایانه‌هایی است که فراخوانی آن‌ها از nt می‌تواند دوباره به nt برسد
+    suffix = '_tree' if build_tree else ''
+    out.line(f"def parse_{nt}{suffix}({'node' if build_tree else ''}):")
+    out.level += 1
+    out.line("nonlocal la, value, position" + (", depth" if recursive else ""))
+    # بازگشت انتهایی به همین غیرپایانه به حلقه تبدیل می‌شود
+    loop = any(rhs and rhs[-1] == nt for _, rhs, _ in branches)
+    if loop:
+        out.line("while True:")
+        out.level += 1
+    for i, (index, rhs, terminals) in enumerate(branches):
+        out.line(f"{'if' if i == 0 else 'elif'} {_condition(terminals)}:")
+        out.level += 1
+        out.line(f"emit(PRODUCTIONS[{index}])")
+        symbols = [symbol for symbol in rhs if symbol != 'ε']
+        if build_tree and symbols:
+            out.line("children = node.children = [" + ", ".join(f"TreeNode({s!r})" for s in symbols) + "]")
+        tail = bool(symbols) and symbols[-1] == nt
+        for position, symbol in enumerate(symbols):
+            if tail and position == len(symbols) - 1:
+                if build_tree:
+                    out.line(f"node = children[{position}]")
+                out.line("continue")
+            elif symbol in non_terminals:
+                call = f"parse_{symbol}{suffix}({f'children[{position}]' if build_tree else ''})"
+                if symbol in recursive:
+                    # عمق فقط برای فراخوانی‌های درون یک چرخه بازگشتی شمرده می‌شود
+                    out.line("depth += 1")
+                    out.line("if depth > depth_limit:")
+                    out.line("    raise _TooDeep()")
+                    out.line(call)
+                    out.line("depth -= 1")
+                else:
+                    out.line(call)
+            elif position > 0:
+                _write_match(out, symbol)
+            else:
+                # نماد پایانی اول تولید همان نماد پیش‌رو است که شاخه با آن انتخاب شده
+                _write_advance(out)
+        if loop and not tail:
+            out.line("return")
+        out.level -= 1
+    out.line("else:")
+    message = f". انتظار می‌رفت: {expected}"
+    out.line(f"    raise SyntaxError('خطای نحوی در ' + la + {message!r} + _error_location(source, position))")
+    out.level -= 2 if loop else 1
+    out.line()
+
+
+def _recursive_calls(productions, non_terminals):
+    # برای هر غیرپایانه، غیرپایانه‌هایی که فراخوانی‌شان می‌تواند دوباره به آن برسد (یک چرخه بازگشتی)
+    # بازگشت انتهایی به خود غیرپایانه حلقه است و فراخوانی حساب نمی‌شود
+    calls = {nt: set() for nt in non_terminals}
+    for nt, rules in productions.items():
+        for rhs in rules:
+            symbols = [symbol for symbol in rhs if symbol in non_terminals]
+            if symbols and rhs[-1] == nt:
+                symbols.pop()
+            calls[nt].update(symbols)
+    reach = {}
+    for nt in non_terminals:
+        seen = set()
+        stack = list(calls[nt])
+        while stack:
+            symbol = stack.pop()
+            if symbol not in seen:
+                seen.add(symbol)
+                stack.extend(calls[symbol])
+        reach[nt] = seen
+    return {nt: {callee for callee in calls[nt] if nt in reach[callee]} for nt in non_terminals}
+
+
+def generate_parser(grammar):
+    """متن منبع ماژول پارسر اختصاصی برای grammar (یک CPPGrammar)"""
+    compiled = grammar.compile_parse_table()
+    parse_table = compiled.parse_table
+    non_terminals = set(parse_table)
+
+    # شاخه‌های هر غیرپایانه: (شماره تولید، سمت راست، مجموعه پیش‌بینی) به ترتیب شماره تولید
+    production_ids = {(nt, id(rhs)): index for index, (nt, rhs) in enumerate(compiled.productions)}
+    branches = {nt: {} for nt in non_terminals}
+    for nt, row in parse_table.items():
+        for term, rhs in row.items():
+            index = production_ids[(nt, id(rhs))]
+            branches[nt].setdefault(index, (index, rhs, set()))[2].add(term)
+
+    recursive = _recursive_calls(grammar.productions, non_terminals)
+    out = _Writer()
+    out.level = 1
+    for build_tree in (False, True):
+        for nt in sorted(non_terminals):
+            _write_function(out, nt, sorted(branches[nt].values(), key=lambda b: b[0]),
+                            list(parse_table[nt].keys()), non_terminals, build_tree, recursive[nt])
+
+    productions = '\n'.join(f"    ({nt!r}, {rhs!r})," for nt, rhs in compiled.productions)
+    # هر خانه به سمت راست همان تولید در PRODUCTIONS اشاره می‌کند تا CompiledParseTable تولیدها را یکی بداند
+    parse_table_rows = '\n'.join(
+        f"    {nt!r}: {{" + ", ".join(f"{term!r}: PRODUCTIONS[{production_ids[(nt, id(rhs))]}][1]"
+                                     for term, rhs in row.items()) + "},"
+        for nt, row in parse_table.items())
+    header = _HEADER.format(fingerprint=grammar.fingerprint, start=grammar.start, productions=productions,
+                            parse_table=parse_table_rows)
+    return header + '\n' + '\n'.join(out.lines) + '\n' + _FOOTER.format(start=grammar.start)
+
+
+def load_parser(grammar, name='generated_parser'):
+    # ساخت و بارگذاری ماژول پارسر در حافظه، بدون نوشتن فایل
+    module = types.ModuleType(name)
+    exec(compile(generate_parser(grammar), f'<{name}>', 'exec'), module.__dict__)
+    return module
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="تولید ماژول پارسر اختصاصی از جدول تجزیه CPPGrammar")
+    arg_parser.add_argument('output', nargs='?', help="فایل خروجی؛ بدون آن، کد در خروجی استاندارد چاپ می‌شود")
+    args = arg_parser.parse_args(argv)
+
+    source = generate_parser(CPPGrammar())
+    if args.output is None:
+        sys.stdout.write(source)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(source)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,16 @@
+import json
+from collections import Counter, namedtuple
+
+from grammar import CompiledParseTable
+from lexical_analyzer import TokenStore, error_message
+
+
 class TreeNode:
     """کلاس برای نمایش گره‌های درخت پارس"""
 
+    # بدون __dict__ برای هر گره، تا درخت‌های بزرگ حافظه کمتری مصرف کنند
+    __slots__ = ('value', 'children')
+
     def __init__(self, value):
         # مقدار (value) گره را تعیین می‌کند و لیستی از فرزندان (children) برای گره ایجاد می‌کند
         self.value = value
@@ -8,83 +18,525 @@ class TreeNode:
 
     def __repr__(self, level=0):
         # نمایش گرافیکی گره و فرزندان آن با استفاده از فاصله گذاری
-        ret = "  " * level + f"{self.value}\n"  # برای هر سطح فاصله ایجاد می‌کند
-        for child in self.children:
-            ret += child.__repr__(level + 1)  # بازگشتی برای فرزندان
-        return ret
+        # پیمایش غیربازگشتی است، پس عمق درخت محدود به حد بازگشت پایتون نیست
+        return ''.join(_text_lines(self, level))
+
+
+def walk_tree(root):
+    """پیمایش پیش‌ترتیب غیربازگشتی درخت
+
+    برای هر گره یک بار (True, عمق، گره) هنگام ورود و پس از همه فرزندانش (False, عمق، گره)
+    هنگام خروج تولید می‌شود.
+    """
+    stack = [(root, 0, True)]
+    while stack:
+        node, depth, entering = stack.pop()
+        yield entering, depth, node
+        if entering:
+            stack.append((node, depth, False))
+            # فرزندان به ترتیب معکوس اضافه می‌شوند تا به ترتیب اصلی پیمایش شوند
+            stack.extend((child, depth + 1, True) for child in reversed(node.children))
+
+
+def _text_lines(root, level=0):
+    # خطوط نمایش متنی درخت (همان قالب TreeNode.__repr__)
+    for entering, depth, node in walk_tree(root):
+        if entering:
+            yield "  " * (level + depth) + f"{node.value}\n"
+
+
+def _json_parts(root):
+    # بخش‌های JSON تودرتو به شکل {"value": ..., "children": [...]}
+    first_child = [True]  # برای هر عمق: آیا فرزند بعدی اولین فرزند است (بدون کاما)
+    for entering, depth, node in walk_tree(root):
+        if entering:
+            if not first_child[depth]:
+                yield ','
+            first_child[depth] = False
+            del first_child[depth + 1:]
+            first_child.append(True)
+            yield '{"value":' + json.dumps(node.value, ensure_ascii=False) + ',"children":['
+        else:
+            yield ']}'
+    yield '\n'
+
+
+def _dot_parts(root):
+    # گراف Graphviz: هر گره یک شناسه عددی و یک برچسب دارد و هر یال از والد به فرزند است
+    yield 'digraph ParseTree {\n'
+    parent_ids = []  # شناسه گره‌های مسیر فعلی از ریشه، به ازای هر عمق
+    next_id = 0
+    for entering, depth, node in walk_tree(root):
+        if not entering:
+            continue
+        del parent_ids[depth:]
+        label = str(node.value).replace('\\', '\\\\').replace('"', '\\"')
+        yield f'  n{next_id} [label="{label}"];\n'
+        if parent_ids:
+            yield f'  n{parent_ids[-1]} -> n{next_id};\n'
+        parent_ids.append(next_id)
+        next_id += 1
+    yield '}\n'
+
+
+_TREE_WRITERS = {'text': _text_lines, 'json': _json_parts, 'dot': _dot_parts}
+
+
+def write_tree(node, fp, fmt='text', buffer_size=64 * 1024):
+    """نوشتن جریانی درخت پارس در شیء فایل fp با قالب 'text'، 'json' یا 'dot'
+
+    خروجی در بسته‌های حدوداً buffer_size کاراکتری نوشته می‌شود و کل رشته در حافظه ساخته نمی‌شود.
+    """
+    if fmt not in _TREE_WRITERS:
+        raise ValueError(f"قالب ناشناخته: {fmt}")
+    parts = []
+    size = 0
+    for part in _TREE_WRITERS[fmt](node):
+        parts.append(part)
+        size += len(part)
+        if size >= buffer_size:
+            fp.write(''.join(parts))
+            parts.clear()
+            size = 0
+    if parts:
+        fp.write(''.join(parts))
+
+
+# نوع توکن‌هایی که مقدارشان (و نه نوعشان) نماد پایانی گرامر است، مثل 'int' یا ';' یا '#include'
+VALUE_TOKEN_TYPES = frozenset({'SYMBOL', 'RESERVEDWORD', 'PREPROCESSOR'})
+
+
+def token_terminal(token):
+    """نماد پایانی گرامر متناظر با یک توکن (نوع، مقدار)"""
+    token_type, value = token
+    if token_type in VALUE_TOKEN_TYPES:
+        return value
+    return token_type
+
+
+def _source_location(source, position):
+    # (خط، ستون) توکن شماره position اگر ورودی TokenStore باشد، و گرنه None
+    if not isinstance(source, TokenStore):
+        return None
+    if position < len(source):
+        return source.position(position)
+    return source.location(len(source.source))
+
+
+def _error_location(source, position):
+    # اگر ورودی TokenStore باشد، خط و ستون توکن شماره position به پیام خطا اضافه می‌شود
+    location = _source_location(source, position)
+    if location is None:
+        return ''
+    return f" (خط {location[0]}، ستون {location[1]})"
+
+
+# یک خطای گزارش‌شده در حالت recover: نوع ('lexical' یا 'syntax')، پیام (با خط و ستون در صورت
+# وجود)، شماره توکن در ورودی و خط و ستون (یا None اگر ورودی TokenStore نباشد)
+Diagnostic = namedtuple('Diagnostic', ['kind', 'message', 'index', 'line', 'column'])
+
+# نمادهایی که در بازیابی از خطا، رد کردن توکن‌ها در آن‌ها متوقف می‌شود (پایان دستور و بلوک)
+SYNC_SYMBOLS = frozenset({';', '}'})
+
+
+class ParseCounters:
+    """شمارنده‌هایی که خود حلقه تجزیه PredictiveParser(..., counters=True) جمع می‌کند
+
+    expansions[i] تعداد گسترش‌ها با تولید شماره i جدول عددی است؛ خواندن‌های جدول و نمادهای
+    گذاشته‌شده روی پشته برای هر غیرپایانه از آن به دست می‌آیند. misses[X] خواندن‌هایی از سطر X است
+    که به گسترش نرسیدند: خطای نحوی و خواندن‌های رد کردن توکن‌ها در بازیابی از خطا. peak_depth
+    بیشترین عمق پشته (با '$') و parses تعداد تجزیه‌هاست.
+    """
+
+    def __init__(self, compiled_table):
+        self.compiled_table = compiled_table
+        self.expansions = [0] * len(compiled_table.productions)
+        self.misses = [0] * len(compiled_table.symbols)
+        self.peak_depth = 0
+        self.parses = 0
+
+    def table_lookups(self):
+        # غیرپایانه -> تعداد خواندن از جدول تجزیه
+        compiled = self.compiled_table
+        lookups = Counter()
+        for (nt, _), count in zip(compiled.productions, self.expansions):
+            if count:
+                lookups[nt] += count
+        for symbol, count in enumerate(self.misses):
+            if count:
+                lookups[compiled.symbols[symbol]] += count
+        return lookups
+
+    def stack_pushes(self):
+        # غیرپایانه -> تعداد نمادهای گذاشته‌شده روی پشته در گسترش آن
+        compiled = self.compiled_table
+        pushes = Counter()
+        for (nt, _), rhs, count in zip(compiled.productions, compiled.reversed_rhs, self.expansions):
+            if count:
+                pushes[nt] += count * len(rhs)
+        return pushes
+
+    def tree_nodes(self):
+        # تعداد گره‌های درخت‌های پارس: یک ریشه برای هر تجزیه و یک گره برای هر نماد گذاشته‌شده
+        return self.parses + sum(self.stack_pushes().values())
 
 
 class PredictiveParser:
-    def __init__(self, parse_table):
-        # ذخیره جدول تجزیه و تنظیم اولیه پشته و بافر ورودی
-        self.parse_table = parse_table
-        self.stack = ['$', 'Start']  # پشته با نماد شروع 'Start' و نماد پایان '$'
-        self.input_buffer = []  # بافر ورودی که توکن‌ها در آن قرار می‌گیرند
+    def __init__(self, parse_table, recover=False, follow=None, counters=False):
+        # parse_table می‌تواند جدول دیکشنری CPPGrammar یا CompiledParseTable باشد
+        # جدول دیکشنری برای پیام‌های خطا و اشکال‌زدایی نگه داشته می‌شود
+        # با recover، تجزیه در اولین خطا متوقف نمی‌شود و همه خطاها در self.diagnostics جمع می‌شوند
+        # بازیابی به مجموعه‌های FOLLOW نیاز دارد: با جدول دیکشنری باید follow (مثلاً CPPGrammar().follow)
+        # هم داده شود، یا جدول از compile_parse_table گرفته شود
+        # با counters، حلقه تجزیه شمارنده‌های self.counters (ParseCounters) را به‌روز می‌کند
+        self.recover = recover
+        if isinstance(parse_table, CompiledParseTable):
+            self.compiled_table = parse_table
+            self.parse_table = parse_table.parse_table
+        else:
+            self.compiled_table = CompiledParseTable(parse_table, follow=follow)
+            self.parse_table = parse_table
+        if recover and not self.compiled_table.has_follow:
+            raise ValueError("بازیابی از خطا به مجموعه‌های FOLLOW نیاز دارد؛ "
+                             "follow را بدهید یا از CPPGrammar().compile_parse_table() استفاده کنید")
+        self.counters = ParseCounters(self.compiled_table) if counters else None
+        self.non_terminals = frozenset(self.parse_table)
+        self.reset()
+
+    def reset(self):
+        # بازنشانی پشته و تولیدات تا نمونه برای تجزیه سند بعدی آماده باشد
+        # پشته شامل شماره نمادها در self.compiled_table.symbols است
+        self.stack = [self.compiled_table.end, self.compiled_table.start]
         self.productions = []  # ذخیره تولیدات به صورت (غیرپایانه، قاعده تولید)
+        self.tree = None  # ریشه درخت پارس، اگر parse با build_tree فراخوانی شده باشد
+        self.diagnostics = []  # خطاهای گزارش‌شده در حالت recover
 
-    def parse(self, tokens):
+    def parse(self, tokens, build_tree=False):
         # متد برای تجزیه ورودی و استفاده از الگوریتم پارس پیش‌بینی‌کننده
-        self.input_buffer = [t[0] for t in tokens] + ['$']  # بافر ورودی که با علامت پایان '$' پر می‌شود
-        while self.stack:
-            top = self.stack[-1]  # نماد بالای پشته
-            current_input = self.input_buffer[0]  # نماد ورودی فعلی
-
-            if top == current_input == '$':
-                # اگر هر دو نماد پشته و ورودی برابر '$' باشند، تجزیه موفقیت‌آمیز است
-                return True
-
-            if top == current_input:
-                # اگر نمادهای پشته و ورودی برابر باشند، آنها را از پشته و بافر ورودی حذف می‌کنیم
-                self.stack.pop()
-                self.input_buffer.pop(0)
+        # tokens می‌تواند لیست یا هر پیمایشگری (مثلاً iter_tokens) باشد
+        # هر فراخوانی از پشته تازه شروع می‌کند، پس یک نمونه بارها قابل استفاده است
+        # اگر build_tree درست باشد، درخت پارس هم‌زمان با تجزیه در self.tree ساخته می‌شود
+        # در حالت recover به جای پرتاب SyntaxError، خطاها در self.diagnostics جمع می‌شوند و
+        # مقدار برگشتی نشان می‌دهد که ورودی بدون خطا بوده است یا نه
+        self.productions = []
+        self.tree = None
+        self.diagnostics = []
+        if self.recover:
+            return self._parse_recover(tokens, build_tree)
+        if not build_tree:
+            self.productions.extend(self.iter_parse(tokens))
+            return True
+
+        builder = ParseTreeBuilder(self.non_terminals, self.compiled_table.symbols[self.compiled_table.start])
+        self.tree = builder.root
+        record = self.productions.append
+        add = builder.add
+        for production in self.iter_parse(tokens):
+            record(production)
+            add(*production)
+        return True
+
+    def build_tree(self):
+        # ساخت self.tree از self.productions پس از یک parse بدون درخت (فقط در حالت عادی، چون
+        # غیرپایانه‌های کنارگذاشته‌شده در بازیابی در دنباله تولیدات نیستند)
+        builder = ParseTreeBuilder(self.non_terminals, self.compiled_table.symbols[self.compiled_table.start])
+        add = builder.add
+        for production in self.productions:
+            add(*production)
+        self.tree = builder.root
+        return self.tree
+
+    def _parse_recover(self, tokens, build_tree):
+        # نسخه parse برای حالت recover
+        builder = None
+        if build_tree:
+            builder = ParseTreeBuilder(self.non_terminals, self.compiled_table.symbols[self.compiled_table.start])
+            self.tree = builder.root
+        record = self.productions.append
+        for production in self.iter_parse_recover(tokens):
+            if production[1] is None:
+                # غیرپایانه‌ای که در بازیابی کنار گذاشته شده، در درخت بدون فرزند می‌ماند
+                if builder is not None:
+                    builder.skip(production[0])
+                continue
+            record(production)
+            if builder is not None:
+                builder.add(*production)
+        return not self.diagnostics
+
+    def parse_many(self, token_streams):
+        # تجزیه دسته‌ای چند سند با همین نمونه و همین جدول تجزیه
+        # برای هر سند به ترتیب لیست تولیدات، یا SyntaxError اگر تجزیه ناموفق باشد، تولید می‌شود
+        for tokens in token_streams:
+            if isinstance(tokens, ValueError):
+                # خطای توکنایز (از tokenize_many) بدون تغییر گزارش می‌شود
+                yield tokens
+                continue
+            try:
+                self.parse(tokens)
+            except SyntaxError as e:
+                yield e
             else:
-                if top not in self.parse_table:
-                    # اگر نماد بالای پشته در جدول تجزیه وجود نداشته باشد، خطای نحوی پرتاب می‌شود
-                    raise SyntaxError(f"خطای نحوی: غیرپایانه ناشناخته {top}")
+                yield self.productions
+
+    def iter_parse(self, tokens):
+        """تجزیه ورودی و تولید تدریجی تولیدات (غیرپایانه، قاعده تولید)
+
+        توکن‌ها یکی‌یکی از پیمایشگر خوانده می‌شوند و جلو رفتن در ورودی O(1) است،
+        پس حافظه مصرفی فقط به عمق پشته بستگی دارد و نه به اندازه ورودی.
+        پشته شامل شماره نمادها در جدول عددی است و هر گسترش یک خواندن از آرایه جدول است.
+        """
+        compiled = self.compiled_table
+        return self.iter_parse_from(tokens, [compiled.end, compiled.start])
 
-                production = self.parse_table[top].get(current_input)  # پیدا کردن تولید مربوطه
-                if not production:
+    def iter_parse_from(self, tokens, stack, position=0, source=None):
+        """مانند iter_parse، ولی ادامه تجزیه از پشته stack (شماره نمادها، بالای پشته در انتها)
+
+        tokens ادامه ورودی از توکن شماره position است؛ source ورودی کامل (مثلاً TokenStore) برای
+        خط و ستون پیام‌های خطاست و پیش‌فرض آن خود tokens است.
+        """
+        source = tokens if source is None else source
+        tokens = iter(tokens)
+        compiled = self.compiled_table
+        table = compiled.table
+        n_terminals = compiled.n_terminals
+        reversed_rhs = compiled.reversed_rhs
+        productions = compiled.productions
+        terminal_ids = compiled.terminal_ids
+        symbols = compiled.symbols
+        unknown = compiled.unknown
+        end = compiled.end
+        self.stack = stack
+        counters = self.counters
+        expansions = None  # بدون شمارنده‌ها None، تا حلقه فقط یک بررسی اضافه داشته باشد
+        if counters is not None:
+            counters.parses += 1
+            counters.peak_depth = max(counters.peak_depth, len(stack))
+            expansions = counters.expansions
+
+        token = next(tokens, None)  # توکن فعلی؛ None یعنی پایان ورودی
+        # شماره نماد ورودی فعلی
+        if token is None:
+            current = end
+        else:
+            current = terminal_ids.get(token[1] if token[0] in VALUE_TOKEN_TYPES else token[0], unknown)
+        while True:
+            top = stack[-1]  # نماد بالای پشته
+
+            if top < n_terminals:
+                if top == current:
+                    if top == end:
+                        # اگر هر دو نماد پشته و ورودی برابر '$' باشند، تجزیه موفقیت‌آمیز است
+                        return
+                elif token is None or token[0] != 'NUMBER' or symbols[top] != token[1]:
+                    # نماد پایانی بالای پشته با ورودی برابر نیست؛ فقط عددی که مقدارش خود نماد است
+                    # (مثل '0' در return 0) با مقدار تطبیق داده می‌شود
+                    raise SyntaxError(f"خطای نحوی: غیرپایانه ناشناخته {symbols[top]}"
+                                      + _error_location(source, position))
+                # نماد از پشته حذف شده و توکن بعدی خوانده می‌شود
+                stack.pop()
+                position += 1
+                token = next(tokens, None)
+                if token is None:
+                    current = end
+                else:
+                    current = terminal_ids.get(token[1] if token[0] in VALUE_TOKEN_TYPES else token[0], unknown)
+            else:
+                index = table[top * n_terminals + current]  # پیدا کردن تولید مربوطه
+                if index < 0:
                     # اگر تولیدی برای نماد ورودی یافت نشد، خطای نحوی با نمادهای مورد انتظار پرتاب می‌شود
-                    expected = list(self.parse_table[top].keys())
-                    raise SyntaxError(f"خطای نحوی در {current_input}. انتظار می‌رفت: {expected}")
-
-                self.stack.pop()
-                if production[0] != 'ε':
-                    # اگر تولید 'ε' نباشد، نمادهای تولید معکوس به پشته اضافه می‌شوند
-                    for symbol in reversed(production):
-                        self.stack.append(symbol)
-                self.productions.append((top, production))  # تولید را ذخیره می‌کنیم
-        return True
+                    if counters is not None:
+                        counters.misses[top] += 1
+                    current_input = '$' if token is None else token_terminal(token)
+                    expected = list(self.parse_table[symbols[top]].keys())
+                    raise SyntaxError(f"خطای نحوی در {current_input}. انتظار می‌رفت: {expected}"
+                                      + _error_location(source, position))
 
+                # جایگزینی غیرپایانه با سمت راست معکوس تولید ('ε' تاپل خالی است)
+                stack[-1:] = reversed_rhs[index]
+                if expansions is not None:
+                    expansions[index] += 1
+                    if len(stack) > counters.peak_depth:
+                        counters.peak_depth = len(stack)
+                yield productions[index]  # تولید را گزارش می‌کنیم
 
-def build_parse_tree(productions, grammar):
-    """ساخت درخت پارس از دنباله تولیدات"""
-    if not productions:
-        # اگر دنباله تولیدات خالی باشد، درختی ساخته نمی‌شود
-        return None
+    def _report(self, kind, message, source, position):
+        # ثبت یک خطا در self.diagnostics
+        location = _source_location(source, position)
+        if location is None:
+            self.diagnostics.append(Diagnostic(kind, message, position, None, None))
+        else:
+            line, column = location
+            self.diagnostics.append(Diagnostic(kind, f"{message} (خط {line}، ستون {column})", position, line, column))
 
-    root = TreeNode(grammar.start)  # ریشه درخت با نماد شروع ساخته می‌شود
-    stack = [root]  # پشته شامل ریشه است
+    def _recovering_tokens(self, source):
+        # توکن‌های ERROR (خطای واژگانی) گزارش و حذف می‌شوند و بقیه با شماره‌شان در ورودی تولید می‌شوند
+        # در پایان (تعداد توکن‌ها، None) تولید می‌شود
+        count = 0
+        for count, token in enumerate(source, 1):
+            if token[0] == 'ERROR':
+                self._report('lexical', error_message(token[1]), source, count - 1)
+            else:
+                yield count - 1, token
+        yield count, None
 
-    for lhs, rhs in productions:
-        # برای هر جفت تولید (lhs، rhs) در دنباله تولیدات
-        if not stack:
+    def iter_parse_recover(self, tokens):
+        """مانند iter_parse، ولی با بازیابی از خطا در یک گذر (panic mode)
+
+        در هر خطا پیامی مانند حالت عادی در self.diagnostics ثبت می‌شود و تجزیه ادامه می‌یابد:
+        - نماد پایانی بالای پشته که با ورودی نمی‌خواند، گمشده فرض شده و از پشته حذف می‌شود.
+        - برای غیرپایانه X توکن‌ها رد می‌شوند تا به نمادی در سطر X از جدول (ادامه X)، در FOLLOW(X)،
+          '}' یا پایان ورودی برسیم (کنار گذاشتن X). ';' مصرف می‌شود و اگر توکن بعدی X را شروع
+          نکند، X کنار گذاشته می‌شود.
+        برای غیرپایانه کنار گذاشته‌شده (X، None) تولید می‌شود. چند خطای پیاپی روی یک توکن فقط یک
+        بار گزارش می‌شوند.
+        """
+        source = tokens
+        stream = self._recovering_tokens(source)
+        compiled = self.compiled_table
+        table = compiled.table
+        n_terminals = compiled.n_terminals
+        reversed_rhs = compiled.reversed_rhs
+        productions = compiled.productions
+        terminal_ids = compiled.terminal_ids
+        symbols = compiled.symbols
+        follow = compiled.follow
+        unknown = compiled.unknown
+        end = compiled.end
+        semicolon = terminal_ids.get(';')
+        close_brace = terminal_ids.get('}')
+        self.stack = stack = [end, compiled.start]
+        reported = -1  # شماره توکن آخرین خطای نحوی گزارش‌شده
+        counters = self.counters
+        expansions = misses = None
+        if counters is not None:
+            counters.parses += 1
+            counters.peak_depth = max(counters.peak_depth, len(stack))
+            expansions, misses = counters.expansions, counters.misses
+
+        position, token = next(stream)
+        if token is None:
+            current = end
+        else:
+            current = terminal_ids.get(token[1] if token[0] in VALUE_TOKEN_TYPES else token[0], unknown)
+        while True:
+            top = stack[-1]
+
+            if top < n_terminals:
+                if top == current or (token is not None and token[0] == 'NUMBER' and symbols[top] == token[1]):
+                    if top == end:
+                        return
+                    stack.pop()
+                    position, token = next(stream)
+                    if token is None:
+                        current = end
+                    else:
+                        current = terminal_ids.get(token[1] if token[0] in VALUE_TOKEN_TYPES else token[0], unknown)
+                    continue
+                if position != reported:
+                    reported = position
+                    self._report('syntax', f"خطای نحوی: غیرپایانه ناشناخته {symbols[top]}", source, position)
+                if top == end:
+                    # توکن‌های اضافه بعد از پایان برنامه رد می‌شوند (خطاهای واژگانی آن‌ها هنوز گزارش می‌شوند)
+                    while token is not None:
+                        position, token = next(stream)
+                    return
+                stack.pop()
+                continue
+
+            base = top * n_terminals
+            index = table[base + current]
+            if index < 0:
+                if misses is not None:
+                    misses[top] += 1
+                if position != reported:
+                    reported = position
+                    current_input = '$' if token is None else token_terminal(token)
+                    expected = list(self.parse_table[symbols[top]].keys())
+                    self._report('syntax', f"خطای نحوی در {current_input}. انتظار می‌رفت: {expected}",
+                                 source, position)
+                sync = follow[top]
+                while current != end and current not in sync and current != close_brace:
+                    is_semicolon = current == semicolon
+                    position, token = next(stream)
+                    if token is None:
+                        current = end
+                    else:
+                        current = terminal_ids.get(token[1] if token[0] in VALUE_TOKEN_TYPES else token[0], unknown)
+                    if is_semicolon:
+                        break
+                    if misses is not None:
+                        misses[top] += 1
+                    if table[base + current] >= 0:
+                        break
+                index = table[base + current]
+                if index < 0:
+                    # کنار گذاشتن X؛ ادامه تجزیه با نماد زیر آن در پشته
+                    if misses is not None:
+                        misses[top] += 1
+                    stack.pop()
+                    yield symbols[top], None
+                    continue
+
+            stack[-1:] = reversed_rhs[index]
+            if expansions is not None:
+                expansions[index] += 1
+                if len(stack) > counters.peak_depth:
+                    counters.peak_depth = len(stack)
+            yield productions[index]
+
+
+class ParseTreeBuilder:
+    """ساخت تدریجی و خطی درخت پارس از دنباله تولیدات
+
+    فرزندان هر گره یک‌جا و به ترتیب ساخته می‌شوند و شکل هر قاعده تولید (نمادهای غیر 'ε' و جای
+    غیرپایانه‌ها) فقط یک بار محاسبه می‌شود، پس زمان ساخت با تعداد گره‌ها خطی است.
+    """
+
+    def __init__(self, non_terminals, start='Start'):
+        self.non_terminals = non_terminals
+        self.root = TreeNode(start)  # ریشه درخت با نماد شروع ساخته می‌شود
+        self.stack = [self.root]  # پشته گره‌های غیرپایانه‌ای که هنوز گسترش نیافته‌اند
+        self._shapes = {}  # id(rhs) -> (rhs، نمادهای فرزندان، اندیس غیرپایانه‌ها به ترتیب معکوس)
+
+    def skip(self, lhs):
+        # گره غیرپایانه بعدی (lhs) بدون گسترش کنار گذاشته می‌شود (بازیابی از خطا در پارسر)
+        if not self.stack:
             raise ValueError("خطا در دنباله تولیدات: پشته خالی است")
+        current_node = self.stack.pop()
+        if current_node.value != lhs:
+            raise ValueError(f"تولید برای {lhs} با گره فعلی {current_node.value} مطابقت ندارد")
 
-        current_node = stack.pop()  # گره فعلی از پشته برداشته می‌شود
+    def add(self, lhs, rhs):
+        # افزودن یک تولید (lhs، rhs) به درخت
+        if not self.stack:
+            raise ValueError("خطا در دنباله تولیدات: پشته خالی است")
 
+        current_node = self.stack.pop()  # گره فعلی از پشته برداشته می‌شود
         if current_node.value != lhs:
             # اگر نماد سمت چپ تولید با مقدار گره فعلی مطابقت نداشته باشد، خطا رخ می‌دهد
             raise ValueError(f"تولید برای {lhs} با گره فعلی {current_node.value} مطابقت ندارد")
 
-        for symbol in reversed(rhs):
-            # برای هر نماد در دنباله راست تولید
-            if symbol == 'ε':
-                continue  # اگر نماد 'ε' باشد، هیچ کاری انجام نمی‌دهیم
-            child = TreeNode(symbol)  # یک گره فرزند جدید ساخته می‌شود
-            current_node.children.insert(0, child)  # فرزند در ابتدای لیست فرزندان اضافه می‌شود
-            if symbol in grammar.non_terminals:
-                # اگر نماد یک غیرپایانه باشد، آن را به پشته اضافه می‌کنیم
-                stack.append(child)
-
-    return root  # ریشه درخت پارس ساخته شده باز می‌گردد
+        shape = self._shapes.get(id(rhs))
+        if shape is None:
+            # خود rhs هم نگه داشته می‌شود تا id آن تا پایان ساخت درخت تکرار نشود
+            symbols = [symbol for symbol in rhs if symbol != 'ε']
+            nt_positions = [i for i in range(len(symbols) - 1, -1, -1) if symbols[i] in self.non_terminals]
+            shape = self._shapes[id(rhs)] = (rhs, symbols, nt_positions)
+
+        children = current_node.children = [TreeNode(symbol) for symbol in shape[1]]
+        for i in shape[2]:
+            # غیرپایانه‌ها به ترتیب معکوس به پشته اضافه می‌شوند تا اولین آن‌ها زودتر گسترش یابد
+            self.stack.append(children[i])
+
+
+def build_parse_tree(productions, grammar):
+    """ساخت درخت پارس از دنباله تولیدات"""
+    if not productions:
+        # اگر دنباله تولیدات خالی باشد، درختی ساخته نمی‌شود
+        return None
+
+    builder = ParseTreeBuilder(grammar.non_terminals, grammar.start)
+    for lhs, rhs in productions:
+        builder.add(lhs, rhs)
+    return builder.root  # ریشه درخت پارس ساخته شده باز می‌گردد
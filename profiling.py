@@ -0,0 +1,163 @@
+"""اندازه‌گیری زمان مراحل و شمارنده‌های مسیرهای داغ توکنایزر و پارسر
+
+PipelineStats زمان دیواری و زمان CPU هر مرحله (tokenize، token table، grammar، parse، tree) را
+جمع می‌کند و شمارنده‌ها را نگه می‌دارد: تعداد کاراکترهای خوانده‌شده در هر وضعیت DFA (یا در هر مسیر
+پویش موتور کامپایل‌شده)، تعداد خواندن‌های جدول تجزیه و نمادهای گذاشته‌شده روی پشته برای هر
+غیرپایانه، بیشترین عمق پشته و تعداد گره‌های درخت پارس.
+
+شمارنده‌ها را خود توکنایزر و پارسری که اجرا می‌شوند جمع می‌کنند: DFATokenizer(state_chars=...)،
+CompiledTokenizer(path_chars=...) یا tokenize_file(path_chars=...) و PredictiveParser(counters=True)
+که count_parse شمارنده‌های آن را برمی‌دارد. بدون این گزینه‌ها حلقه‌های داغ فقط یک بررسی None اضافه
+دارند. با PipelineStats(enabled=False) هر مرحله یک context manager خالی است و شمارنده‌ها بلافاصله
+برمی‌گردند، پس هزینه حالت غیرفعال تقریباً صفر است.
+"""
+import json
+import time
+from collections import Counter
+
+# ترتیب نمایش مراحل شناخته‌شده؛ مراحل دیگر پس از این‌ها و به ترتیب اولین اجرا می‌آیند
+STAGES = ('tokenize', 'token table', 'grammar', 'parse', 'tree')
+
+
+class _StageTimer:
+    # context manager یک مرحله؛ زمان‌ها به ردیف [تعداد اجرا، ثانیه دیواری، ثانیه CPU] اضافه می‌شوند
+    __slots__ = ('row', 'wall', 'cpu')
+
+    def __init__(self, row):
+        self.row = row
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        row = self.row
+        row[0] += 1
+        row[1] += time.perf_counter() - self.wall
+        row[2] += time.process_time() - self.cpu
+        return False
+
+
+class _NullStage:
+    # مرحله بدون اندازه‌گیری برای حالت غیرفعال
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class PipelineStats:
+    """زمان مراحل و شمارنده‌های یک یا چند اجرای خط لوله؛ نتایج چند فایل با هم جمع می‌شوند"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = {}  # نام مرحله -> [تعداد اجرا، ثانیه دیواری، ثانیه CPU]
+        self.characters = 0  # تعداد کاراکترهای ورودی
+        self.tokens = 0  # تعداد توکن‌ها
+        self.dfa_state_chars = Counter()  # وضعیت DFA -> تعداد کاراکترهای پردازش‌شده در آن (DFATokenizer)
+        self.scan_path_chars = Counter()  # مسیر پویش -> تعداد کاراکترها (CompiledTokenizer و tokenize_file)
+        self.table_lookups = Counter()  # غیرپایانه -> تعداد خواندن از جدول تجزیه
+        self.stack_pushes = Counter()  # غیرپایانه -> تعداد نمادهای گذاشته‌شده روی پشته در گسترش آن
+        self.peak_stack_depth = 0  # بیشترین عمق پشته پارسر (با نماد '$')
+        self.tree_nodes = 0  # تعداد گره‌های درخت پارس (یا درختی که از تولیدات ساخته می‌شد)
+
+    def stage(self, name):
+        # with stats.stage('parse'): ...
+        if not self.enabled:
+            return _NULL_STAGE
+        row = self.stages.get(name)
+        if row is None:
+            row = self.stages[name] = [0, 0.0, 0.0]
+        return _StageTimer(row)
+
+    def count_source(self, source, n_tokens):
+        # ثبت اندازه ورودی برای محاسبه گذردهی
+        # source می‌تواند بافر بایتی (mmap فایل) باشد؛ کاراکترهای رمزگشایی‌شده شمرده می‌شوند و نه بایت‌ها
+        if self.enabled:
+            if not isinstance(source, str):
+                source = bytes(source).decode('utf-8', 'replace')
+            self.characters += len(source)
+            self.tokens += n_tokens
+
+    def state_chars(self):
+        # شمارنده‌ای برای DFATokenizer(state_chars=...)؛ None در حالت غیرفعال
+        return self.dfa_state_chars if self.enabled else None
+
+    def path_chars(self):
+        # شمارنده‌ای برای CompiledTokenizer(path_chars=...) و tokenize_file؛ None در حالت غیرفعال
+        return self.scan_path_chars if self.enabled else None
+
+    def count_parse(self, parser):
+        """برداشتن شمارنده‌های parser.counters (PredictiveParser با counters=True) پس از تجزیه
+
+        شمارنده‌های پارسر پس از جمع شدن صفر می‌شوند تا نتیجه چند فایل با یک پارسر دو بار شمرده نشود.
+        """
+        counters = parser.counters
+        if not self.enabled or counters is None:
+            return
+        self.table_lookups.update(counters.table_lookups())
+        self.stack_pushes.update(counters.stack_pushes())
+        self.peak_stack_depth = max(self.peak_stack_depth, counters.peak_depth)
+        self.tree_nodes += counters.tree_nodes()
+        parser.counters = type(counters)(counters.compiled_table)
+
+    def to_dict(self):
+        # خلاصه قابل تبدیل به JSON
+        return {
+            'stages': {name: {'calls': calls, 'wall_seconds': wall, 'cpu_seconds': cpu}
+                       for name, (calls, wall, cpu) in self._ordered_stages()},
+            'characters': self.characters,
+            'tokens': self.tokens,
+            'dfa_state_chars': dict(self.dfa_state_chars.most_common()),
+            'scan_path_chars': dict(self.scan_path_chars.most_common()),
+            'table_lookups': dict(self.table_lookups.most_common()),
+            'stack_pushes': dict(self.stack_pushes.most_common()),
+            'peak_stack_depth': self.peak_stack_depth,
+            'tree_nodes': self.tree_nodes,
+        }
+
+    def write_json(self, fp):
+        json.dump(self.to_dict(), fp, ensure_ascii=False, indent=2)
+        fp.write('\n')
+
+    def summary(self):
+        # متن خلاصه برای چاپ
+        lines = ["{:<14} {:>6} {:>12} {:>12} {:>7}".format("Stage", "Calls", "Wall ms", "CPU ms", "Wall %")]
+        total = sum(row[1] for row in self.stages.values()) or 1.0
+        for name, (calls, wall, cpu) in self._ordered_stages():
+            lines.append("{:<14} {:>6} {:>12.3f} {:>12.3f} {:>6.1f}%".format(
+                name, calls, wall * 1e3, cpu * 1e3, wall / total * 100))
+
+        lines.append(f"\nCharacters: {self.characters}  Tokens: {self.tokens}")
+        for name, count, unit in (('tokenize', self.characters, 'chars'), ('parse', self.tokens, 'tokens')):
+            row = self.stages.get(name)
+            if row and row[1] > 0:
+                lines.append(f"{name} throughput: {count / row[1]:,.0f} {unit}/s")
+
+        if self.dfa_state_chars:
+            lines.append("\n{:<14} {:>12}".format("DFA state", "Chars"))
+            for state, count in self.dfa_state_chars.most_common():
+                lines.append("{:<14} {:>12}".format(state, count))
+        if self.scan_path_chars:
+            # مسیر بایتی tokenize_file بایت می‌شمارد و بقیه مسیرها کاراکتر
+            lines.append("\n{:<22} {:>12}".format("Scan path", "Chars/bytes"))
+            for path, count in self.scan_path_chars.most_common():
+                lines.append("{:<22} {:>12}".format(path, count))
+        if self.table_lookups:
+            lines.append("\n{:<14} {:>12} {:>12}".format("Non-terminal", "Lookups", "Pushes"))
+            for nt, count in self.table_lookups.most_common():
+                lines.append("{:<14} {:>12} {:>12}".format(nt, count, self.stack_pushes[nt]))
+            lines.append(f"\nPeak stack depth: {self.peak_stack_depth}")
+            lines.append(f"Tree nodes: {self.tree_nodes}")
+        return '\n'.join(lines)
+
+    def _ordered_stages(self):
+        known = [(name, self.stages[name]) for name in STAGES if name in self.stages]
+        return known + [(name, row) for name, row in self.stages.items() if name not in STAGES]
@@ -0,0 +1,162 @@
+"""کش نتایج توکنایز و تجزیه بر اساس محتوای فایل
+
+کلید هر نتیجه هش SHA-256 از اثر انگشت جدول تجزیه و بایت‌های کد منبع است؛ پس کد تغییرنکرده دوباره
+توکنایز و تجزیه نمی‌شود و با تغییر گرامر یا جدول همه نتایج قبلی خودبه‌خود نامعتبر می‌شوند.
+نتایج در یک LRU محدود در حافظه و در صورت تعیین cache_dir روی دیسک هم نگه داشته می‌شوند.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict, namedtuple
+
+from lexical_analyzer import CompiledTokenizer
+from predictive_parser import PredictiveParser, ParseTreeBuilder
+
+# نتیجه ذخیره‌شده: توکن‌ها (یا None اگر توکنایز ناموفق باشد)، تولیدات و متن خطا (یا None)
+CachedResult = namedtuple('CachedResult', ['tokens', 'productions', 'error'])
+
+
+class ResultCache:
+    def __init__(self, grammar, max_entries=1024, cache_dir=None, parse_table=None):
+        # grammar یک CPPGrammar است و parse_table یک CompiledParseTable آماده (پیش‌فرض جدول grammar)؛
+        # با parse_table، grammar می‌تواند None باشد. اثر انگشت همان جدولی که نتایج با آن محاسبه
+        # می‌شوند بخشی از کلید همه نتایج است
+        if parse_table is None:
+            parse_table = grammar.compile_parse_table()
+        self.grammar = grammar
+        self.fingerprint = parse_table.compute_fingerprint()
+        self.max_entries = max_entries
+        # نتایج هر گرامر در پوشه جداگانه‌ای ذخیره می‌شوند
+        self.cache_dir = None
+        if cache_dir is not None:
+            self.cache_dir = os.path.join(cache_dir, f'results-{self.fingerprint[:16]}')
+        self.tokenizer = CompiledTokenizer()
+        self.parser = PredictiveParser(parse_table)
+        productions = self.parser.compiled_table.productions
+        # شماره هر تولید برای ذخیره فشرده دنباله تولیدات روی دیسک
+        self._production_ids = {id(production): index for index, production in enumerate(productions)}
+        self._entries = OrderedDict()  # کلید -> CachedResult، به ترتیب استفاده (جدیدترین در انتها)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, source):
+        # کلید محتوایی: هش اثر انگشت جدول تجزیه و بایت‌های کد منبع
+        if isinstance(source, str):
+            source = source.encode('utf-8')
+        digest = hashlib.sha256(self.fingerprint.encode('ascii'))
+        digest.update(b'\0')
+        digest.update(source)
+        return digest.hexdigest()
+
+    def check(self, source):
+        """نتیجه توکنایز و تجزیه source (رشته یا بایت)؛ در صورت وجود از کش خوانده می‌شود"""
+        key = self.key(source)
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+        result = self._load(key)
+        if result is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            result = self._compute(source)
+            self._save(key, result)
+        self._remember(key, result)
+        return result
+
+    def parse_tree(self, result):
+        # ساخت درخت پارس از تولیدات ذخیره‌شده، بدون تجزیه دوباره
+        if result.error is not None or not result.productions:
+            return None
+        compiled = self.parser.compiled_table
+        builder = ParseTreeBuilder(frozenset(compiled.parse_table), compiled.symbols[compiled.start])
+        for lhs, rhs in result.productions:
+            builder.add(lhs, rhs)
+        return builder.root
+
+    def stats(self):
+        # آمار استفاده از کش
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def clear(self):
+        # پاک کردن نتایج حافظه (فایل‌های روی دیسک دست نمی‌خورند)
+        self._entries.clear()
+
+    def _compute(self, source):
+        # توکنایز و تجزیه واقعی؛ خطاها به صورت متن در نتیجه ذخیره می‌شوند
+        try:
+            # بایت‌های نامعتبر UTF-8 هم مثل خطای توکنایز در نتیجه ذخیره می‌شوند (UnicodeDecodeError یک ValueError است)
+            if isinstance(source, bytes):
+                source = source.decode('utf-8')
+            # با TokenStore پیام خطای نحوی شامل خط و ستون است
+            store = self.tokenizer.tokenize_store(source)
+        except ValueError as e:
+            return CachedResult(None, (), str(e))
+        tokens = tuple(store)
+        try:
+            self.parser.parse(store)
+        except SyntaxError as e:
+            return CachedResult(tokens, tuple(self.parser.productions), str(e))
+        return CachedResult(tokens, tuple(self.parser.productions), None)
+
+    def _remember(self, key, result):
+        # افزودن به LRU و بیرون انداختن قدیمی‌ترین نتیجه‌ها در صورت پر شدن
+        self._entries[key] = result
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _load(self, key):
+        # خواندن نتیجه از دیسک؛ اگر فایل نباشد یا معتبر نباشد None برمی‌گرداند
+        if self.cache_dir is None:
+            return None
+        productions = self.parser.compiled_table.productions
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                data = json.load(f)
+            if data['fingerprint'] != self.fingerprint:
+                return None
+            tokens = data['tokens']
+            if tokens is not None:
+                tokens = tuple((token_type, value) for token_type, value in tokens)
+            return CachedResult(tokens, tuple(productions[index] for index in data['productions']),
+                                data['error'])
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return None
+
+    def _save(self, key, result):
+        # ذخیره نتیجه روی دیسک با جایگزینی اتمی؛ خطای نوشتن نادیده گرفته می‌شود، چون کش اختیاری است
+        if self.cache_dir is None:
+            return
+        data = {
+            'fingerprint': self.fingerprint,
+            'tokens': result.tokens,
+            'productions': [self._production_ids[id(production)] for production in result.productions],
+            'error': result.error,
+        }
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
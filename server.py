@@ -0,0 +1,298 @@
+"""سرویس محلی بررسی کد با asyncio: توکنایز با DFATokenizer و تجزیه با PredictiveParser
+
+پروتکل خط‌به‌خط JSON است (روی TCP محلی یا سوکت یونیکس). هر درخواست یک خط است:
+    {"id": 1, "source": "int main(){ return 0; }", "recover": false, "tokens": true}
+و پاسخ آن چند خط با همان id است که به محض آماده شدن فرستاده می‌شوند:
+    {"id": 1, "type": "tokens", "tokens": [["RESERVEDWORD", "int"], ...]}    (تکه‌هایی از توکن‌ها)
+    {"id": 1, "type": "diagnostic", "kind": "syntax", "message": "...", "index": 5, ...}
+    {"id": 1, "type": "done", "ok": true, "tokens": 9, "productions": 12}
+درخواست نامعتبر یک خط {"id": ..., "type": "error", "message": ...} می‌گیرد. درخواست‌های یک اتصال
+می‌توانند پشت سر هم فرستاده شوند و پاسخ‌ها ممکن است به ترتیب پایان کار برسند.
+
+جدول تجزیه فقط یک بار ساخته می‌شود و از طریق initializer به فرایندهای کارگر داده می‌شود (مانند
+batch.py). فشار برگشتی: صف کارها اندازه محدود دارد و هر اتصال حداکثر max_pending درخواست
+در جریان دارد؛ وقتی هر کدام پر باشد، خواندن از آن اتصال متوقف می‌شود و کنترل جریان TCP فرستنده
+را کند می‌کند. نوشتن پاسخ‌ها هم پس از هر تکه منتظر خالی شدن بافر اتصال (drain) می‌ماند.
+
+    python server.py --port 8765
+    python server.py --unix /tmp/cpp-check.sock -j 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from lexical_analyzer import DFATokenizer
+from grammar import CPPGrammar
+from predictive_parser import PredictiveParser, Diagnostic
+
+# نتیجه بررسی یک متن: لیست توکن‌ها، لیست Diagnostic و تعداد تولیدات
+CheckResult = namedtuple('CheckResult', ['tokens', 'diagnostics', 'productions'])
+
+# توکنایزرها و پارسرهای هر فرایند کارگر (عادی و recover)؛ در _init_worker یک بار ساخته می‌شوند
+_worker_tokenizers = None
+_worker_parsers = None
+
+
+def _init_worker(compiled_table):
+    global _worker_tokenizers, _worker_parsers
+    _worker_tokenizers = {False: DFATokenizer(), True: DFATokenizer(recover=True)}
+    _worker_parsers = {False: PredictiveParser(compiled_table), True: PredictiveParser(compiled_table, recover=True)}
+
+
+def check_source(source, recover=False):
+    """توکنایز و تجزیه یک متن در فرایند کارگر و بازگرداندن CheckResult
+
+    بدون recover اولین خطای واژگانی یا نحوی به صورت تنها Diagnostic نتیجه برمی‌گردد. توکن‌های
+    DFATokenizer موقعیت ندارند، پس محل خطا شماره توکن (index، فقط در حالت recover) است و خط و
+    ستون None می‌مانند.
+    """
+    parser = _worker_parsers[recover]
+    tokens = []
+    try:
+        tokens = _worker_tokenizers[recover].tokenize(source)
+        parser.parse(tokens)
+    except ValueError as e:
+        return CheckResult(tokens, [Diagnostic('lexical', str(e), None, None, None)], 0)
+    except SyntaxError as e:
+        return CheckResult(tokens, [Diagnostic('syntax', str(e), None, None, None)], len(parser.productions))
+    return CheckResult(tokens, list(parser.diagnostics), len(parser.productions))
+
+
+def _line(message):
+    return (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+class CheckServer:
+    """سرور asyncio با یک صف محدود و workers فرایند کارگر
+
+    parse_table یک CompiledParseTable آماده است (پیش‌فرض از CPPGrammar ساخته می‌شود).
+    queue_size اندازه صف کارهای منتظر، max_pending بیشترین درخواست در جریان هر اتصال و
+    chunk_tokens تعداد توکن‌های هر خط پاسخ است. خط درخواست بزرگ‌تر از max_request_bytes رد می‌شود.
+    """
+
+    def __init__(self, parse_table=None, workers=None, queue_size=64, max_pending=8, chunk_tokens=1000,
+                 max_request_bytes=16 * 1024 * 1024):
+        self.compiled_table = parse_table or CPPGrammar().compile_parse_table()
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.max_pending = max_pending
+        self.chunk_tokens = chunk_tokens
+        self.max_request_bytes = max_request_bytes
+        self._server = None
+        self._executor = None
+        self._queue = None
+        self._tasks = []
+        self._connections = {}  # وظیفه هر اتصال باز -> writer آن
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """شروع سرور روی host:port یا سوکت یونیکس path و بازگرداندن نشانی آن"""
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(self.compiled_table,))
+        self._queue = asyncio.Queue(self.queue_size)
+        # به تعداد کارگرها وظیفه مصرف‌کننده؛ کارهای اضافه در صف محدود منتظر می‌مانند
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path, limit=self.max_request_bytes)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port, limit=self.max_request_bytes)
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        # اتصال‌های باز بسته می‌شوند تا وظیفه هر اتصال با EOF و پس از پایان کارهای در جریانش تمام شود
+        if self._server is not None:
+            self._server.close()
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def _handle(self, reader, writer):
+        # خواندن درخواست‌های یک اتصال؛ با پر بودن صف یا سهم اتصال، خواندن متوقف می‌شود
+        pending = asyncio.Semaphore(self.max_pending)
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # خط بزرگ‌تر از limit؛ ادامه خواندن این اتصال ممکن نیست
+                    writer.write(_line({'id': None, 'type': 'error', 'message': "درخواست بیش از حد بزرگ است"}))
+                    break
+                if not line:
+                    break
+                request = self._decode(line, writer)
+                if request is None:
+                    continue
+                await pending.acquire()
+                await self._queue.put((request, writer, pending))
+        except ConnectionError:
+            pass
+        finally:
+            # پیش از بستن اتصال، پاسخ درخواست‌های در جریان فرستاده می‌شود
+            for _ in range(self.max_pending):
+                await pending.acquire()
+            writer.close()
+            del self._connections[task]
+
+    def _decode(self, line, writer):
+        # درخواست معتبر (دیکشنری با source متنی)، یا None پس از فرستادن خطا
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            writer.write(_line({'id': None, 'type': 'error', 'message': f"JSON نامعتبر: {e}"}))
+            return None
+        if not isinstance(request, dict) or not isinstance(request.get('source'), str):
+            request_id = request.get('id') if isinstance(request, dict) else None
+            writer.write(_line({'id': request_id, 'type': 'error', 'message': "فیلد source (متن) لازم است"}))
+            return None
+        return request
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            request, writer, pending = await self._queue.get()
+            try:
+                result = await loop.run_in_executor(self._executor, check_source, request['source'],
+                                                    bool(request.get('recover', False)))
+                await self._send(writer, request, result)
+            except ConnectionError:
+                # اتصال پیش از پایان پاسخ بسته شده است
+                pass
+            except Exception as e:
+                # مثلاً از کار افتادن یک فرایند کارگر؛ خطا فقط به همین درخواست برمی‌گردد
+                writer.write(_line({'id': request.get('id'), 'type': 'error', 'message': repr(e)}))
+            finally:
+                pending.release()
+                self._queue.task_done()
+
+    async def _send(self, writer, request, result):
+        # فرستادن تکه‌های توکن، خطاها و خط پایانی؛ پس از هر تکه منتظر drain
+        request_id = request.get('id')
+        tokens = result.tokens
+        if request.get('tokens', True):
+            for start in range(0, len(tokens), self.chunk_tokens):
+                writer.write(_line({'id': request_id, 'type': 'tokens',
+                                    'tokens': tokens[start:start + self.chunk_tokens]}))
+                await writer.drain()
+        for diagnostic in result.diagnostics:
+            writer.write(_line({'id': request_id, 'type': 'diagnostic', **diagnostic._asdict()}))
+        writer.write(_line({'id': request_id, 'type': 'done', 'ok': not result.diagnostics,
+                            'tokens': len(tokens), 'productions': result.productions}))
+        await writer.drain()
+
+
+class CheckClient:
+    """کلاینت ساده برای CheckServer؛ چند درخواست هم‌زمان روی یک اتصال پشتیبانی می‌شود
+
+        client = await CheckClient.connect(port=8765)
+        response = await client.check("int main(){ return 0; }")
+        await client.close()
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._responses = {}  # id -> (future، دیکشنری پاسخ در حال جمع‌آوری)
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=None, path=None, limit=16 * 1024 * 1024):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=limit)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=limit)
+        return cls(reader, writer)
+
+    async def check(self, source, recover=False, tokens=True):
+        """فرستادن یک متن و بازگرداندن پاسخ کامل به صورت دیکشنری
+
+        کلیدها: ok، tokens (لیست توکن‌ها، یا تعداد آن‌ها اگر tokens=False)، diagnostics و productions.
+        """
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        # بدون tokens، مقدار tokens پاسخ تعداد توکن‌ها از پیام done است
+        self._responses[request_id] = (future, {'tokens': [] if tokens else None, 'diagnostics': []})
+        self._writer.write(_line({'id': request_id, 'source': source, 'recover': recover, 'tokens': tokens}))
+        await self._writer.drain()
+        return await future
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+        await asyncio.gather(self._receiver, return_exceptions=True)
+
+    async def _receive(self):
+        try:
+            async for line in self._reader:
+                message = json.loads(line)
+                entry = self._responses.get(message.get('id'))
+                if entry is None:
+                    continue
+                future, response = entry
+                kind = message.pop('type')
+                if kind == 'tokens':
+                    response['tokens'].extend(tuple(token) for token in message['tokens'])
+                elif kind == 'diagnostic':
+                    del message['id']
+                    response['diagnostics'].append(Diagnostic(**message))
+                elif kind == 'done':
+                    del self._responses[message['id']]
+                    response['ok'] = message['ok']
+                    response['productions'] = message['productions']
+                    if response['tokens'] is None:
+                        response['tokens'] = message['tokens']
+                    future.set_result(response)
+                else:
+                    del self._responses[message['id']]
+                    future.set_exception(RuntimeError(message['message']))
+        finally:
+            for future, _ in self._responses.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("اتصال به سرور بسته شد"))
+
+
+async def _serve(args):
+    server = CheckServer(workers=args.jobs, queue_size=args.queue_size, max_pending=args.max_pending)
+    address = await server.start(args.host, args.port, args.unix)
+    print(f"listening on {address}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="سرویس بررسی کد C++ (توکن‌ها و خطاها به صورت JSON)")
+    arg_parser.add_argument('--host', default='127.0.0.1', help="نشانی TCP")
+    arg_parser.add_argument('--port', type=int, default=8765, help="درگاه TCP")
+    arg_parser.add_argument('--unix', metavar='PATH', help="گوش دادن روی سوکت یونیکس به جای TCP")
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None, help="تعداد فرایندهای کارگر")
+    arg_parser.add_argument('--queue-size', type=int, default=64, help="بیشترین تعداد کارهای منتظر")
+    arg_parser.add_argument('--max-pending', type=int, default=8, help="بیشترین درخواست در جریان هر اتصال")
+    args = arg_parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""fixtureهای مشترک آزمون‌ها: گرامر، جدول تجزیه و پیکره کوچک برنامه‌ها (معتبر و خراب‌شده)"""
+import random
+
+import pytest
+
+from grammar import CPPGrammar
+from main import EXAMPLE_CODE
+from benchmarks.corpus import generate_program
+
+# تکه‌هایی که برای خراب کردن برنامه‌های معتبر در جای تصادفی درج می‌شوند
+MUTATIONS = ['x', ';', '{', '}', '=', '==', '>>', '<<', '"s"', '"', 'int ', '@', '$', 'while (', ')',
+             'cin >>', 'cout <<', '#include <a>', '#include <', 'return 0;', '0', '12', ',', '+', '\n']
+
+
+def mutate(code, rng, edits=1):
+    # درج و حذف تصادفی چند تکه در code
+    for _ in range(edits):
+        offset = rng.randrange(len(code) + 1)
+        deleted = rng.choice([0, 1, 3])
+        inserted = ''.join(rng.choice(MUTATIONS) for _ in range(rng.choice([1, 2])))
+        code = code[:offset] + inserted + code[offset + deleted:]
+    return code
+
+
+def make_programs(count, seed=0):
+    # برنامه‌های معتبر پیکره و نسخه‌های خراب‌شده آن‌ها
+    rng = random.Random(seed)
+    programs = [EXAMPLE_CODE, '', '   \n']
+    for index in range(count):
+        code = generate_program(seed + index, rng.randint(0, 30), max_depth=rng.randint(0, 4))
+        programs.append(code)
+        programs.append(mutate(code, rng, rng.choice([1, 2, 4])))
+    return programs
+
+
+@pytest.fixture(scope='session')
+def grammar():
+    return CPPGrammar(cache_dir=None)
+
+
+@pytest.fixture(scope='session')
+def compiled_table(grammar):
+    return grammar.compile_parse_table()
+
+
+@pytest.fixture(scope='session')
+def programs():
+    return make_programs(150)
@@ -0,0 +1,48 @@
+"""آزمون check_files: هم‌خوانی نتیجه‌های موازی و کش‌شده با check_file در همین فرایند"""
+from batch import FileResult, check_file, check_files
+from grammar import CompiledParseTable
+from predictive_parser import PredictiveParser
+
+
+def write_files(tmp_path, programs):
+    paths = []
+    for index, code in enumerate(programs):
+        path = tmp_path / f'{index}.cpp'
+        path.write_text(code, encoding='utf-8')
+        paths.append(str(path))
+    bad = tmp_path / 'invalid.cpp'
+    bad.write_bytes(b'int x = "\xff";')
+    return paths + [str(bad), str(tmp_path / 'missing.cpp')]
+
+
+def test_check_files_matches_check_file(compiled_table, programs, tmp_path):
+    paths = write_files(tmp_path, programs[:20])
+    parser = PredictiveParser(compiled_table)
+    expected = [check_file(parser, path, 'json') for path in paths]
+    # پیام خطا شامل ترتیب سطر جدول است، پس همان جدول به کارگرها داده می‌شود
+    results = check_files(paths, workers=2, tree_format='json', chunksize=3, parse_table=compiled_table)
+    assert list(results) == expected
+    results = check_files(paths, workers=2, ordered=False, tree_format='json', parse_table=compiled_table)
+    assert sorted(results) == sorted(expected)
+    # با کش روی دیسک، اجرای اول و دوم همان نتیجه‌ها را می‌دهند
+    cache_dir = str(tmp_path / 'cache')
+    for _ in range(2):
+        cached = list(check_files(paths, workers=2, tree_format='json', parse_table=compiled_table,
+                                  cache_dir=cache_dir))
+        assert [(result.path, result.tokens, result.error is None, result.tree) for result in cached] == [
+            (result.path, result.tokens, result.error is None, result.tree) for result in expected]
+
+
+def test_cache_uses_supplied_parse_table(grammar, tmp_path):
+    # نتیجه‌های کش با جدول داده‌شده محاسبه می‌شوند و نه با جدول پیش‌فرض گرامر (user-013)
+    path = tmp_path / 'main.cpp'
+    path.write_text('int main(){ return 0; }', encoding='utf-8')
+    parse_table = {nt: dict(row) for nt, row in grammar.parse_table.items()}
+    del parse_table['V']['return']
+    strict_table = CompiledParseTable(parse_table, grammar.start, grammar.follow)
+    cache_dir = str(tmp_path / 'cache')
+
+    [default] = check_files([str(path)], workers=1, cache_dir=cache_dir)
+    [strict] = check_files([str(path)], workers=1, cache_dir=cache_dir, parse_table=strict_table)
+    assert default.error is None
+    assert isinstance(strict, FileResult) and strict.error is not None
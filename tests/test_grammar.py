@@ -0,0 +1,121 @@
+"""آزمون FIRST/FOLLOW لیست کار در برابر حل‌کننده نقطه ثابت، جدول عددی و کش جدول‌ها"""
+import random
+
+import grammar as grammar_module
+from grammar import (CPPGrammar, CompiledParseTable, compute_nullable, compute_first_sets,
+                     compute_follow_sets)
+
+
+def fixed_point_first_follow(productions, terminals, start):
+    # حل‌کننده نقطه ثابت ساده (مرجع): همه تولیدات تا نبود تغییر دوباره پیمایش می‌شوند
+    first = {nt: set() for nt in productions}
+
+    def first_of(symbols):
+        result = set()
+        for sym in symbols:
+            if sym == 'ε':
+                continue
+            if sym in terminals:
+                result.add(sym)
+                return result
+            result |= first[sym] - {'ε'}
+            if 'ε' not in first[sym]:
+                return result
+        result.add('ε')
+        return result
+
+    changed = True
+    while changed:
+        changed = False
+        for nt, prods in productions.items():
+            for prod in prods:
+                new = first_of(prod) - first[nt]
+                if new:
+                    first[nt] |= new
+                    changed = True
+
+    follow = {nt: set() for nt in productions}
+    follow[start].add('$')
+    changed = True
+    while changed:
+        changed = False
+        for nt, prods in productions.items():
+            for prod in prods:
+                for i, sym in enumerate(prod):
+                    if sym not in productions:
+                        continue
+                    rest = first_of(prod[i + 1:])
+                    new = rest - {'ε'}
+                    if 'ε' in rest:
+                        new |= follow[nt]
+                    new -= follow[sym]
+                    if new:
+                        follow[sym] |= new
+                        changed = True
+    return first, follow
+
+
+def random_grammar(rng):
+    # گرامر تصادفی با تولیدات تهی، زنجیره‌های تهی‌پذیر و چرخه‌ها
+    non_terminals = [f'N{i}' for i in range(rng.randint(1, 8))]
+    terminals = {f't{i}' for i in range(rng.randint(1, 5))} | {'ε'}
+    symbols = non_terminals + sorted(terminals - {'ε'})
+    productions = {}
+    for nt in non_terminals:
+        prods = []
+        for _ in range(rng.randint(1, 3)):
+            if rng.random() < 0.2:
+                prods.append(['ε'])
+            else:
+                prods.append([rng.choice(symbols) for _ in range(rng.randint(1, 4))])
+        productions[nt] = prods
+    return productions, terminals, non_terminals[0]
+
+
+def test_worklist_matches_fixed_point_on_random_grammars():
+    rng = random.Random(0)
+    for _ in range(500):
+        productions, terminals, start = random_grammar(rng)
+        expected_first, expected_follow = fixed_point_first_follow(productions, terminals, start)
+        first = compute_first_sets(productions, terminals)
+        assert first == expected_first, productions
+        assert compute_follow_sets(productions, terminals, start, first) == expected_follow, productions
+        assert compute_nullable(productions, terminals) == {nt for nt in first if 'ε' in first[nt]}
+
+
+def test_worklist_matches_fixed_point_on_cpp_grammar(grammar):
+    first, follow = fixed_point_first_follow(grammar.productions, grammar.terminals, grammar.start)
+    assert grammar.first == first
+    assert grammar.follow == follow
+
+
+def test_compiled_table_matches_dict_table(grammar, compiled_table):
+    terminals = sorted(grammar.terminals - {'ε'}) + ['$', 'unknown']
+    for nt in grammar.non_terminals:
+        for term in terminals:
+            assert compiled_table.lookup(nt, term) is grammar.parse_table.get(nt, {}).get(term), (nt, term)
+
+
+def test_table_fingerprint_follows_content(grammar, compiled_table):
+    rebuilt = CompiledParseTable(grammar.parse_table, grammar.start, grammar.follow)
+    assert rebuilt.compute_fingerprint() == compiled_table.compute_fingerprint()
+    parse_table = {nt: dict(row) for nt, row in grammar.parse_table.items()}
+    row = parse_table[grammar.start]
+    del row[next(iter(row))]
+    changed = CompiledParseTable(parse_table, grammar.start, grammar.follow)
+    assert changed.compute_fingerprint() != compiled_table.compute_fingerprint()
+
+
+def test_cached_tables_round_trip(tmp_path, grammar):
+    saved = CPPGrammar(cache_dir=tmp_path)
+    loaded = CPPGrammar(cache_dir=tmp_path)
+    assert list(tmp_path.iterdir()) == [tmp_path / f'cppgrammar-{grammar.fingerprint[:16]}.json']
+    assert loaded.first == saved.first == grammar.first
+    assert loaded.follow == grammar.follow
+    assert loaded.parse_table == grammar.parse_table
+
+
+def test_fingerprint_includes_cache_format_version(monkeypatch, grammar):
+    # تغییر نسخه قالب کش، اثر انگشت و نام فایل کش را عوض می‌کند (user-005)
+    monkeypatch.setattr(grammar_module, 'CACHE_FORMAT_VERSION', grammar_module.CACHE_FORMAT_VERSION + 1)
+    assert grammar.compute_fingerprint() != grammar.fingerprint
@@ -0,0 +1,83 @@
+"""آزمون تفاضلی IncrementalDocument در برابر توکنایز و تجزیه کامل متن پس از هر ویرایش"""
+import random
+
+import pytest
+
+import incremental
+from incremental import IncrementalDocument
+from lexical_analyzer import CompiledTokenizer
+from predictive_parser import PredictiveParser
+from benchmarks.corpus import generate_program
+
+SNIPPETS = ['int', 'x', ' ', '=', '1', ';', '}', '{', '(', ')', 'while', 'cout', '<<', '>>', '"', '"ab"',
+            '#include', '<iostream>', '\n', '+', '==', 'return 0;', '$', 'y = 2;',
+            'while (x == 1){ x = x + 1; }']
+
+
+def rebuild(parser, text):
+    # مرجع: توکن‌ها، تولیدات و خطای سند با توکنایز و تجزیه کامل
+    try:
+        store = CompiledTokenizer().tokenize_store(text)
+    except ValueError as e:
+        return [], [], ('ValueError', str(e))
+    try:
+        parser.parse(store)
+        error = None
+    except SyntaxError as e:
+        error = ('SyntaxError', str(e))
+    return list(store), list(parser.productions), error
+
+
+def state(document):
+    error = document.error
+    return document.tokens, document.productions, None if error is None else (type(error).__name__, str(error))
+
+
+def random_edits(compiled_table, seed, documents, edits):
+    rng = random.Random(seed)
+    parser = PredictiveParser(compiled_table)
+    for index in range(documents):
+        document = IncrementalDocument(compiled_table, generate_program(seed + index, rng.randint(0, 25), max_depth=3))
+        for _ in range(edits):
+            size = len(document.text)
+            offset = rng.randint(0, size)
+            deleted = rng.randint(0, min(5, size - offset)) if rng.random() < 0.6 else 0
+            inserted = ''.join(rng.choice(SNIPPETS) for _ in range(rng.randint(0, 2)))
+            document.edit(offset, deleted, inserted)
+            assert state(document) == rebuild(parser, document.text), (index, offset, deleted, inserted)
+
+
+def test_edits_match_full_rebuild(compiled_table):
+    random_edits(compiled_table, seed=7, documents=150, edits=12)
+
+
+def test_edits_match_full_rebuild_with_small_text_chunks(compiled_table, monkeypatch):
+    # تکه‌های کوچک متن، ویرایش‌هایی را که از مرز چند تکه می‌گذرند می‌آزمایند
+    monkeypatch.setattr(incremental, 'TEXT_CHUNK_SIZE', 7)
+    random_edits(compiled_table, seed=8, documents=60, edits=12)
+
+
+def test_chunked_text_matches_str(monkeypatch):
+    monkeypatch.setattr(incremental, 'TEXT_CHUNK_SIZE', 4)
+    rng = random.Random(3)
+    text = 'ab\ncd\n\nefghij\nk'
+    chunked = incremental._ChunkedText(text)
+    for _ in range(2000):
+        offset = rng.randint(0, len(text))
+        deleted = rng.randint(0, len(text) - offset)
+        inserted = ''.join(rng.choice('xy\n') for _ in range(rng.choice([0, 1, 3, 12])))
+        text = text[:offset] + inserted + text[offset + deleted:]
+        chunked.replace(offset, deleted, inserted)
+        assert str(chunked) == text and chunked.size == len(text)
+        start = rng.randint(0, len(text))
+        end = rng.randint(start, len(text))
+        assert chunked.slice(start, end) == text[start:end]
+        before = text[:start]
+        assert chunked.line_column(start) == (before.count('\n') + 1, len(before) - before.rfind('\n'))
+
+
+def test_edit_outside_text(compiled_table):
+    document = IncrementalDocument(compiled_table, 'int x;')
+    with pytest.raises(ValueError):
+        document.edit(4, 10, '')
+    assert document.text == 'int x;'
@@ -0,0 +1,129 @@
+"""آزمون تفاضلی موتورهای توکنایز در برابر DFATokenizer (پیاده‌سازی مرجع)"""
+import io
+import random
+from collections import Counter
+
+import pytest
+
+from lexical_analyzer import DFATokenizer, CompiledTokenizer, iter_tokens, tokenize_file
+
+ALPHABET = list('abcint_xyz0123456789 \t\n"#<>=!|&(){}[],;+-*/') + [
+    '²', 'é', '٣', '\x1c', '\xa0', '$', '@', 'include', '#include', '#include ', '#define ', 'main', 'while',
+    '  ', '<iostream>', '"str"', '"ست"']
+
+
+def run(tokenize):
+    # ('ok', توکن‌ها) یا ('error',)؛ متن خطاها بین موتورها یکسان نیست
+    try:
+        return 'ok', list(tokenize())
+    except ValueError:
+        return 'error',
+
+
+def random_sources(count, seed):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 30))) for _ in range(count)]
+
+
+def engines(code, recover, chunk_size):
+    # همه موتورهایی که باید خروجی DFATokenizer را تولید کنند
+    return {
+        'compiled': lambda: CompiledTokenizer(recover).tokenize(code),
+        'store': lambda: CompiledTokenizer(recover).tokenize_store(code),
+        'iter_tokens': lambda: iter_tokens(io.StringIO(code), chunk_size=chunk_size, recover=recover),
+        'iter_tokens bytes': lambda: iter_tokens(io.BytesIO(code.encode('utf-8')), chunk_size=chunk_size,
+                                                 recover=recover),
+    }
+
+
+@pytest.mark.parametrize('recover', [False, True])
+def test_engines_match_dfa_tokenizer(recover, programs):
+    rng = random.Random(1)
+    for code in random_sources(1500, seed=1) + programs:
+        expected = run(lambda: DFATokenizer(recover).tokenize(code))
+        for name, tokenize in engines(code, recover, rng.choice([1, 2, 5, 64 * 1024])).items():
+            assert run(tokenize) == expected, (name, code)
+
+
+@pytest.mark.parametrize('recover', [False, True])
+def test_tokenize_file_matches_dfa_tokenizer(recover, programs, tmp_path):
+    path = tmp_path / 'input.cpp'
+    for code in random_sources(500, seed=2) + programs[:60]:
+        path.write_text(code, encoding='utf-8')
+        assert run(lambda: tokenize_file(path, recover)) == run(lambda: DFATokenizer(recover).tokenize(code)), code
+
+
+def test_token_store_positions(tmp_path):
+    path = tmp_path / 'input.cpp'
+    for code in random_sources(300, seed=3):
+        path.write_text(code, encoding='utf-8')
+        try:
+            store = tokenize_file(path)
+        except ValueError:
+            continue
+        # موقعیت‌ها روی str یا بایت‌ها هستند؛ ستون همیشه بر حسب کاراکتر شمرده می‌شود
+        encoded = code.encode('utf-8')
+        for index in range(len(store)):
+            offset = store.starts[index]
+            before = code[:offset] if isinstance(store.source, str) else encoded[:offset].decode('utf-8')
+            expected = (before.count('\n') + 1, len(before) - before.rfind('\n'))
+            assert store.position(index) == expected, (code, index)
+
+
+def test_long_tokens_across_chunks():
+    # توکن‌های نیمه‌کاره در پایان هر قطعه ادامه داده می‌شوند (user-002)
+    long_name = 'v' * 20_000
+    code = f'int {long_name} = 123456789;\ncout << "{"s" * 5000}";\n#include <{"h" * 3000}>\n'
+    expected = DFATokenizer().tokenize(code)
+    for chunk_size in (1, 3, 4096):
+        assert list(iter_tokens(io.StringIO(code), chunk_size=chunk_size)) == expected
+    tokenizer = CompiledTokenizer()
+    for start in range(0, len(code), 1000):
+        tokenizer.feed(code[start:start + 1000])
+    tokenizer.finish()
+    assert tokenizer.tokens == expected
+
+
+@pytest.mark.parametrize('content, recover, expected', [
+    # بایت نامعتبر داخل رشته و بیرون از آن؛ بدون recover خطا پیش از هر خروجی، با recover جایگزینی با U+FFFD
+    (b'x = "\xff\xfe";', False, ValueError),
+    (b'x = 1; \xff', False, ValueError),
+    (b'x = "\xff\xfe";', True, [('IDENTIFIER', 'x'), ('SYMBOL', '='), ('STRING', '��'), ('SYMBOL', ';')]),
+    (b'x = 1; \xff', True, [('IDENTIFIER', 'x'), ('SYMBOL', '='), ('NUMBER', '1'), ('SYMBOL', ';'),
+                            ('ERROR', '�')]),
+])
+def test_tokenize_file_invalid_utf8(tmp_path, content, recover, expected):
+    path = tmp_path / 'input.cpp'
+    path.write_bytes(content)
+    if expected is ValueError:
+        with pytest.raises(UnicodeDecodeError):
+            tokenize_file(path, recover)
+    else:
+        assert list(tokenize_file(path, recover)) == expected
+
+
+def test_tokenize_file_non_ascii_strings_stay_lazy(tmp_path):
+    path = tmp_path / 'input.cpp'
+    path.write_text('cout << "سلام";', encoding='utf-8')
+    store = tokenize_file(path)
+    assert not isinstance(store.source, str)
+    assert list(store) == [('RESERVEDWORD', 'cout'), ('SYMBOL', '<<'), ('STRING', 'سلام'), ('SYMBOL', ';')]
+
+
+def test_scan_counters_cover_input(programs, tmp_path):
+    # شمارنده‌های --profile داخل همان موتورهایی که اجرا می‌شوند جمع می‌شوند (user-017)
+    path = tmp_path / 'input.cpp'
+    for code in programs[:40]:
+        state_chars = Counter()
+        DFATokenizer(True, state_chars).tokenize(code)
+        assert sum(state_chars.values()) == len(code)
+
+        path_chars = Counter()
+        CompiledTokenizer(True, path_chars).tokenize_store(code)
+        assert sum(path_chars.values()) == len(code)
+
+        path.write_text(code, encoding='utf-8')
+        path_chars = Counter()
+        tokenize_file(path, True, path_chars)
+        scanned = sum(count for name, count in path_chars.items() if name != 'bytes path, discarded')
+        assert scanned in (len(code), len(code.encode('utf-8')))
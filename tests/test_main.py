@@ -0,0 +1,28 @@
+"""آزمون خط فرمان main روی فایل‌ها"""
+import main
+
+
+def test_invalid_utf8_fails_before_any_output(tmp_path, capsys):
+    # خطای رمزگذاری پیش از چاپ اولین توکن گزارش می‌شود (user-011)
+    path = tmp_path / 'input.cpp'
+    path.write_bytes(b'int main(){ cout << "\xff"; return 0; }')
+    assert main.main([str(path), '--tokens']) == 1
+    out, err = capsys.readouterr()
+    assert out == ''
+    assert str(path) in err
+
+
+def test_invalid_utf8_is_replaced_in_recover_mode(tmp_path, capsys):
+    path = tmp_path / 'input.cpp'
+    path.write_bytes(b'int main(){ cout << "\xff"; return 0; }')
+    assert main.main([str(path), '--tokens', '--parse', '--recover']) == 0
+    out, _ = capsys.readouterr()
+    assert "('STRING', '�')" in out
+
+
+def test_files_report_every_error_with_recover(tmp_path, capsys):
+    path = tmp_path / 'input.cpp'
+    path.write_text('int main(){\n    x = = 1;\n    y = @;\n    return 0;\n}\n', encoding='utf-8')
+    assert main.main([str(path), '--parse', '--recover']) == 1
+    _, err = capsys.readouterr()
+    assert len(err.strip().splitlines()) == 3
@@ -0,0 +1,92 @@
+"""آزمون تفاضلی پارسر تولیدشده در برابر PredictiveParser (مفسر جدول)"""
+import io
+import sys
+import types
+
+import pytest
+
+from lexical_analyzer import CompiledTokenizer, iter_tokens
+from predictive_parser import PredictiveParser, write_tree
+from parser_codegen import generate_parser, load_parser
+from benchmarks.corpus import HEADER, FOOTER
+
+DEPTH_LIMIT_LINE = 'depth_limit = sys.getrecursionlimit() // 2'
+
+
+def tree_json(root):
+    if root is None:
+        return None
+    out = io.StringIO()
+    write_tree(root, out, 'json')
+    return out.getvalue()
+
+
+def inputs(code):
+    # همان ورودی به سه شکل: TokenStore (با خط و ستون در پیام خطا)، لیست و پیمایشگر
+    return {
+        'store': lambda: CompiledTokenizer().tokenize_store(code),
+        'list': lambda: CompiledTokenizer().tokenize(code),
+        'iter': lambda: iter_tokens(io.StringIO(code), chunk_size=7),
+    }
+
+
+def interpret(parser, tokens, build_tree):
+    try:
+        parser.parse(tokens, build_tree)
+    except SyntaxError as e:
+        return 'error', str(e)
+    return 'ok', parser.productions, tree_json(parser.tree)
+
+
+def generated(module, tokens, build_tree):
+    try:
+        productions, root = module.parse(tokens, build_tree)
+    except SyntaxError as e:
+        return 'error', str(e)
+    return 'ok', productions, tree_json(root)
+
+
+@pytest.fixture(scope='module')
+def generated_parser(grammar):
+    return load_parser(grammar)
+
+
+@pytest.fixture(scope='module')
+def shallow_parsers(grammar):
+    # نسخه‌هایی با حد عمق بسیار کم، تا ادامه تجزیه با پارسر جدول‌محور در جاهای مختلف آزموده شود
+    source = generate_parser(grammar)
+    assert DEPTH_LIMIT_LINE in source
+    modules = []
+    for limit in (0, 1, 3):
+        module = types.ModuleType(f'generated_parser_{limit}')
+        exec(compile(source.replace(DEPTH_LIMIT_LINE, f'depth_limit = {limit}'), module.__name__, 'exec'),
+             module.__dict__)
+        modules.append(module)
+    return modules
+
+
+def assert_same_as_interpreter(compiled_table, modules, code, build_tree):
+    parser = PredictiveParser(compiled_table)
+    try:
+        CompiledTokenizer().tokenize(code)
+    except ValueError:
+        return
+    for kind, make_tokens in inputs(code).items():
+        expected = interpret(parser, make_tokens(), build_tree)
+        for module in modules:
+            assert generated(module, make_tokens(), build_tree) == expected, (module.__name__, kind, code)
+
+
+@pytest.mark.parametrize('build_tree', [False, True])
+def test_generated_parser_matches_interpreter(compiled_table, generated_parser, shallow_parsers, programs,
+                                             build_tree):
+    for code in programs:
+        assert_same_as_interpreter(compiled_table, [generated_parser] + shallow_parsers, code, build_tree)
+
+
+@pytest.mark.parametrize('tail', ['', '    x = = 1;\n', '    }\n'])
+def test_deep_nesting_beyond_recursion_limit(compiled_table, generated_parser, tail):
+    # تودرتویی عمیق‌تر از حد بازگشت پایتون با پارسر جدول‌محور ادامه داده می‌شود (user-015)
+    depth = sys.getrecursionlimit() * 2
+    code = HEADER + '    while (x != 0){\n' * depth + tail + '    x = x - 1;\n' + '    }\n' * depth + FOOTER
+    assert_same_as_interpreter(compiled_table, [generated_parser], code, build_tree=True)
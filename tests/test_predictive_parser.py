@@ -0,0 +1,128 @@
+"""آزمون تفاضلی PredictiveParser روی CompiledParseTable در برابر پارسر LL(1) ساده روی جدول دیکشنری"""
+import io
+import json
+
+import pytest
+
+from lexical_analyzer import CompiledTokenizer, iter_tokens
+from predictive_parser import PredictiveParser, build_parse_tree, token_terminal, walk_tree, write_tree
+from profiling import PipelineStats
+
+
+def reference_parse(grammar, tokens):
+    # پارسر LL(1) مرجع با پشته نمادها و جدول دیکشنری؛ لیست تولیدات یا None در صورت خطای نحوی
+    stack = ['$', grammar.start]
+    productions = []
+    tokens = list(tokens)
+    position = 0
+    while True:
+        token = tokens[position] if position < len(tokens) else None
+        current = '$' if token is None else token_terminal(token)
+        top = stack.pop()
+        if top in grammar.non_terminals:
+            production = grammar.parse_table[top].get(current)
+            if production is None:
+                return None
+            productions.append((top, production))
+            stack.extend(sym for sym in reversed(production) if sym != 'ε')
+        elif top == '$':
+            return productions if token is None else None
+        elif token is not None and (top == current or (token[0] == 'NUMBER' and token[1] == top)):
+            position += 1
+        else:
+            return None
+
+
+def parse_or_none(parser, tokens, build_tree=False):
+    try:
+        parser.parse(tokens, build_tree)
+    except SyntaxError:
+        return None
+    return parser.productions
+
+
+def tokenized(programs):
+    for code in programs:
+        try:
+            yield code, CompiledTokenizer().tokenize_store(code)
+        except ValueError:
+            continue
+
+
+def tree_json(root):
+    out = io.StringIO()
+    write_tree(root, out, 'json')
+    return out.getvalue()
+
+
+def test_parser_matches_reference(grammar, compiled_table, programs):
+    parser = PredictiveParser(compiled_table)
+    dict_parser = PredictiveParser(grammar.parse_table)
+    accepted = 0
+    for code, store in tokenized(programs):
+        expected = reference_parse(grammar, store)
+        accepted += expected is not None
+        assert parse_or_none(parser, store) == expected, code
+        assert parse_or_none(dict_parser, list(store)) == expected, code
+        # ورودی پیمایشگر (بدون len و اندیس) همان نتیجه را می‌دهد
+        assert parse_or_none(parser, iter_tokens(io.StringIO(code), chunk_size=16)) == expected, code
+    assert accepted > len(programs) // 3
+
+
+def test_only_numbers_match_terminals_by_value(compiled_table):
+    # رشته نمی‌تواند جای کلمه رزرو شده یا نماد بنشیند؛ فقط '0' در return 0 با مقدار تطبیق می‌خورد (user-003)
+    parser = PredictiveParser(compiled_table)
+    parser.parse(CompiledTokenizer().tokenize_store('int main(){ return 0; }'))
+    for code in ('int "main" ( ) { }', 'int main ")" { }', 'int main(){ return "0"; }'):
+        with pytest.raises(SyntaxError):
+            parser.parse(CompiledTokenizer().tokenize_store(code))
+
+
+def test_syntax_error_location(compiled_table):
+    parser = PredictiveParser(compiled_table)
+    with pytest.raises(SyntaxError, match='خط 2، ستون 9'):
+        parser.parse(CompiledTokenizer().tokenize_store('int main(){\n    x = = 1;\n}'))
+
+
+def test_tree_during_parse_matches_tree_from_productions(grammar, compiled_table, programs):
+    parser = PredictiveParser(compiled_table)
+    for code, store in tokenized(programs[:80]):
+        if parse_or_none(parser, store, build_tree=True) is None:
+            continue
+        expected = tree_json(build_parse_tree(parser.productions, grammar))
+        assert tree_json(parser.tree) == expected
+        assert tree_json(parser.build_tree()) == expected
+
+
+def test_write_tree_formats(compiled_table, programs):
+    parser = PredictiveParser(compiled_table)
+    parser.parse(CompiledTokenizer().tokenize_store(programs[0]), build_tree=True)
+    nodes = [node for entering, _, node in walk_tree(parser.tree) if entering]
+
+    text = io.StringIO()
+    write_tree(parser.tree, text, buffer_size=16)
+    assert text.getvalue() == repr(parser.tree)
+    assert len(text.getvalue().splitlines()) == len(nodes)
+
+    data = json.loads(tree_json(parser.tree))
+    assert data['value'] == 'Start'
+
+    dot = io.StringIO()
+    write_tree(parser.tree, dot, 'dot')
+    assert dot.getvalue().count('[label=') == len(nodes)
+    assert dot.getvalue().count(' -> ') == len(nodes) - 1
+
+
+def test_parser_counters(compiled_table, programs):
+    # شمارنده‌ها داخل حلقه تجزیه جمع می‌شوند (user-017)
+    parser = PredictiveParser(compiled_table, counters=True)
+    stats = PipelineStats()
+    store = CompiledTokenizer().tokenize_store(programs[0])
+    parser.parse(store)
+    stats.count_parse(parser)
+    assert sum(stats.table_lookups.values()) == len(parser.productions)
+    assert stats.tree_nodes == 1 + sum(len([sym for sym in rhs if sym != 'ε']) for _, rhs in parser.productions)
+    assert stats.peak_stack_depth >= 2
+    # پس از count_parse شمارنده‌های پارسر صفر می‌شوند
+    stats.count_parse(parser)
+    assert sum(stats.table_lookups.values()) == len(parser.productions)
@@ -0,0 +1,40 @@
+"""آزمون PipelineStats و گزینه --profile-json در main"""
+import json
+
+import main
+from lexical_analyzer import tokenize_file
+from profiling import PipelineStats
+
+
+def test_disabled_stats_collect_nothing():
+    stats = PipelineStats(enabled=False)
+    with stats.stage('tokenize'):
+        pass
+    stats.count_source('int x;', 3)
+    assert stats.stages == {} and stats.characters == 0
+    assert stats.state_chars() is None and stats.path_chars() is None
+
+
+def test_count_source_counts_characters_of_byte_buffers(tmp_path):
+    # برای TokenStore روی mmap کاراکترها شمرده می‌شوند و نه بایت‌ها (user-017)
+    path = tmp_path / 'input.cpp'
+    path.write_text('cout << "سلام";', encoding='utf-8')
+    tokens = tokenize_file(path)
+    stats = PipelineStats()
+    stats.count_source(tokens.source, len(tokens))
+    assert stats.characters == len('cout << "سلام";')
+    assert stats.tokens == 4
+
+
+def test_profile_json_for_files(tmp_path, capsys):
+    path = tmp_path / 'input.cpp'
+    path.write_text(main.EXAMPLE_CODE, encoding='utf-8')
+    output = tmp_path / 'profile.json'
+    assert main.main([str(path), '--parse', '--profile-json', str(output)]) == 0
+    capsys.readouterr()
+    profile = json.loads(output.read_text(encoding='utf-8'))
+    assert set(profile['stages']) >= {'grammar', 'tokenize', 'parse'}
+    assert profile['characters'] == len(main.EXAMPLE_CODE)
+    assert sum(profile['scan_path_chars'].values()) >= len(main.EXAMPLE_CODE)
+    assert profile['tree_nodes'] == 1 + sum(profile['stack_pushes'].values())
+    assert profile['peak_stack_depth'] > 2
@@ -0,0 +1,62 @@
+"""آزمون بازیابی از خطا در یک گذر (PredictiveParser با recover=True)"""
+import pytest
+
+from lexical_analyzer import DFATokenizer, CompiledTokenizer
+from predictive_parser import PredictiveParser
+
+
+def first_error(parser, code):
+    # متن اولین خطای حالت عادی، 'lexical' برای خطای واژگانی، یا None
+    try:
+        parser.parse(CompiledTokenizer().tokenize_store(code))
+    except ValueError:
+        return 'lexical'
+    except SyntaxError as e:
+        return str(e)
+    return None
+
+
+def test_recovery_agrees_with_normal_parse(compiled_table, programs):
+    parser = PredictiveParser(compiled_table)
+    recovering = PredictiveParser(compiled_table, recover=True)
+    for code in programs:
+        tokens = CompiledTokenizer(recover=True).tokenize_store(code)
+        assert list(tokens) == DFATokenizer(recover=True).tokenize(code)
+        ok = recovering.parse(tokens, build_tree=True)
+        expected = first_error(parser, code)
+        if expected is None:
+            # ورودی بدون خطا همان تولیدات حالت عادی را دارد
+            assert ok and recovering.productions == parser.productions, code
+            continue
+        assert not ok, code
+        if expected == 'lexical':
+            assert any(diagnostic.kind == 'lexical' for diagnostic in recovering.diagnostics), code
+        else:
+            # اولین خطای نحوی همان خطای حالت عادی است، با همان خط و ستون
+            assert recovering.diagnostics[0].message == expected, code
+
+
+def test_reports_every_error_in_one_pass(compiled_table):
+    code = 'int main(){\n    x = = 1;\n    y = 2;\n    cout << ;\n    z = 3 @;\n    return 0;\n}\n'
+    parser = PredictiveParser(compiled_table, recover=True)
+    assert not parser.parse(CompiledTokenizer(recover=True).tokenize_store(code), build_tree=True)
+    assert [(diagnostic.kind, diagnostic.line) for diagnostic in parser.diagnostics] == [
+        ('syntax', 2), ('syntax', 4), ('lexical', 5)]
+    assert parser.tree is not None
+
+
+def test_dict_table_needs_follow_sets(grammar):
+    # بدون FOLLOW بازیابی بی‌صدا با مجموعه‌های خالی انجام نمی‌شود (user-016)
+    with pytest.raises(ValueError):
+        PredictiveParser(grammar.parse_table, recover=True)
+    parser = PredictiveParser(grammar.parse_table, recover=True, follow=grammar.follow)
+    assert not parser.parse(CompiledTokenizer().tokenize_store('int main(){ x = = 1; y = 2; return 0; }'))
+    assert len(parser.diagnostics) == 1
+
+
+def test_recovery_lookups_are_counted(compiled_table):
+    # خواندن‌های جدول در بازیابی هم شمرده می‌شوند (user-017)
+    parser = PredictiveParser(compiled_table, recover=True, counters=True)
+    parser.parse(CompiledTokenizer().tokenize_store('int main(){ x = = 1; y = 2; return 0; }'))
+    assert sum(parser.counters.misses) >= 1
+    assert sum(parser.counters.table_lookups().values()) > len(parser.productions)
@@ -0,0 +1,75 @@
+"""آزمون ResultCache: هم‌خوانی با تجزیه مستقیم، LRU، کش روی دیسک و کلید جدول تجزیه"""
+import io
+
+from grammar import CompiledParseTable
+from lexical_analyzer import CompiledTokenizer
+from predictive_parser import PredictiveParser, build_parse_tree, write_tree
+from result_cache import ResultCache
+
+
+def tree_json(root):
+    out = io.StringIO()
+    write_tree(root, out, 'json')
+    return out.getvalue()
+
+
+def direct(compiled_table, source):
+    # مرجع: توکنایز و تجزیه بدون کش
+    try:
+        store = CompiledTokenizer().tokenize_store(source)
+    except ValueError:
+        return None, (), True
+    parser = PredictiveParser(compiled_table)
+    try:
+        parser.parse(store)
+    except SyntaxError:
+        return tuple(store), tuple(parser.productions), True
+    return tuple(store), tuple(parser.productions), False
+
+
+def test_results_match_direct_parse(grammar, compiled_table, programs):
+    cache = ResultCache(grammar)
+    for source in programs:
+        result = cache.check(source)
+        assert (result.tokens, result.productions, result.error is not None) == direct(compiled_table, source)
+        assert cache.check(source.encode('utf-8')) is result
+        if result.error is None and result.productions:
+            assert tree_json(cache.parse_tree(result)) == tree_json(build_parse_tree(result.productions, grammar))
+
+
+def test_lru_eviction(grammar):
+    cache = ResultCache(grammar, max_entries=2)
+    for source in ('int x;', 'int y;', 'int x;', 'int z;', 'int x;', 'int y;'):
+        cache.check(source)
+    assert cache.stats() == {'entries': 2, 'hits': 2, 'disk_hits': 0, 'misses': 4, 'evictions': 2}
+
+
+def test_disk_cache(grammar, tmp_path, programs):
+    writer = ResultCache(grammar, cache_dir=tmp_path)
+    expected = [writer.check(source) for source in programs[:30]]
+    reader = ResultCache(grammar, cache_dir=tmp_path)
+    assert [reader.check(source) for source in programs[:30]] == expected
+    assert reader.stats()['misses'] == 0
+
+
+def test_invalid_utf8_is_a_cached_error(grammar):
+    # بایت‌های نامعتبر به جای UnicodeDecodeError یک نتیجه خطادار ذخیره‌شده می‌دهند (user-013)
+    cache = ResultCache(grammar)
+    result = cache.check(b'int x = "\xff";')
+    assert result.tokens is None and result.error
+    assert cache.check(b'int x = "\xff";') is result
+
+
+def test_results_are_keyed_by_parse_table(grammar, tmp_path):
+    # کش با جدول داده‌شده تجزیه می‌کند و نتیجه جدول دیگری را برنمی‌گرداند (user-013)
+    parse_table = {nt: dict(row) for nt, row in grammar.parse_table.items()}
+    del parse_table['V']['return']
+    strict_table = CompiledParseTable(parse_table, grammar.start, grammar.follow)
+    source = 'int main(){ return 0; }'
+
+    default = ResultCache(grammar, cache_dir=tmp_path)
+    assert default.check(source).error is None
+    strict = ResultCache(None, cache_dir=tmp_path, parse_table=strict_table)
+    assert strict.fingerprint != default.fingerprint
+    assert strict.check(source).error is not None
+    assert strict.stats()['disk_hits'] == 0
@@ -0,0 +1,38 @@
+"""آزمون CheckServer و CheckClient در برابر check_source در همین فرایند"""
+import asyncio
+
+import server
+from server import CheckClient, CheckServer, check_source
+
+
+def check_all(compiled_table, requests):
+    # اجرای درخواست‌ها روی یک سرور محلی با یک اتصال و پاسخ‌های هم‌زمان
+    async def run():
+        check_server = CheckServer(compiled_table, workers=1, max_pending=2, chunk_tokens=3)
+        host, port = await check_server.start(port=0)
+        client = await CheckClient.connect(host, port)
+        try:
+            return await asyncio.gather(*(client.check(*request) for request in requests))
+        finally:
+            await client.close()
+            await check_server.close()
+
+    return asyncio.run(run())
+
+
+def test_server_matches_check_source(compiled_table, programs):
+    server._init_worker(compiled_table)
+    requests = [(code, recover) for code in programs[:40] for recover in (False, True)]
+    for (code, recover), response in zip(requests, check_all(compiled_table, requests)):
+        expected = check_source(code, recover)
+        assert response['tokens'] == [tuple(token) for token in expected.tokens]
+        assert response['diagnostics'] == expected.diagnostics
+        assert response['productions'] == expected.productions
+        assert response['ok'] == (not expected.diagnostics)
+
+
+def test_token_list_or_count(compiled_table):
+    # درخواستی که توکن خواسته و توکنی ندارد لیست خالی می‌گیرد، نه تعداد 0 (user-020)
+    empty, counted = check_all(compiled_table, [('', False, True), ('int x;', False, False)])
+    assert empty['tokens'] == []
+    assert counted['tokens'] == 3
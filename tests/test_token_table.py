@@ -0,0 +1,45 @@
+"""آزمون TokenTable در برابر شمارش ساده با دیکشنری"""
+import random
+
+from lexical_analyzer import DFATokenizer
+from token_table import TokenTable
+
+
+def reference_rows(table, tokens):
+    # سطرهای مورد انتظار generate_table بدون هش: (نوع، مقدار، تعداد، شماره اولین توکن)
+    counts = {}
+    first = {}
+    for position, token in enumerate(tokens):
+        counts[token] = counts.get(token, 0) + 1
+        first.setdefault(token, position)
+    return [(token_type, value, counts[token_type, value], first[token_type, value])
+            for token_type in table.order
+            for value in sorted(value for kind, value in counts if kind == token_type)]
+
+
+def test_table_matches_reference(programs):
+    rng = random.Random(4)
+    table = TokenTable(capacity=8)
+    seen = []
+    for code in programs[:60]:
+        try:
+            tokens = DFATokenizer().tokenize(code)
+        except ValueError:
+            continue
+        if rng.random() < 0.5:
+            table.add_tokens(tokens)
+        else:
+            for token in tokens:
+                table.add_token(*token)
+        seen.extend(tokens)
+        rows = table.generate_table()
+        assert [(kind, value, count, first) for kind, value, _, _, _, count, first in rows] == reference_rows(
+            table, seen)
+
+    stats = table.stats()
+    assert stats['entries'] == len(set(seen)) and stats['tokens'] == len(seen)
+    assert stats['load_factor'] <= 0.75
+    for kind, value, h, bucket, chain, count, first in table.generate_table():
+        assert bucket == h & (stats['buckets'] - 1)
+        assert table.lookup(kind, value) == (kind, value, h, count, first)
+    assert table.lookup('IDENTIFIER', 'not seen') is None
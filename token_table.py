@@ -1,32 +1,228 @@
-from collections import defaultdict
+import zlib
+from bisect import bisect_right
+from collections import namedtuple
+
+# یک ورودی جدول نمادها: نوع و مقدار توکن، هش ۳۲ بیتی، تعداد تکرار و شماره اولین توکن با این مقدار
+SymbolEntry = namedtuple('SymbolEntry', 'token_type value hash count first_seen')
+
 
 class TokenTable:
-    def __init__(self):
+    """جدول نمادها با درهم‌سازی و زنجیره‌سازی صریح
+
+    هر جفت (نوع، مقدار) فقط یک بار ذخیره می‌شود (intern) و تکرارهای بعدی فقط شمارنده آن را زیاد
+    می‌کنند. هش، CRC32 بایت‌های UTF-8 مقدار با مقدار اولیه‌ای وابسته به نوع است؛ خانه هر ورودی
+    (bucket) بیت‌های پایین هش است و ورودی‌های هم‌خانه با اندیس next به هم زنجیر می‌شوند. ظرفیت
+    همیشه توانی از ۲ است و با ضریب بار بیش از ۰.۷۵ دو برابر می‌شود.
+
+    ورودی‌ها در لیست‌های موازی نگه داشته می‌شوند و شماره هر ورودی ترتیب اولین دیدن آن است.
+    نمای مرتب جدول (generate_table) برای هر نوع نگه داشته می‌شود و فقط وقتی ورودی جدیدی از آن نوع
+    آمده باشد به‌روز می‌شود: چند ورودی جدید با جستجوی دودویی درج می‌شوند و تعداد زیاد با نمای قبلی
+    ادغام می‌شوند.
+    """
+
+    def __init__(self, capacity=1024):
         # ترتیب اولویت توکن‌ها که برای ایجاد جدول از آن استفاده می‌شود
         self.order = ['STRING', 'NUMBER', 'SYMBOL', 'IDENTIFIER', 'RESERVEDWORD']
-        # استفاده از defaultdict برای ذخیره لیستی از مقادیر مرتبط با هر نوع توکن
-        self.tokens = defaultdict(list)
+        size = 8
+        while size < capacity:
+            size *= 2
+        self._mask = size - 1
+        self._buckets = [-1] * size  # اندیس اولین ورودی هر خانه؛ -1 یعنی خانه خالی
+        # ستون‌های ورودی‌ها، به ترتیب اولین دیدن
+        self._types = []
+        self._values = []
+        self._hashes = []
+        self._counts = []
+        self._first = []
+        self._next = []  # اندیس ورودی بعدی در زنجیره همان خانه؛ -1 یعنی انتهای زنجیره
+        self._seeds = {}  # نوع توکن -> مقدار اولیه CRC32
+        self.total = 0  # تعداد کل توکن‌های اضافه‌شده (با تکرار)
+        # نمای مرتب: نوع -> (مقادیر مرتب، اندیس ورودی‌ها به همان ترتیب)، و ورودی‌های جدیدی که هنوز
+        # در نمای مرتب جا داده نشده‌اند
+        self._sorted = {}
+        self._pending = {}
+        # سطرهای آخرین generate_table و وضعیت جدول (تعداد توکن‌ها، اندازه) در آن لحظه
+        self._table = []
+        self._table_state = None
+
+    def __len__(self):
+        # تعداد ورودی‌های یکتا
+        return len(self._values)
+
+    def _hash(self, token_type, value):
+        # هش ۳۲ بیتی یک مقدار؛ نوع توکن در مقدار اولیه CRC32 وارد می‌شود
+        seed = self._seeds.get(token_type)
+        if seed is None:
+            seed = self._seeds[token_type] = zlib.crc32(token_type.encode('utf-8'))
+        return zlib.crc32(value.encode('utf-8'), seed)
+
+    def _find(self, token_type, value, h):
+        # جستجو در زنجیره خانه هش h؛ اندیس ورودی یا -1
+        index = self._buckets[h & self._mask]
+        values = self._values
+        types = self._types
+        hashes = self._hashes
+        next_ = self._next
+        while index >= 0:
+            if hashes[index] == h and values[index] == value and types[index] == token_type:
+                return index
+            index = next_[index]
+        return -1
+
+    def lookup(self, token_type, value):
+        # ورودی (SymbolEntry) یک جفت نوع و مقدار، یا None اگر در جدول نباشد
+        index = self._find(token_type, value, self._hash(token_type, value))
+        return None if index < 0 else self.entry(index)
+
+    def entry(self, index):
+        return SymbolEntry(self._types[index], self._values[index], self._hashes[index],
+                           self._counts[index], self._first[index])
 
     def add_token(self, token_type, value):
-        # این متد برای اضافه کردن توکن‌ها به لیست مربوط به نوع توکن استفاده می‌شود
-        # نوع توکن (token_type) و مقدار آن (value) را دریافت کرده و به لیست آن نوع اضافه می‌کند
-        self.tokens[token_type].append(value)
+        # این متد یک توکن را به جدول اضافه می‌کند و شماره ورودی آن را برمی‌گرداند
+        # اگر جفت (نوع، مقدار) قبلاً دیده شده باشد، فقط تعداد تکرار آن زیاد می‌شود
+        h = self._hash(token_type, value)
+        index = self._find(token_type, value, h)
+        if index < 0:
+            index = self._insert(token_type, value, h)
+        self._counts[index] += 1
+        self.total += 1
+        return index
+
+    def add_tokens(self, tokens):
+        # اضافه کردن همه توکن‌های یک لیست یا TokenStore (تاپل‌های نوع و مقدار)
+        # همان add_token با متغیرهای محلی، چون این حلقه برای هر توکن ورودی اجرا می‌شود
+        seeds = self._seeds
+        hashes = self._hashes
+        values = self._values
+        types = self._types
+        counts = self._counts
+        next_ = self._next
+        buckets = self._buckets
+        mask = self._mask
+        crc32 = zlib.crc32
+        added = 0
+        for token_type, value in tokens:
+            seed = seeds.get(token_type)
+            if seed is None:
+                seed = seeds[token_type] = crc32(token_type.encode('utf-8'))
+            h = crc32(value.encode(), seed)
+            index = buckets[h & mask]
+            while index >= 0:
+                if hashes[index] == h and values[index] == value and types[index] == token_type:
+                    break
+                index = next_[index]
+            else:
+                self.total += added
+                added = 0
+                index = self._insert(token_type, value, h)
+                mask = self._mask
+            counts[index] += 1
+            added += 1
+        self.total += added
+
+    def _insert(self, token_type, value, h):
+        # افزودن ورودی جدید به انتهای زنجیره خانه آن (تا جایگاه ورودی‌های قدیمی‌تر تغییر نکند)
+        index = len(self._values)
+        self._types.append(token_type)
+        self._values.append(value)
+        self._hashes.append(h)
+        self._counts.append(0)
+        self._first.append(self.total)
+        self._next.append(-1)
+        self._link(index)
+        self._pending.setdefault(token_type, []).append(index)
+        if len(self._values) * 4 > len(self._buckets) * 3:
+            self._grow()
+        return index
+
+    def _link(self, index):
+        # قرار دادن ورودی index در انتهای زنجیره خانه‌اش
+        slot = self._hashes[index] & self._mask
+        current = self._buckets[slot]
+        if current < 0:
+            self._buckets[slot] = index
+            return
+        next_ = self._next
+        while next_[current] >= 0:
+            current = next_[current]
+        next_[current] = index
+
+    def _grow(self):
+        # دو برابر کردن تعداد خانه‌ها و زنجیر کردن دوباره ورودی‌ها به ترتیب شماره
+        # لیست‌ها درجا عوض می‌شوند تا ارجاع‌های محلی add_tokens معتبر بمانند
+        buckets = self._buckets
+        buckets[:] = [-1] * (len(buckets) * 2)
+        mask = self._mask = len(buckets) - 1
+        next_ = self._next
+        next_[:] = [-1] * len(next_)
+        tails = {}
+        for index, h in enumerate(self._hashes):
+            slot = h & mask
+            tail = tails.get(slot)
+            if tail is None:
+                buckets[slot] = index
+            else:
+                next_[tail] = index
+            tails[slot] = index
+
+    def chain_position(self, index):
+        # جایگاه ورودی در زنجیره خانه‌اش؛ 0 یعنی بدون برخورد با ورودی‌های قبلی
+        position = 0
+        current = self._buckets[self._hashes[index] & self._mask]
+        while current != index:
+            current = self._next[current]
+            position += 1
+        return position
+
+    def stats(self):
+        # آمار جدول: تعداد ورودی‌ها و توکن‌ها، خانه‌ها، ضریب بار و طول زنجیره‌ها
+        lengths = {}
+        for h in self._hashes:
+            slot = h & self._mask
+            lengths[slot] = lengths.get(slot, 0) + 1
+        return {
+            'entries': len(self._values),
+            'tokens': self.total,
+            'buckets': len(self._buckets),
+            'used_buckets': len(lengths),
+            'load_factor': len(self._values) / len(self._buckets),
+            'max_chain': max(lengths.values(), default=0),
+            'collisions': len(self._values) - len(lengths),
+        }
 
-    def _hash(self, value):
-        # این متد یک هش ساده برای یک مقدار (مثلاً شناسه یا رشته) ایجاد می‌کند
-        # با استفاده از کدهای ASCII کاراکترها و محاسبه مجموع آنها
-        return sum(ord(c) for c in value) % 1000  # هش به‌طور تصادفی در بازه [0, 1000] تولید می‌شود
+    def sorted_indexes(self, token_type):
+        # اندیس ورودی‌های یک نوع به ترتیب مقدار؛ فقط ورودی‌های جدید در نمای قبلی جا داده می‌شوند
+        keys, indexes = self._sorted.setdefault(token_type, ([], []))
+        pending = self._pending.pop(token_type, None)
+        if pending:
+            values = self._values
+            if len(pending) * 8 < len(indexes):
+                # تعداد کمی ورودی جدید: درج دودویی هر کدام در جای خود
+                for index in pending:
+                    value = values[index]
+                    position = bisect_right(keys, value)
+                    keys.insert(position, value)
+                    indexes.insert(position, index)
+            else:
+                indexes[:] = sorted(indexes + pending, key=values.__getitem__)
+                keys[:] = [values[index] for index in indexes]
+        return indexes
 
     def generate_table(self):
         # این متد جدول توکن‌ها را به صورت مرتب تولید می‌کند
+        # هر سطر: (نوع، مقدار، هش، خانه، جایگاه در زنجیره، تعداد تکرار، شماره اولین توکن)
+        # اگر از فراخوانی قبلی توکنی اضافه نشده باشد، همان سطرها دوباره برگردانده می‌شوند
+        state = (self.total, self._mask)
+        if self._table_state == state:
+            return list(self._table)
         sorted_table = []
-        # برای هر نوع توکن در ترتیب مشخص شده، توکن‌ها را مرتب می‌کند
+        mask = self._mask
         for token_type in self.order:
-            if token_type in self.tokens:
-                # ابتدا توکن‌ها را از لیست استخراج کرده و از تکرار جلوگیری می‌کنیم (set)
-                # سپس بر اساس مقادیرشان به صورت الفبایی مرتب می‌کنیم
-                sorted_values = sorted(set(self.tokens[token_type]), key=lambda x: (x, [ord(c) for c in x]))
-                # برای هر مقدار مرتب‌شده، هش مربوطه را محاسبه کرده و به جدول اضافه می‌کنیم
-                for val in sorted_values:
-                    sorted_table.append((token_type, val, self._hash(val)))
-        return sorted_table  # جدول مرتب‌شده توکن‌ها را برمی‌گرداند
+            for index in self.sorted_indexes(token_type):
+                h = self._hashes[index]
+                sorted_table.append((token_type, self._values[index], h, h & mask, self.chain_position(index),
+                                     self._counts[index], self._first[index]))
+        self._table = sorted_table
+        self._table_state = state
+        return list(sorted_table)  # جدول مرتب‌شده توکن‌ها را برمی‌گرداند